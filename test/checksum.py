@@ -0,0 +1,196 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+CHUNK_SIZE = 10000  # primary-key values per top-level chunk
+FANOUT = 16  # sub-chunks a mismatching chunk is split into
+LEAF_SIZE = 64  # chunks this small are compared row by row
+
+# node name -> callable returning a context manager that yields a connection (or None)
+ConnectionFactory = Callable[[], ContextManager[Any]]
+Chunk = Tuple[int, int]  # [low, high) primary-key range
+ChunkChecksum = Tuple[int, int]  # (row count, BIT_XOR of row CRC32s)
+
+
+class ChunkedChecksumVerifier:
+    """Compare a table across nodes without pulling rows to the client.
+
+    The primary-key range is split into chunks and every node computes
+    ``COUNT(*)`` and ``BIT_XOR(CRC32(row))`` per chunk in a single grouped
+    query. Only chunks whose aggregates differ are split further, down to
+    ``leaf_size`` keys, where per-row CRC32s are compared to name the exact
+    diverging ids. All nodes are queried in parallel at every level.
+    """
+
+    def __init__(self, connections: Dict[str, ConnectionFactory], table: str,
+                 columns: Sequence[str], key: str = 'id', chunk_size: int = CHUNK_SIZE,
+                 fanout: int = FANOUT, leaf_size: int = LEAF_SIZE):
+        self.connections = connections
+        self.table = table
+        self.key = key
+        self.columns = list(columns)
+        self.chunk_size = chunk_size
+        self.fanout = fanout
+        self.leaf_size = leaf_size
+        self.row_hash = self._row_hash_expression()
+        self.queries = 0
+
+    def verify(self) -> Dict[str, Any]:
+        """Run the comparison and return counts, mismatching chunks and diverging ids."""
+        result: Dict[str, Any] = {
+            'consistent': False,
+            'row_counts': {},
+            'unreachable': [],
+            'chunks_compared': 0,
+            'mismatched_chunks': 0,
+            'diverging_ids': {}
+        }
+
+        bounds = self._on_all_nodes(self._key_bounds)
+        nodes = [node for node, value in bounds.items() if value is not None]
+        result['unreachable'] = [node for node in self.connections if node not in nodes]
+        if not nodes:
+            return result
+
+        lows = [b[0] for b in bounds.values() if b and b[0] is not None]
+        highs = [b[1] for b in bounds.values() if b and b[1] is not None]
+        if not lows:
+            result['row_counts'] = {node: 0 for node in nodes}
+            result['consistent'] = not result['unreachable']
+            return result
+
+        low, high = min(lows), max(highs) + 1
+        level = self._on_all_nodes(lambda conn: self._chunk_checksums(conn, low, high, self.chunk_size), nodes)
+        nodes = self._answered(level, nodes, result)
+        result['row_counts'] = {node: sum(c for c, _ in level[node].values()) for node in nodes}
+
+        step = self.chunk_size
+        pending = self._mismatched(level, low, step, nodes)
+        result['chunks_compared'] += len(self._all_chunk_ids(level))
+        while pending and len(nodes) > 1:
+            result['mismatched_chunks'] += len(pending)
+            leaves = [c for c in pending if c[1] - c[0] <= self.leaf_size]
+            splits = [c for c in pending if c[1] - c[0] > self.leaf_size]
+
+            if leaves:
+                per_node = self._on_all_nodes(lambda conn: self._row_checksums(conn, leaves), nodes)
+                nodes = self._answered(per_node, nodes, result)
+                for key, crcs in self._diff_rows(per_node, nodes).items():
+                    result['diverging_ids'][key] = crcs
+
+            pending = []
+            for chunk_low, chunk_high in splits:
+                sub_step = max(1, -(-(chunk_high - chunk_low) // self.fanout))
+                sub = self._on_all_nodes(
+                    lambda conn, lo=chunk_low, hi=chunk_high, st=sub_step: self._chunk_checksums(conn, lo, hi, st),
+                    nodes)
+                nodes = self._answered(sub, nodes, result)
+                result['chunks_compared'] += len(self._all_chunk_ids(sub))
+                pending.extend(self._mismatched(sub, chunk_low, sub_step, nodes, chunk_high))
+
+        result['consistent'] = not result['unreachable'] and not result['diverging_ids'] \
+            and len(set(result['row_counts'].values())) <= 1
+        return result
+
+    def _row_hash_expression(self) -> str:
+        # ISNULL flags keep NULL and '' from hashing the same
+        null_flags = ", ".join(f"ISNULL(`{c}`)" for c in self.columns)
+        cols = ", ".join(f"`{c}`" for c in [self.key] + self.columns)
+        return f"CRC32(CONCAT_WS('#', {cols}, CONCAT({null_flags})))"
+
+    @staticmethod
+    def _answered(level: Dict[str, Any], nodes: List[str], result: Dict[str, Any]) -> List[str]:
+        """Nodes that answered; one that failed mid-run is reported unreachable instead of compared."""
+        for node in nodes:
+            if level.get(node) is None and node not in result['unreachable']:
+                result['unreachable'].append(node)
+        return [node for node in nodes if level.get(node) is not None]
+
+    def _on_all_nodes(self, work: Callable[[Any], Any], nodes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run ``work(connection)`` on every node in parallel; None marks a failed node."""
+        nodes = nodes if nodes is not None else list(self.connections)
+        if not nodes:
+            return {}
+
+        def run(node: str) -> Any:
+            with self.connections[node]() as conn:
+                if not conn:
+                    return None
+                return work(conn)
+
+        with ThreadPoolExecutor(max_workers=len(nodes)) as executor:
+            futures = {node: executor.submit(run, node) for node in nodes}
+        results = {}
+        for node, future in futures.items():
+            try:
+                results[node] = future.result()
+            except Exception as e:
+                print(f"❌ Checksum query failed on {node}: {e}")
+                results[node] = None
+        return results
+
+    def _query(self, conn: Any, sql: str, params: Tuple = ()) -> List[Tuple]:
+        self.queries += 1
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _key_bounds(self, conn: Any) -> Tuple[Optional[int], Optional[int]]:
+        rows = self._query(conn, f"SELECT MIN(`{self.key}`), MAX(`{self.key}`) FROM `{self.table}`")
+        return rows[0][0], rows[0][1]
+
+    def _chunk_checksums(self, conn: Any, low: int, high: int, step: int) -> Dict[int, ChunkChecksum]:
+        """COUNT and BIT_XOR of row hashes for each ``step``-sized chunk in [low, high)."""
+        rows = self._query(conn, f"""
+            SELECT (`{self.key}` - %s) DIV %s AS chunk, COUNT(*), BIT_XOR({self.row_hash})
+            FROM `{self.table}`
+            WHERE `{self.key}` >= %s AND `{self.key}` < %s
+            GROUP BY chunk
+        """, (low, step, low, high))
+        return {int(chunk): (int(count), int(checksum)) for chunk, count, checksum in rows}
+
+    def _row_checksums(self, conn: Any, chunks: List[Chunk]) -> Dict[int, int]:
+        hashes: Dict[int, int] = {}
+        for low, high in chunks:
+            rows = self._query(conn, f"""
+                SELECT `{self.key}`, {self.row_hash}
+                FROM `{self.table}`
+                WHERE `{self.key}` >= %s AND `{self.key}` < %s
+            """, (low, high))
+            hashes.update({int(key): int(crc) for key, crc in rows})
+        return hashes
+
+    @staticmethod
+    def _all_chunk_ids(level: Dict[str, Optional[Dict[int, ChunkChecksum]]]) -> set:
+        ids = set()
+        for sums in level.values():
+            ids.update((sums or {}).keys())
+        return ids
+
+    def _mismatched(self, level: Dict[str, Optional[Dict[int, ChunkChecksum]]], low: int, step: int,
+                    nodes: List[str], high: Optional[int] = None) -> List[Chunk]:
+        """Ranges of chunks whose (count, checksum) is not identical on every node."""
+        mismatched = []
+        for chunk_id in sorted(self._all_chunk_ids(level)):
+            values = {(level[node] or {}).get(chunk_id, (0, 0)) for node in nodes}
+            if len(values) > 1:
+                chunk_low = low + chunk_id * step
+                chunk_high = chunk_low + step if high is None else min(chunk_low + step, high)
+                mismatched.append((chunk_low, chunk_high))
+        return mismatched
+
+    @staticmethod
+    def _diff_rows(per_node: Dict[str, Dict[int, int]], nodes: List[str]) -> Dict[int, Dict[str, Optional[int]]]:
+        """Per-row CRC32 comparison; returns {id: {node: crc or None if missing}}."""
+        keys = set()
+        for node in nodes:
+            keys.update(per_node[node].keys())
+
+        diverging = {}
+        for key in sorted(keys):
+            values = {node: per_node[node].get(key) for node in nodes}
+            if len(set(values.values())) > 1:
+                diverging[key] = values
+        return diverging
@@ -0,0 +1,264 @@
+import mysql.connector
+import argparse
+import csv
+import multiprocessing
+import threading
+import time
+from collections import deque
+
+from latency import LatencyRecorder
+from payload import PayloadPool
+from skenario_1 import (
+    primary_conf, replica1_conf, replica2_conf,
+    PAYLOAD_SIZE, BATCH_SIZE, COMMIT_EVERY,
+    setup_database, bulk_load,
+)
+
+HEARTBEAT_INTERVAL = 0.1   # detik antar update heartbeat di primary (resolusi lag)
+SAMPLE_INTERVAL    = 0.05  # detik antar sampel lag per replica
+RING_SIZE          = 4096  # sampel maksimum yang disimpan di memori per replica
+BURST_ROWS         = 2000  # baris per burst writer
+BURST_PAUSE        = 5     # detik jeda antar burst (waktu replica mengejar)
+BURST_COUNT        = 3
+CATCH_UP_THRESHOLD = HEARTBEAT_INTERVAL * 2 * 1000  # ms, lag dianggap sudah "mengejar"
+
+REPLICAS = {"Replica 1": replica1_conf, "Replica 2": replica2_conf}
+
+
+def setup_heartbeat(conn):
+    """Tabel heartbeat satu baris (gaya pt-heartbeat)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS heartbeat (
+            id TINYINT PRIMARY KEY,
+            ts TIMESTAMP(6) NOT NULL
+        )
+    """)
+    cursor.execute("REPLACE INTO heartbeat (id, ts) VALUES (1, NOW(6))")
+    conn.commit()
+    cursor.close()
+
+
+class HeartbeatWriter(threading.Thread):
+    """Update heartbeat di primary setiap HEARTBEAT_INTERVAL detik"""
+
+    def __init__(self, stop_event, interval=HEARTBEAT_INTERVAL):
+        super().__init__(daemon=True)
+        self.stop_event = stop_event
+        self.interval = interval
+
+    def run(self):
+        conn = mysql.connector.connect(**primary_conf, autocommit=True)
+        cursor = conn.cursor()
+        next_beat = time.perf_counter()
+        while not self.stop_event.is_set():
+            cursor.execute("UPDATE heartbeat SET ts = NOW(6) WHERE id = 1")
+            next_beat += self.interval
+            self.stop_event.wait(max(0.0, next_beat - time.perf_counter()))
+        cursor.close()
+        conn.close()
+
+
+class LagSampler(threading.Thread):
+    """Sampel lag satu replica dengan satu koneksi persisten.
+
+    Sampel terbaru disimpan di ring buffer (deque dengan maxlen) sehingga
+    memori tetap terbatas; seluruh time series dialirkan ke CSV.
+    """
+
+    def __init__(self, name, config, stop_event, sink, interval=SAMPLE_INTERVAL, ring_size=RING_SIZE):
+        super().__init__(daemon=True)
+        self.name = name
+        self.config = config
+        self.stop_event = stop_event
+        self.sink = sink
+        self.interval = interval
+        self.samples = deque(maxlen=ring_size)
+        self.samples_lock = threading.Lock()
+
+    def run(self):
+        conn = mysql.connector.connect(**self.config, autocommit=True)
+        cursor = conn.cursor()
+        query = "SELECT TIMESTAMPDIFF(MICROSECOND, ts, NOW(6)) FROM heartbeat WHERE id = 1"
+        next_sample = time.perf_counter()
+        while not self.stop_event.is_set():
+            try:
+                cursor.execute(query)
+                row = cursor.fetchone()
+                if row and row[0] is not None:
+                    now = time.time()
+                    lag_ms = row[0] / 1000
+                    with self.samples_lock:
+                        self.samples.append((now, lag_ms))
+                    self.sink.write(now, self.name, lag_ms)
+            except mysql.connector.Error as e:
+                print(f"⚠️ {self.name} sampel gagal: {e}")
+            next_sample += self.interval
+            self.stop_event.wait(max(0.0, next_sample - time.perf_counter()))
+        cursor.close()
+        conn.close()
+
+    def window(self, start, end):
+        """Sampel dalam rentang waktu [start, end) dari ring buffer"""
+        with self.samples_lock:
+            return [(t, lag) for t, lag in self.samples if start <= t < end]
+
+
+class CsvSink:
+    """Penulis CSV (t, replica, lag_ms) yang aman dipakai banyak thread"""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["timestamp", "replica", "lag_ms"])
+        self.lock = threading.Lock()
+
+    def write(self, timestamp, replica, lag_ms):
+        with self.lock:
+            self.writer.writerow([f"{timestamp:.6f}", replica, f"{lag_ms:.3f}"])
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def analyze_catch_up(samples, burst_start, threshold=CATCH_UP_THRESHOLD):
+    """Lag puncak setelah burst, waktu kembali di bawah threshold, dan laju catch-up"""
+    if not samples:
+        return None
+    peak_t, peak_lag = max(samples, key=lambda s: s[1])
+    recovered_t = next((t for t, lag in samples if t > peak_t and lag <= threshold), None)
+    result = {'peak_lag_ms': peak_lag, 'peak_after_s': peak_t - burst_start,
+              'recovery_s': None, 'catch_up_rate': None}
+    if peak_lag <= threshold:
+        result['recovery_s'] = 0.0  # Replica tidak pernah tertinggal melebihi threshold
+    elif recovered_t is not None:
+        result['recovery_s'] = recovered_t - peak_t
+        # ms lag yang terkejar per detik wall-clock
+        result['catch_up_rate'] = (peak_lag - threshold) / result['recovery_s']
+    return result
+
+
+_writer_payload = None
+
+
+def _init_writer():
+    """Initializer proses writer: payload pool sendiri per proses"""
+    global _writer_payload
+    _writer_payload = PayloadPool(PAYLOAD_SIZE)
+
+
+def _write_share(rows, batch_size, commit_every):
+    """Bagian burst satu proses writer, dengan koneksinya sendiri"""
+    conn = mysql.connector.connect(**primary_conf)
+    cursor = conn.cursor()
+    stats = bulk_load(conn, cursor, _writer_payload, rows, "batch", batch_size, commit_every)
+    cursor.close()
+    conn.close()
+    return stats
+
+
+def run_bursts(samplers, bursts=BURST_COUNT, burst_rows=BURST_ROWS, pause=BURST_PAUSE,
+               batch_size=BATCH_SIZE, commit_every=COMMIT_EVERY, processes=1):
+    """Writer burst di primary, lalu analisis catch-up setiap replica per burst.
+
+    Dengan processes > 1 setiap burst dibagi ke beberapa proses writer
+    (masing-masing punya koneksi sendiri) agar klien tidak dibatasi GIL.
+    """
+    conn = mysql.connector.connect(**primary_conf)
+    cursor = conn.cursor()
+    payload = PayloadPool(PAYLOAD_SIZE)  # Payload berbeda per baris, tanpa dibangun ulang
+    writers = None
+    if processes > 1:
+        writers = multiprocessing.get_context("spawn").Pool(processes, initializer=_init_writer)
+    report = []
+
+    for burst in range(1, bursts + 1):
+        burst_start = time.time()
+        print(f"\n[BURST {burst}] Insert {burst_rows} baris...")
+        if writers:
+            shares = [burst_rows // processes + (1 if i < burst_rows % processes else 0)
+                      for i in range(processes)]
+            stats = writers.starmap(_write_share, [(n, batch_size, commit_every) for n in shares if n])
+            elapsed = max(s['elapsed'] for s in stats)
+            print(f"[LOAD] {processes} proses: {burst_rows} baris dalam {elapsed:.2f} s "
+                  f"({burst_rows / elapsed:.0f} rows/s)")
+        else:
+            bulk_load(conn, cursor, payload, burst_rows, "batch", batch_size, commit_every)
+        time.sleep(pause)
+        burst_end = time.time()
+
+        for sampler in samplers:
+            result = analyze_catch_up(sampler.window(burst_start, burst_end), burst_start)
+            if result is None:
+                print(f"   {sampler.name}: tidak ada sampel")
+                continue
+            report.append((burst, sampler.name, result))
+            if result['catch_up_rate'] is not None:
+                recovery = f"{result['recovery_s']:.2f} s, {result['catch_up_rate']:.1f} ms-lag/s"
+            elif result['recovery_s'] is not None:
+                recovery = "tidak tertinggal"
+            else:
+                recovery = "belum mengejar"
+            print(f"   {sampler.name}: puncak {result['peak_lag_ms']:.1f} ms "
+                  f"(+{result['peak_after_s']:.2f} s), catch-up {recovery}")
+
+    if writers:
+        writers.close()
+        writers.join()
+    cursor.close()
+    conn.close()
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sampler lag kontinu selama beban berjalan")
+    parser.add_argument("--out", default="lag_timeseries.csv", help="File CSV time series lag")
+    parser.add_argument("--bursts", type=int, default=BURST_COUNT)
+    parser.add_argument("--burst-rows", type=int, default=BURST_ROWS)
+    parser.add_argument("--pause", type=float, default=BURST_PAUSE,
+                        help="Jeda (detik) setelah setiap burst")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Jumlah proses writer per burst (>1 untuk melewati batas GIL)")
+    parser.add_argument("--heartbeat-interval", type=float, default=HEARTBEAT_INTERVAL)
+    parser.add_argument("--sample-interval", type=float, default=SAMPLE_INTERVAL)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_database()
+    conn = mysql.connector.connect(**primary_conf)
+    setup_heartbeat(conn)
+    conn.close()
+    time.sleep(1)  # Pastikan tabel heartbeat sudah tereplikasi
+
+    stop_event = threading.Event()
+    sink = CsvSink(args.out)
+    heartbeat = HeartbeatWriter(stop_event, args.heartbeat_interval)
+    samplers = [LagSampler(name, conf, stop_event, sink, args.sample_interval)
+                for name, conf in REPLICAS.items()]
+
+    heartbeat.start()
+    for sampler in samplers:
+        sampler.start()
+
+    try:
+        run_bursts(samplers, args.bursts, args.burst_rows, args.pause, processes=args.processes)
+    finally:
+        stop_event.set()
+        heartbeat.join()
+        for sampler in samplers:
+            sampler.join()
+        sink.close()
+
+    recorder = LatencyRecorder(phase="sustained")
+    for sampler in samplers:
+        for _, lag_ms in sampler.samples:
+            recorder.record(sampler.name, lag_ms / 1000)
+    recorder.print_report("Persentil Lag (sampel terakhir di ring buffer)")
+    print(f"\n[INFO] Time series lag disimpan ke {args.out}")
+
+
+if __name__ == "__main__":
+    main()
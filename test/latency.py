@@ -0,0 +1,227 @@
+import json
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 2^7 sub-buckets per power of two keeps every recorded value within ~1.6%
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+MAX_TRACKABLE_US = 3_600_000_000  # one hour, in microseconds
+
+REPORT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def _bucket_count(max_value: int) -> int:
+    top_bucket = max(0, max_value.bit_length() - SUB_BUCKET_BITS)
+    return (top_bucket + 2) * SUB_BUCKET_HALF
+
+
+def _index_for(value: int) -> int:
+    bucket = max(0, value.bit_length() - SUB_BUCKET_BITS)
+    return bucket * SUB_BUCKET_HALF + (value >> bucket)
+
+
+def _highest_equivalent(index: int) -> int:
+    if index < SUB_BUCKET_COUNT:
+        return index
+    bucket = index // SUB_BUCKET_HALF - 1
+    sub = index - bucket * SUB_BUCKET_HALF
+    return ((sub + 1) << bucket) - 1
+
+
+class Histogram:
+    """Fixed-memory, log-bucketed latency histogram (HDR-style).
+
+    Values are stored in whole microseconds. Values below 128 us are exact;
+    above that every power of two is split into 64 linear sub-buckets, so
+    memory is a flat list of ~1.7k counters whatever the sample count.
+    """
+
+    def __init__(self, max_value_us: int = MAX_TRACKABLE_US):
+        self.max_value_us = max_value_us
+        self.counts: List[int] = [0] * _bucket_count(max_value_us)
+        self.total_count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        """Record one latency sample given in seconds."""
+        self.record_us(int(seconds * 1_000_000))
+
+    def record_us(self, value: int) -> None:
+        value = min(max(value, 0), self.max_value_us)
+        self.counts[_index_for(value)] += 1
+        self.total_count += 1
+        self.total_us += value
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        """Add ``other``'s samples into this histogram and return self."""
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+            self.max_value_us = other.max_value_us
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total_count += other.total_count
+        self.total_us += other.total_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def percentile(self, percent: float) -> int:
+        """Return the value (us) at or below which ``percent`` of samples fall."""
+        if self.total_count == 0:
+            return 0
+        target = max(1, int(round(percent / 100.0 * self.total_count)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(_highest_equivalent(index), self.max_us)
+        return self.max_us
+
+    def mean_us(self) -> float:
+        return self.total_us / self.total_count if self.total_count else 0.0
+
+    def summary(self, percentiles: Iterable[float] = REPORT_PERCENTILES) -> Dict[str, float]:
+        """Return count, mean, the requested percentiles and max, in milliseconds."""
+        result = {'count': self.total_count, 'mean_ms': self.mean_us() / 1000}
+        for p in percentiles:
+            result[f'p{p:g}_ms'] = self.percentile(p) / 1000
+        result['max_ms'] = self.max_us / 1000
+        return result
+
+    def to_dict(self) -> Dict[str, object]:
+        """Sparse, JSON-friendly form of the histogram."""
+        return {
+            'unit': 'us',
+            'sub_bucket_bits': SUB_BUCKET_BITS,
+            'max_value_us': self.max_value_us,
+            'total_count': self.total_count,
+            'total_us': self.total_us,
+            'min_us': self.min_us,
+            'max_us': self.max_us,
+            'counts': {str(i): c for i, c in enumerate(self.counts) if c}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "Histogram":
+        histogram = cls(int(data['max_value_us']))
+        for index, count in data['counts'].items():
+            histogram.counts[int(index)] = count
+        histogram.total_count = data['total_count']
+        histogram.total_us = data['total_us']
+        histogram.min_us = data['min_us']
+        histogram.max_us = data['max_us']
+        return histogram
+
+
+class LatencyRecorder:
+    """Per-phase, per-metric latency histograms that are cheap to record into.
+
+    Each thread records into its own histograms, so the hot path takes no
+    lock; ``snapshot`` merges every thread's histograms for reporting.
+    """
+
+    def __init__(self, phase: str = "default"):
+        self.phase = phase
+        self._phases: List[str] = [phase]
+        self._local = threading.local()
+        self._registry_lock = threading.Lock()
+        self._thread_histograms: List[Dict[Tuple[str, str], Histogram]] = []
+
+    def set_phase(self, phase: str) -> None:
+        """Switch the phase that new samples are recorded under."""
+        with self._registry_lock:
+            if phase not in self._phases:
+                self._phases.append(phase)
+        self.phase = phase
+
+    def record(self, metric: str, seconds: float, phase: Optional[str] = None) -> None:
+        histograms = getattr(self._local, 'histograms', None)
+        if histograms is None:
+            histograms = {}
+            self._local.histograms = histograms
+            with self._registry_lock:
+                self._thread_histograms.append(histograms)
+
+        key = (phase or self.phase, metric)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram()
+        histogram.record(seconds)
+
+    def absorb(self, snapshot: Dict[str, Dict[str, Histogram]]) -> None:
+        """Add histograms recorded elsewhere (e.g. in a worker process) to the report."""
+        histograms = {(phase, metric): h for phase, metrics in snapshot.items() for metric, h in metrics.items()}
+        with self._registry_lock:
+            for phase in snapshot:
+                if phase not in self._phases:
+                    self._phases.append(phase)
+            self._thread_histograms.append(histograms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Histogram]]:
+        """Merge all threads' histograms into {phase: {metric: Histogram}}."""
+        merged: Dict[str, Dict[str, Histogram]] = defaultdict(dict)
+        with self._registry_lock:
+            per_thread = [dict(h) for h in self._thread_histograms]
+            phase_order = list(self._phases)
+
+        for histograms in per_thread:
+            for (phase, metric), histogram in histograms.items():
+                target = merged[phase].setdefault(metric, Histogram(histogram.max_value_us))
+                target.merge(histogram)
+
+        ordered = {p: merged[p] for p in phase_order if p in merged}
+        ordered.update({p: m for p, m in merged.items() if p not in ordered})
+        return ordered
+
+    def print_report(self, title: str = "Latency Percentiles") -> None:
+        """Print p50/p90/p99/p99.9/max per phase and metric."""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return
+
+        print(f"\n⏲️  {title} (ms):")
+        header = f"{'Phase':<15} {'Metric':<10} {'Count':>8}"
+        for p in REPORT_PERCENTILES:
+            header += f" {f'p{p:g}':>9}"
+        header += f" {'max':>9}"
+        print(header)
+        for phase, metrics in snapshot.items():
+            for metric, histogram in sorted(metrics.items()):
+                summary = histogram.summary()
+                row = f"{phase:<15} {metric:<10} {summary['count']:>8}"
+                for p in REPORT_PERCENTILES:
+                    row += f" {summary[f'p{p:g}_ms']:>9.2f}"
+                row += f" {summary['max_ms']:>9.2f}"
+                print(row)
+
+    def export(self, path: str) -> None:
+        """Write every phase/metric histogram plus its summary to a JSON file."""
+        data = {
+            phase: {
+                metric: {'summary': h.summary(), 'histogram': h.to_dict()}
+                for metric, h in metrics.items()
+            }
+            for phase, metrics in self.snapshot().items()
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+
+def load_histograms(path: str) -> Dict[str, Dict[str, Histogram]]:
+    """Load a file written by ``LatencyRecorder.export`` for run-to-run comparison."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return {
+        phase: {metric: Histogram.from_dict(entry['histogram']) for metric, entry in metrics.items()}
+        for phase, metrics in data.items()
+    }
@@ -0,0 +1,66 @@
+import itertools
+import random
+import zlib
+from typing import List, Optional
+
+POOL_SIZE = 1024  # distinct payloads kept in memory
+COMPRESSIBILITY = 0.5  # fraction of each payload made of repeated filler text
+BLOCK_SIZE = 64  # granularity at which filler and random text are mixed
+
+# Printable, and free of the quote/backslash/tab/newline characters that
+# need escaping in SQL literals or LOAD DATA files
+RANDOM_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+FILLER = (b"Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+          b"[LOG-INFO] User transaction SUCCESS id=8821. ")
+
+
+class PayloadPool:
+    """Pre-generated payloads of a fixed size and tunable compressibility.
+
+    One buffer of ``size * count`` bytes is generated up front. ``next()``
+    hands out the pre-sliced ``bytes`` objects round-robin and ``next_view()``
+    hands out ``memoryview`` slices of the buffer, so the hot path never
+    builds, joins or copies a payload. Both are safe to call from many
+    threads. ``compressibility`` is the fraction of each payload drawn from
+    repeated filler text; the rest is random base64-alphabet text.
+    """
+
+    def __init__(self, size: int, count: int = POOL_SIZE, compressibility: float = COMPRESSIBILITY,
+                 seed: Optional[int] = None):
+        if size <= 0:
+            raise ValueError("payload size must be positive")
+        if not 0.0 <= compressibility <= 1.0:
+            raise ValueError("compressibility must be between 0 and 1")
+        self.size = size
+        self.count = count
+        self.compressibility = compressibility
+        self.buffer = self._generate(size * count, compressibility, random.Random(seed))
+        self.view = memoryview(self.buffer)
+        self._payloads: List[bytes] = [self.buffer[i * size:(i + 1) * size] for i in range(count)]
+        self._cursor = itertools.count()
+
+    @staticmethod
+    def _generate(length: int, compressibility: float, rng: random.Random) -> bytes:
+        filler = FILLER * (BLOCK_SIZE // len(FILLER) + 2)
+        blocks = []
+        for offset in range(0, length, BLOCK_SIZE):
+            n = min(BLOCK_SIZE, length - offset)
+            if rng.random() < compressibility:
+                start = offset % len(FILLER)
+                blocks.append(filler[start:start + n])
+            else:
+                blocks.append(bytes(rng.choices(RANDOM_ALPHABET, k=n)))
+        return b"".join(blocks)
+
+    def next(self) -> bytes:
+        """Next pre-sliced payload (no allocation per call)."""
+        return self._payloads[next(self._cursor) % self.count]
+
+    def next_view(self) -> memoryview:
+        """Next payload as a zero-copy view into the pool buffer."""
+        i = next(self._cursor) % self.count
+        return self.view[i * self.size:(i + 1) * self.size]
+
+    def compression_ratio(self) -> float:
+        """Compressed/original size of the pool buffer (1.0 = incompressible)."""
+        return len(zlib.compress(self.buffer)) / len(self.buffer)
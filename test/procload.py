@@ -0,0 +1,176 @@
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from latency import Histogram
+
+READY_TIMEOUT = 60  # seconds for every worker process to start up
+REPORT_INTERVAL = 0.5  # seconds between live counter reports from each worker
+STOP_TIMEOUT = 30  # seconds to wait for workers to drain and send final reports
+PHASE_BYTES = 64  # max encoded length of a phase name shared with workers
+
+Report = Dict[str, Any]
+
+
+class WorkerContext:
+    """What a worker process gets: its share of the schedule plus shared state.
+
+    Worker ``index`` of ``processes`` owns global slots ``index``,
+    ``index + processes``, ... of the open-loop schedule, i.e. it runs at
+    ``rate = target_rate / processes`` starting ``index / target_rate``
+    seconds after the common start time. Phase changes and the stop signal
+    come from the parent through shared memory; reports go back over a queue.
+    """
+
+    def __init__(self, index: int, processes: int, target_rate: float, threads: int,
+                 args: Dict[str, Any], running, ready, start, start_at, phase, reports):
+        self.index = index
+        self.processes = processes
+        self.target_rate = target_rate
+        self.rate = target_rate / processes
+        self.threads = threads
+        self.args = args
+        self._running = running
+        self._ready = ready
+        self._start = start
+        self._start_at = start_at
+        self._phase = phase
+        self._reports = reports
+
+    def running(self) -> bool:
+        return self._running.is_set()
+
+    def wait_for_start(self) -> float:
+        """Signal readiness, block until every worker is up, return this worker's start time."""
+        self._ready.release()
+        self._start.wait()
+        return self._start_at.value + self.index / self.target_rate
+
+    def phase(self) -> str:
+        return self._phase.value.decode()
+
+    def global_seq(self, local_slot: int) -> int:
+        return local_slot * self.processes + self.index
+
+    def report(self, data: Report, final: bool = False) -> None:
+        self._reports.put((self.index, final, data))
+
+
+def _worker_entry(worker: Callable[[WorkerContext], None], ctx: WorkerContext) -> None:
+    try:
+        worker(ctx)
+    except KeyboardInterrupt:
+        pass
+
+
+class ProcessLoadGenerator:
+    """Spread an open-loop workload over worker processes to get past the GIL.
+
+    ``worker(ctx)`` runs in each process (spawned, so it must be importable)
+    and owns its own connections. It calls ``ctx.wait_for_start()`` once set
+    up, runs until ``ctx.running()`` turns false, sends cumulative counters
+    with ``ctx.report`` every ``REPORT_INTERVAL`` and a last report including
+    serialized histograms with ``final=True``. The parent keeps the latest
+    report per worker in ``reports``. A report may carry a ``window``: the
+    serialized histogram of latencies since the worker's previous report,
+    handed to ``on_window`` as it arrives so per-interval latency survives
+    the parent keeping only the latest report.
+    """
+
+    def __init__(self, worker: Callable[[WorkerContext], None], processes: int, target_rate: float,
+                 threads: int, args: Optional[Dict[str, Any]] = None, phase: str = "default",
+                 on_window: Optional[Callable[[Histogram], None]] = None):
+        if processes <= 0:
+            raise ValueError("processes must be positive")
+        self._mp = multiprocessing.get_context("spawn")
+        self.worker = worker
+        self.processes = processes
+        self.target_rate = target_rate
+        self.threads = threads
+        self.args = args or {}
+        self.on_window = on_window
+        self._running = self._mp.Event()
+        self._ready = self._mp.Semaphore(0)
+        self._start = self._mp.Event()
+        self._start_at = self._mp.Value('d', 0.0)
+        self._phase = self._mp.Array('c', PHASE_BYTES)
+        self._queue = self._mp.Queue()
+        self._procs: List[Any] = []
+        self._collector: Optional[threading.Thread] = None
+        self.reports: Dict[int, Report] = {}
+        self.finished: Dict[int, bool] = {}
+        self.set_phase(phase)
+
+    def set_phase(self, phase: str) -> None:
+        self._phase.value = phase.encode()[:PHASE_BYTES - 1]
+
+    def start(self) -> bool:
+        """Spawn the workers and release them together once all are ready."""
+        self._running.set()
+        for index in range(self.processes):
+            ctx = WorkerContext(index, self.processes, self.target_rate, self.threads, self.args,
+                                self._running, self._ready, self._start, self._start_at,
+                                self._phase, self._queue)
+            proc = self._mp.Process(target=_worker_entry, args=(self.worker, ctx),
+                                    name=f"load-{index}", daemon=True)
+            proc.start()
+            self._procs.append(proc)
+
+        self._collector = threading.Thread(target=self._collect, name="load-collector", daemon=True)
+        self._collector.start()
+
+        deadline = time.monotonic() + READY_TIMEOUT
+        for _ in range(self.processes):
+            if not self._ready.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                print(f"❌ Worker processes not ready after {READY_TIMEOUT}s")
+                self.stop()
+                return False
+        # perf_counter is a system-wide monotonic clock, so children share the schedule
+        self._start_at.value = time.perf_counter()
+        self._start.set()
+        return True
+
+    def stop(self) -> List[Report]:
+        """Stop the workers and return their final (or last known) reports."""
+        self._running.clear()
+        self._start.set()  # Release workers still waiting to start so they can exit
+        deadline = time.monotonic() + STOP_TIMEOUT
+        while time.monotonic() < deadline and not all(self.finished.get(i) for i in range(self.processes)):
+            if not any(proc.is_alive() for proc in self._procs) and self._queue.empty():
+                break
+            time.sleep(0.05)
+        for proc in self._procs:
+            proc.join(timeout=max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                proc.terminate()
+        return [self.reports[i] for i in sorted(self.reports)]
+
+    def _collect(self) -> None:
+        while True:
+            try:
+                index, final, data = self._queue.get(timeout=REPORT_INTERVAL)
+            except queue.Empty:
+                if not self._running.is_set() and not any(p.is_alive() for p in self._procs):
+                    return
+                continue
+            window = data.pop('window', None)
+            if window and self.on_window:
+                self.on_window(Histogram.from_dict(window))
+            self.reports[index] = data
+            if final:
+                self.finished[index] = True
+
+    def live_total(self, key: str) -> int:
+        """Sum of a counter over the latest report of every worker."""
+        return sum(report.get('counters', {}).get(key, 0) for report in self.reports.values())
+
+
+def serialize_histograms(snapshot: Dict[str, Dict[str, Histogram]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """``LatencyRecorder.snapshot()`` in a picklable, compact form."""
+    return {phase: {metric: h.to_dict() for metric, h in metrics.items()} for phase, metrics in snapshot.items()}
+
+
+def deserialize_histograms(data: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Histogram]]:
+    return {phase: {metric: Histogram.from_dict(h) for metric, h in metrics.items()} for phase, metrics in data.items()}
@@ -0,0 +1,349 @@
+import mysql.connector
+from mysql.connector import Error
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+LAG_INTERVAL = 0.1  # seconds between lag samples (and the lag resolution)
+LAG_WINDOW = 50  # primary gtid_executed snapshots kept; lag is capped at LAG_WINDOW * LAG_INTERVAL
+MAX_LAG = 1.0  # seconds; replicas further behind get no reads
+LAG_SCALE = 0.1  # seconds of lag that weigh as much as one in-flight read
+RYW_TIMEOUT = 1.0  # seconds a read-your-writes read waits on a replica before going to the primary
+IDLE_CONNECTIONS = 16  # idle connections kept per backend
+CONNECT_TIMEOUT = 2  # seconds; an int, the C extension rejects float connection_timeout
+
+# (name, connection config) of the current primary and the replicas
+Topology = Tuple[Optional[Tuple[str, Dict[str, Any]]], Dict[str, Dict[str, Any]]]
+
+
+class Backend:
+    """One server the router can send statements to, with its live load and lag."""
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.config = dict(config)
+        self.in_flight = 0
+        self.lag: Optional[float] = None  # seconds; None until the first sample
+        self.healthy = True
+        self.reads = 0
+        self.writes = 0
+        self._idle: Deque[Any] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self.in_flight += 1
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            try:
+                conn = mysql.connector.connect(**self.config, autocommit=True, connection_timeout=CONNECT_TIMEOUT)
+            except Error:
+                with self._lock:
+                    self.in_flight -= 1
+                raise
+        return conn
+
+    def release(self, conn, broken: bool = False) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if not broken and len(self._idle) < IDLE_CONNECTIONS:
+                self._idle.append(conn)
+                return
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class ReadWriteRouter:
+    """Send writes to the primary and spread reads over replicas by lag and load.
+
+    A background thread snapshots the primary's ``gtid_executed`` every
+    ``lag_interval`` seconds and asks each replica which of the recent
+    snapshots it already contains (``GTID_SUBSET``); a replica's lag is the
+    age of the newest snapshot it has applied, so the measurement works the
+    same for asynchronous replicas and group secondaries and needs no
+    heartbeat writes. Reads go to the replica with the lowest
+    ``(in_flight + 1) * (1 + lag / lag_scale)`` among those within
+    ``max_lag``, or to the primary if none is.
+
+    ``topology()`` returns the current primary and replicas; it is called
+    on every lag tick, so a group primary change is picked up within one
+    interval. Sessions from ``session(read_your_writes=True)`` remember the
+    primary's ``gtid_executed`` after each write and make replicas wait for
+    it (``WAIT_FOR_EXECUTED_GTID_SET``) before reading.
+    """
+
+    def __init__(self, topology: Callable[[], Topology], max_lag: float = MAX_LAG,
+                 lag_interval: float = LAG_INTERVAL, lag_scale: float = LAG_SCALE,
+                 ryw_timeout: float = RYW_TIMEOUT):
+        self._topology = topology
+        self.max_lag = max_lag
+        self.lag_interval = lag_interval
+        self.lag_scale = lag_scale
+        self.ryw_timeout = ryw_timeout
+        self.backends: Dict[str, Backend] = {}
+        self.primary: Optional[Backend] = None
+        self.replicas: List[Backend] = []
+        self._snapshots: Deque[Tuple[float, str]] = deque(maxlen=LAG_WINDOW)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            'reads_on_primary': 0,
+            'ryw_waits': 0,
+            'ryw_fallbacks': 0,
+            'topology_changes': 0
+        }
+
+    @classmethod
+    def replication(cls, primary: Tuple[str, Dict[str, Any]], replicas: Dict[str, Dict[str, Any]],
+                    **kwargs) -> "ReadWriteRouter":
+        """Router for a fixed primary/replica topology (e.g. ``primary-repl``)."""
+        return cls(lambda: (primary, replicas), **kwargs)
+
+    @classmethod
+    def group(cls, nodes: Dict[str, Dict[str, Any]], user: str, password: str, database: str,
+              **kwargs) -> "ReadWriteRouter":
+        """Router for a Group Replication group; ``nodes`` maps name -> host/port/container."""
+        return cls(group_topology(nodes, user, password, database), **kwargs)
+
+    # --- Lifecycle ------------------------------------------------------------
+
+    def start(self) -> None:
+        self._refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._monitor, name="router-lag", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.lag_interval + CONNECT_TIMEOUT + 1)
+        for backend in self.backends.values():
+            backend.close()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def session(self, read_your_writes: bool = False) -> "RouterSession":
+        return RouterSession(self, read_your_writes)
+
+    # --- Topology and lag -----------------------------------------------------
+
+    def _monitor(self) -> None:
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self._refresh()
+            except Error:
+                pass
+            next_tick += self.lag_interval
+            self._stop.wait(max(0.0, next_tick - time.perf_counter()))
+
+    def _backend(self, name: str, config: Dict[str, Any]) -> Backend:
+        backend = self.backends.get(name)
+        if backend is None or backend.config != config:
+            backend = self.backends[name] = Backend(name, config)
+        return backend
+
+    def _refresh(self) -> None:
+        primary, replicas = self._topology()
+        with self._lock:
+            new_primary = self._backend(*primary) if primary else None
+            if new_primary is not self.primary:
+                if self.primary is not None:
+                    self.stats['topology_changes'] += 1
+                self._snapshots.clear()  # Snapshots of the old primary say nothing about the new one
+            self.primary = new_primary
+            self.replicas = [self._backend(name, config) for name, config in replicas.items()]
+        if self.primary is None:
+            return
+
+        now = time.perf_counter()
+        try:
+            gtid_executed = self._query(self.primary, "SELECT @@GLOBAL.gtid_executed")[0][0]
+            self.primary.healthy = True
+        except Error:
+            self.primary.healthy = False
+            return
+        self._snapshots.append((now, gtid_executed))
+        for replica in self.replicas:
+            self._sample_lag(replica, now)
+
+    def _sample_lag(self, replica: Backend, now: float) -> None:
+        snapshots = list(self._snapshots)
+        checks = ", ".join("GTID_SUBSET(%s, @@GLOBAL.gtid_executed)" for _ in snapshots)
+        try:
+            row = self._query(replica, f"SELECT {checks}", tuple(gtids for _, gtids in snapshots))[0]
+        except Error:
+            replica.healthy = False
+            return
+        replica.healthy = True
+        newest = next((taken for (taken, _), contained in zip(reversed(snapshots), reversed(row)) if contained),
+                      None)
+        if newest is not None:
+            replica.lag = now - newest
+        else:
+            # Not even the oldest snapshot applied. Right after a primary change the
+            # window holds only the newest snapshots, so its age says nothing: treat
+            # the replica as at least a full window behind.
+            replica.lag = max(now - snapshots[0][0], LAG_WINDOW * self.lag_interval)
+
+    @staticmethod
+    def _query(backend: Backend, query: str, params: tuple = ()) -> List[tuple]:
+        conn = backend.acquire()
+        broken = False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        except Error:
+            broken = True
+            raise
+        finally:
+            backend.release(conn, broken)
+
+    # --- Routing --------------------------------------------------------------
+
+    def pick_replica(self) -> Optional[Backend]:
+        """Least loaded, least lagged healthy replica within ``max_lag`` (None = use the primary)."""
+        with self._lock:
+            candidates = [r for r in self.replicas
+                          if r.healthy and r.lag is not None and r.lag <= self.max_lag]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda r: (r.in_flight + 1) * (1 + r.lag / self.lag_scale))
+
+    @contextmanager
+    def connection(self, backend: Backend) -> Iterator[Any]:
+        conn = backend.acquire()
+        broken = False
+        try:
+            yield conn
+        except Error:
+            broken = True
+            raise
+        finally:
+            backend.release(conn, broken)
+
+
+class RouterSession:
+    """One client's view of the router; tracks its last write for read-your-writes."""
+
+    def __init__(self, router: ReadWriteRouter, read_your_writes: bool = False):
+        self.router = router
+        self.read_your_writes = read_your_writes
+        self.last_gtid: Optional[str] = None
+
+    def write(self, query: str, params: tuple = ()) -> int:
+        """Run one autocommitted write on the primary; returns the affected row count."""
+        primary = self.router.primary
+        if primary is None:
+            raise Error("no primary")
+        with self.router.connection(primary) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rowcount = cursor.rowcount
+                if self.read_your_writes:
+                    # Superset of this session's own GTID; cheap and valid on any topology
+                    cursor.execute("SELECT @@GLOBAL.gtid_executed")
+                    self.last_gtid = cursor.fetchone()[0]
+        primary.count('writes')
+        return rowcount
+
+    def read(self, query: str, params: tuple = ()) -> Tuple[str, List[tuple]]:
+        """Run a read on a replica (or the primary); returns (backend name, rows)."""
+        router = self.router
+        replica = router.pick_replica()
+        if replica is not None:
+            try:
+                rows = self._read_on(replica, query, params)
+                if rows is not None:
+                    replica.count('reads')
+                    return replica.name, rows
+            except Error:
+                replica.healthy = False
+        primary = router.primary
+        if primary is None:
+            raise Error("no primary")
+        with router.connection(primary) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+        primary.count('reads')
+        router.count('reads_on_primary')
+        return primary.name, rows
+
+    def _read_on(self, replica: Backend, query: str, params: tuple) -> Optional[List[tuple]]:
+        """Rows from ``replica``, or None if it did not reach this session's last write in time."""
+        with self.router.connection(replica) as conn:
+            with conn.cursor() as cursor:
+                if self.read_your_writes and self.last_gtid:
+                    self.router.count('ryw_waits')
+                    cursor.execute("SELECT WAIT_FOR_EXECUTED_GTID_SET(%s, %s)",
+                                   (self.last_gtid, self.router.ryw_timeout))
+                    if cursor.fetchone()[0] != 0:
+                        self.router.count('ryw_fallbacks')
+                        return None
+                cursor.execute(query, params)
+                return cursor.fetchall()
+
+
+def group_topology(nodes: Dict[str, Dict[str, Any]], user: str, password: str,
+                   database: str) -> Callable[[], Topology]:
+    """Topology callable for a group: the primary and ONLINE secondaries."""
+    configs = {name: {'host': n['host'], 'port': n['port'], 'user': user, 'password': password,
+                      'database': database} for name, n in nodes.items()}
+    hosts = {n.get('container', name): name for name, n in nodes.items()}
+    return lambda: _group_members(configs, hosts)
+
+
+def _group_members(configs: Dict[str, Dict[str, Any]], hosts: Dict[str, str]) -> Topology:
+    """Primary and ONLINE secondaries as seen by the first node that answers."""
+    for name, config in configs.items():
+        try:
+            conn = mysql.connector.connect(**config, connection_timeout=CONNECT_TIMEOUT)
+        except Error:
+            continue
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT MEMBER_HOST, MEMBER_ROLE
+                    FROM performance_schema.replication_group_members
+                    WHERE MEMBER_STATE = 'ONLINE'
+                """)
+                members = cursor.fetchall()
+        except Error:
+            continue
+        finally:
+            conn.close()
+        primary = None
+        replicas = {}
+        for host, role in members:
+            node = hosts.get(host)
+            if node is None:
+                continue
+            if role == 'PRIMARY':
+                primary = (node, configs[node])
+            else:
+                replicas[node] = configs[node]
+        if primary:
+            return primary, replicas
+    return None, {}
@@ -0,0 +1,231 @@
+import mysql.connector
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from latency import LatencyRecorder
+from payload import PayloadPool
+from router import ReadWriteRouter, group_topology
+from skenario_1 import primary_conf, replica1_conf, replica2_conf
+
+CLIENTS      = 32     # thread klien closed-loop
+DURATION     = 20     # detik per jumlah replica
+READ_RATIO   = 0.9    # proporsi operasi baca
+SEED_ROWS    = 20000  # baris awal di tabel benchmark
+RANGE_ROWS   = 200    # baris yang di-agregasi per operasi baca
+PAYLOAD_SIZE = 200
+WARMUP_LAG_TIMEOUT = 60  # detik menunggu replica mengejar sebelum run
+
+TABLE = "router_bench"
+READ_QUERY  = f"SELECT COUNT(*), SUM(LENGTH(data)) FROM {TABLE} WHERE id BETWEEN %s AND %s"
+WRITE_QUERY = f"INSERT INTO {TABLE} (data) VALUES (%s)"
+
+
+def replication_topology():
+    """Topologi primary-repl: primary tetap, dua replica async"""
+    primary = ("primary", primary_conf)
+    replicas = {"replica1": replica1_conf, "replica2": replica2_conf}
+    return lambda: (primary, replicas)
+
+
+def gr_topology():
+    """Topologi Group Replication dari peta node skenario2 (primary dicari ulang setiap tick)"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "skenario2"))
+    # Peta yang sama dengan GroupReplicationFailoverTest.nodes, tanpa membuat harness (dan klien Docker)
+    from test import DB_CONFIG, NODES
+    return group_topology(NODES, DB_CONFIG['user'], DB_CONFIG['password'], DB_CONFIG['database'])
+
+
+def limit_replicas(topology, count):
+    """Batasi topologi ke `count` replica pertama (0 = semua baca ke primary)"""
+    def limited():
+        primary, replicas = topology()
+        return primary, dict(list(replicas.items())[:count])
+    return limited
+
+
+def setup_table(config, seed_rows, payloads):
+    conn = mysql.connector.connect(**config)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE} (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            data VARCHAR(1024),
+            created_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3)
+        )
+    """)
+    cursor.execute(f"SELECT COUNT(*) FROM {TABLE}")
+    existing = cursor.fetchone()[0]
+    for start in range(existing, seed_rows, 1000):
+        rows = [(payloads.next(),) for _ in range(min(1000, seed_rows - start))]
+        cursor.executemany(WRITE_QUERY, rows)
+        conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"[INFO] Tabel {TABLE} siap ({max(existing, seed_rows)} baris)")
+
+
+def wait_for_replicas(router, timeout=WARMUP_LAG_TIMEOUT):
+    """Tunggu sampai semua replica di bawah max_lag (misalnya setelah seeding)"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if all(r.lag is not None and r.lag <= router.max_lag for r in router.replicas):
+            return True
+        time.sleep(router.lag_interval)
+    lags = ", ".join(f"{r.name}={r.lag}" for r in router.replicas)
+    print(f"[WARN] Replica belum mengejar setelah {timeout} detik ({lags})")
+    return False
+
+
+class MixedWorkload:
+    """Klien closed-loop: setiap operasi baca (range agregat) atau tulis (insert) lewat router"""
+
+    def __init__(self, router, clients, read_ratio, read_your_writes, payloads, latency, max_id):
+        self.router = router
+        self.clients = clients
+        self.read_ratio = read_ratio
+        self.read_your_writes = read_your_writes
+        self.payloads = payloads
+        self.latency = latency
+        self.max_id = max_id
+        self.running = False
+        self.lock = threading.Lock()
+        self.counts = {'reads': 0, 'writes': 0, 'errors': 0}
+
+    def _client(self, seed):
+        rng = random.Random(seed)
+        session = self.router.session(read_your_writes=self.read_your_writes)
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        while self.running:
+            is_read = rng.random() < self.read_ratio
+            started = time.perf_counter()
+            try:
+                if is_read:
+                    low = rng.randint(1, max(1, self.max_id - RANGE_ROWS))
+                    session.read(READ_QUERY, (low, low + RANGE_ROWS - 1))
+                else:
+                    session.write(WRITE_QUERY, (self.payloads.next(),))
+            except mysql.connector.Error:
+                counts['errors'] += 1
+                continue
+            self.latency.record('read' if is_read else 'write', time.perf_counter() - started)
+            counts['reads' if is_read else 'writes'] += 1
+        with self.lock:
+            for key, value in counts.items():
+                self.counts[key] += value
+
+    def run(self, duration):
+        self.running = True
+        threads = [threading.Thread(target=self._client, args=(i,), daemon=True) for i in range(self.clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        self.running = False
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+
+def run_point(topology, replica_count, args, payloads, latency):
+    """Satu titik kurva: beban campuran dengan `replica_count` replica"""
+    phase = f"{replica_count} replica"
+    latency.set_phase(phase)
+    router = ReadWriteRouter(limit_replicas(topology, replica_count), max_lag=args.max_lag)
+    router.start()
+    try:
+        wait_for_replicas(router)
+        workload = MixedWorkload(router, args.clients, args.read_ratio, args.read_your_writes,
+                                 payloads, latency, args.seed_rows)
+        elapsed = workload.run(args.duration)
+    finally:
+        router.stop()
+
+    snapshot = latency.snapshot().get(phase, {})
+    read_h, write_h = snapshot.get('read'), snapshot.get('write')
+    return {
+        'replicas': replica_count,
+        'reads_per_sec': workload.counts['reads'] / elapsed,
+        'writes_per_sec': workload.counts['writes'] / elapsed,
+        'errors': workload.counts['errors'],
+        'read_p50_ms': read_h.summary()['p50_ms'] if read_h else None,
+        'read_p99_ms': read_h.summary()['p99_ms'] if read_h else None,
+        'write_p99_ms': write_h.summary()['p99_ms'] if write_h else None,
+        'reads_by_backend': {b.name: b.reads for b in router.backends.values() if b.reads},
+        'max_lag_ms': max((r.lag * 1000 for r in router.replicas if r.lag is not None), default=None),
+        **router.stats
+    }
+
+
+def _fmt(value):
+    return f"{value:.2f}" if value is not None else "-"
+
+
+def print_results(results):
+    print(f"\n{'='*100}")
+    print("HASIL BENCHMARK ROUTER (baca/tulis campuran)")
+    print(f"{'='*100}")
+    print(f"{'Replica':>7} {'baca/s':>10} {'skala':>6} {'tulis/s':>8} {'baca p50':>9} {'baca p99':>9} "
+          f"{'tulis p99':>10} {'ke primary':>11} {'RYW fb':>7}  Distribusi baca")
+    base = results[0]['reads_per_sec'] if results and results[0]['reads_per_sec'] else None
+    for r in results:
+        scale = f"x{r['reads_per_sec'] / base:.2f}" if base else "-"
+        dist = ", ".join(f"{name}={count}" for name, count in sorted(r['reads_by_backend'].items()))
+        print(f"{r['replicas']:>7} {r['reads_per_sec']:>10.0f} {scale:>6} {r['writes_per_sec']:>8.0f} "
+              f"{_fmt(r['read_p50_ms']):>9} {_fmt(r['read_p99_ms']):>9} {_fmt(r['write_p99_ms']):>10} "
+              f"{r['reads_on_primary']:>11} {r['ryw_fallbacks']:>7}  {dist}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark router baca/tulis dengan pemilihan replica berbasis lag")
+    parser.add_argument("--topology", choices=("repl", "group"), default="repl",
+                        help="repl = primary-repl (skenario 1), group = Group Replication (skenario 2)")
+    parser.add_argument("--replicas", default=None,
+                        help="Jumlah replica yang dicoba, dipisah koma (default: 0 sampai semua)")
+    parser.add_argument("--clients", type=int, default=CLIENTS)
+    parser.add_argument("--duration", type=float, default=DURATION, help="Detik per titik")
+    parser.add_argument("--read-ratio", type=float, default=READ_RATIO)
+    parser.add_argument("--read-your-writes", action="store_true",
+                        help="Setiap sesi menunggu GTID tulisan terakhirnya di replica sebelum membaca")
+    parser.add_argument("--max-lag", type=float, default=1.0, help="Lag maksimum (detik) replica yang boleh dibaca")
+    parser.add_argument("--seed-rows", type=int, default=SEED_ROWS)
+    parser.add_argument("--json", metavar="PATH", help="Simpan hasil per titik (JSON)")
+    parser.add_argument("--histogram-out", metavar="PATH", help="Simpan histogram latency (JSON)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    topology = replication_topology() if args.topology == "repl" else gr_topology()
+    (primary_name, primary_config), replicas = topology()
+    counts = ([int(c) for c in args.replicas.split(",")] if args.replicas
+              else list(range(len(replicas) + 1)))
+
+    payloads = PayloadPool(PAYLOAD_SIZE)
+    latency = LatencyRecorder()
+    setup_table(primary_config, args.seed_rows, payloads)
+    print(f"[INFO] Primary {primary_name}, replica tersedia: {', '.join(replicas) or '-'}")
+
+    results = []
+    for count in counts:
+        print(f"\n[RUN] {count} replica, {args.clients} klien, {args.read_ratio:.0%} baca, {args.duration:g} detik"
+              f"{' (read-your-writes)' if args.read_your_writes else ''}")
+        results.append(run_point(topology, count, args, payloads, latency))
+
+    print_results(results)
+    latency.print_report("Latency per Jumlah Replica")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] Hasil disimpan ke {args.json}")
+    if args.histogram_out:
+        latency.export(args.histogram_out)
+        print(f"[INFO] Histogram disimpan ke {args.histogram_out}")
+
+
+if __name__ == "__main__":
+    main()
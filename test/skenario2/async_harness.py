@@ -0,0 +1,396 @@
+import asyncio
+import argparse
+import functools
+import itertools
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mysql.connector import Error
+
+from pool import CONNECTION_LOST_ERRORS
+from topology import TOPOLOGY_ERRORS
+from test import DB_CONFIG, FAILOVER_MAX_WAIT, INSERT_QUERY, GroupReplicationFailoverTest, WORKLOAD_TARGET_RATE
+
+try:
+    import aiomysql
+except ImportError:  # optional: inserts fall back to the thread-pool driver
+    aiomysql = None
+
+# Constants
+ASYNC_CLIENTS = 1000  # concurrent client coroutines
+EXECUTOR_THREADS = 64  # threads for blocking mysql.connector inserts
+DB_CONNECTIONS = 64  # aiomysql connections per node; well below max_connections (151 by default)
+CONTROL_THREADS = 4  # threads for state checks and Docker calls, kept clear of the insert backlog
+WARMUP_INSERTS = 1000  # successful inserts before the primary is stopped
+POST_FAILOVER_INSERTS = 1000  # successful inserts on the new primary before recovery
+STATE_POLL_INTERVAL = 0.1  # seconds between cluster-state checks while waiting for an event
+PHASE_TIMEOUT = 120  # seconds before waiting for an event gives up
+
+
+class ExecutorInsertDriver:
+    """Run blocking mysql.connector inserts on the harness insert thread pool."""
+
+    name = "executor"
+
+    def __init__(self, harness: "AsyncFailoverTest"):
+        self.harness = harness
+
+    async def insert(self, node_name: str, params: Tuple) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.harness.executor, functools.partial(self._insert, node_name, params))
+
+    def _insert(self, node_name: str, params: Tuple) -> None:
+        pool = self.harness.pool
+        # Acquire errors propagate as-is: PoolExhaustedError has no errno, so a local
+        # backlog is not mistaken for a lost primary the way a failed connect (2003) is
+        conn = pool.acquire(node_name)
+        broken = False
+        try:
+            pool.prepared(conn, INSERT_QUERY).execute(INSERT_QUERY, params)
+            conn.commit()
+        except Error as e:
+            broken = True
+            pool.report_error(conn, e)
+            raise
+        finally:
+            pool.release(node_name, conn, discard=broken)
+
+    async def close(self) -> None:
+        pass
+
+
+class AiomysqlInsertDriver:
+    """Native asyncio inserts through aiomysql, one pool per node.
+
+    Each pool holds at most ``db_connections`` connections; client
+    coroutines beyond that wait in ``pool.acquire()`` instead of opening
+    more connections than the server allows (error 1040).
+    """
+
+    name = "aiomysql"
+
+    def __init__(self, harness: "AsyncFailoverTest"):
+        self.harness = harness
+        self._pools: Dict[str, Any] = {}
+        self._lock = asyncio.Lock()
+
+    async def _pool(self, node_name: str):
+        async with self._lock:
+            if node_name not in self._pools:
+                node = self.harness.nodes[node_name]
+                self._pools[node_name] = await aiomysql.create_pool(
+                    host=node['host'], port=node['port'],
+                    user=DB_CONFIG['user'], password=DB_CONFIG['password'], db=DB_CONFIG['database'],
+                    minsize=0, maxsize=self.harness.db_connections, autocommit=False
+                )
+            return self._pools[node_name]
+
+    async def insert(self, node_name: str, params: Tuple) -> None:
+        try:
+            pool = await self._pool(node_name)
+            async with pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(INSERT_QUERY, params)
+                await conn.commit()
+        except Exception as e:
+            # Translate PyMySQL errors so topology/pool error codes keep working
+            errno = e.args[0] if e.args and isinstance(e.args[0], int) else None
+            if errno in CONNECTION_LOST_ERRORS or errno is None:
+                await self._drop(node_name)
+            raise Error(msg=str(e), errno=errno) from e
+
+    async def _drop(self, node_name: str) -> None:
+        async with self._lock:
+            pool = self._pools.pop(node_name, None)
+        if pool:
+            pool.close()
+
+    async def close(self) -> None:
+        for node_name in list(self._pools):
+            pool = self._pools.pop(node_name)
+            pool.close()
+            await pool.wait_closed()
+
+
+class AsyncFailoverTest(GroupReplicationFailoverTest):
+    """Asyncio version of the failover test.
+
+    Phases advance when the cluster reaches the next state (warm-up inserts
+    done, new primary elected, mysqld accepting connections, member ONLINE,
+    GTID sets converged) instead of after fixed sleeps. Workload counters are
+    only touched from the event loop thread, so they need no locking, and the
+    open-loop clients are coroutines, so thousands of them fit in one process.
+    """
+
+    def __init__(self, compose_file_path: str = "/home/reynaldineo/sister/fp/group/docker-compose.yaml",
+                 target_rate: float = WORKLOAD_TARGET_RATE, clients: int = ASYNC_CLIENTS,
+                 executor_threads: int = EXECUTOR_THREADS, histogram_path: Optional[str] = None,
+                 driver: str = "auto", db_connections: int = DB_CONNECTIONS):
+        super().__init__(compose_file_path, target_rate=target_rate,
+                         workers=min(clients, executor_threads), histogram_path=histogram_path)
+        self.clients = clients
+        self.db_connections = db_connections
+        self.executor = ThreadPoolExecutor(max_workers=executor_threads, thread_name_prefix="insert")
+        # Separate pool so phase checks are not queued behind inserts hanging on a dead primary
+        self.control_executor = ThreadPoolExecutor(max_workers=CONTROL_THREADS, thread_name_prefix="control")
+        self.driver_name = driver
+        self.driver = None
+        self.phase_timeline: List[Tuple[str, float, Optional[float]]] = []
+        self._test_started = 0.0
+        self._milestones: List[Tuple[int, asyncio.Event]] = []
+
+    async def call(self, fn: Callable, *args) -> Any:
+        """Run a blocking control-plane harness method (state check, Docker call) off the loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.control_executor, functools.partial(fn, *args))
+
+    def _make_driver(self):
+        if self.driver_name == "aiomysql" or (self.driver_name == "auto" and aiomysql is not None):
+            if aiomysql is None:
+                raise RuntimeError("aiomysql is not installed")
+            return AiomysqlInsertDriver(self)
+        return ExecutorInsertDriver(self)
+
+    # --- Event waits -----------------------------------------------------
+
+    def _mark(self, name: str, duration: Optional[float], announce: bool = True) -> None:
+        """Record when a phase transition happened and how long it took to reach."""
+        self.phase_timeline.append((name, time.perf_counter() - self._test_started, duration))
+        if not announce:
+            return
+        if duration is None:
+            print(f"\n❌ Gave up waiting for '{name}'")
+        else:
+            print(f"\n✅ {name} after {duration:.3f}s")
+
+    async def wait_for_state(self, name: str, check: Callable[[], Any],
+                             timeout: float = PHASE_TIMEOUT) -> Any:
+        """Poll a blocking state check on the pool until it returns something truthy."""
+        started = time.perf_counter()
+        while time.perf_counter() - started < timeout:
+            result = await self.call(check)
+            if result:
+                self._mark(name, time.perf_counter() - started)
+                return result
+            await asyncio.sleep(STATE_POLL_INTERVAL)
+        self._mark(name, None)
+        return None
+
+    async def wait_for_inserts(self, name: str, count: int, timeout: float = PHASE_TIMEOUT) -> bool:
+        """Wait until ``count`` more inserts have succeeded."""
+        target = self.workload_stats['successful_inserts'] + count
+        event = asyncio.Event()
+        self._milestones.append((target, event))
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            self._mark(name, None)
+            return False
+        self._mark(name, time.perf_counter() - started)
+        return True
+
+    def _new_primary_elected(self, old_primary: str) -> Optional[str]:
+        primary_node, _ = self.get_primary_node()
+        return primary_node if primary_node and primary_node != old_primary else None
+
+    def _gtids_converged(self) -> bool:
+        gtid_sets = set()
+        for node_name in self.nodes:
+            try:
+                with self.get_connection(node_name, silent=True, pool=self.probe_pool) as conn:
+                    if not conn:
+                        return False
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT @@GLOBAL.gtid_executed")
+                        gtid_sets.add("".join(cursor.fetchone()[0].split()))
+            except Error:
+                # A failed read is not convergence; the next poll tries again
+                return False
+        return len(gtid_sets) == 1
+
+    # --- Workload ---------------------------------------------------------
+
+    async def run_workload(self) -> None:
+        print(f"\n🔄 Starting async workload ({self.target_rate:g} TPS target, "
+              f"{self.clients} clients, {self.driver.name} driver)...")
+        slots = itertools.count()
+        start = time.perf_counter()
+        self.workload_started_at = time.time()
+        await asyncio.gather(*(self._client(slots, start) for _ in range(self.clients)))
+        self.workload_stopped_at = time.time()
+
+    async def _client(self, slots: itertools.count, start: float) -> None:
+        interval = 1.0 / self.target_rate
+        while self.workload_running:
+            slot = next(slots)
+            intended_start = start + slot * interval
+            delay = intended_start - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                if not self.workload_running:
+                    break
+            await self._async_step(slot)
+            self._record_latency(slot, time.perf_counter() - intended_start, max(0.0, -delay))
+
+    async def _async_step(self, seq: int) -> None:
+        stats = self.workload_stats
+        stats['total_attempts'] += 1
+
+        primary_node = self.topology.primary()
+        if not primary_node:
+            self._async_failure('no_primary', primary_lost=True)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.driver.insert(primary_node, self._insert_params(seq))
+        except Error as e:
+            self.topology.report_error(e)
+            self._async_failure(f'error_{e.errno if e.errno else "unknown"}',
+                                primary_lost=e.errno in TOPOLOGY_ERRORS)
+            return
+
+        self.latency.record('insert', time.perf_counter() - started)
+        stats['successful_inserts'] += 1
+        self._async_success()
+        self._log_progress(seq)
+
+    def _async_failure(self, error_type: str, primary_lost: bool = False) -> None:
+        self.workload_stats['failed_inserts'] += 1
+        self.workload_stats['errors'][error_type] += 1
+        # Only losing the primary starts the failover clock, not e.g. a duplicate key or pool timeout
+        if primary_lost and not self.failover_detected:
+            self.failover_detected = True
+            self.failover_start_time = time.time()
+            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+            print(f"\n⚠️  FAILOVER DETECTED at {timestamp}")
+
+    def _async_success(self) -> None:
+        successes = self.workload_stats['successful_inserts']
+        for target, event in list(self._milestones):
+            if successes >= target:
+                event.set()
+                self._milestones.remove((target, event))
+        if self.failover_detected and not self.failover_end_time:
+            self._check_failover_recovery()
+
+    # --- Orchestration ----------------------------------------------------
+
+    async def run(self) -> None:
+        """Execute the failover test, advancing on cluster events."""
+        self._test_started = time.perf_counter()
+        self._print_test_header()
+        self.driver = self._make_driver()
+
+        primary_node = await self.call(self._validate_initial_state)
+        if not primary_node:
+            return
+
+        print("\n📋 Step 3: Setup test database")
+        if not await self.call(self.setup_test_database):
+            return
+
+        print("\n📋 Step 4: Start continuous workload")
+        await self.call(self.topology.start)
+        self.workload_running = True
+        workload = asyncio.create_task(self.run_workload())
+
+        try:
+            await self.wait_for_inserts("workload warmed up", WARMUP_INSERTS)
+            await self._async_failover(primary_node)
+            await self.wait_for_inserts("post-failover workload", POST_FAILOVER_INSERTS)
+            await self._async_recover(self.nodes[primary_node]['container'], primary_node)
+        finally:
+            print("\n📋 Step 8: Stopping workload")
+            self.workload_running = False
+            await workload
+            await self.call(self.topology.stop)
+            await self.driver.close()
+
+        print("\n📋 Step 9: Verify data consistency")
+        await self.wait_for_state("GTID sets converged", self._gtids_converged)
+        self.display_final_stats()
+        self._print_phase_timeline()
+        await self.call(self.verify_data_consistency)
+
+        self.pool.close_all()
+        self.probe_pool.close_all()
+        self.probe.shutdown()
+        self.executor.shutdown(wait=False)
+        self.control_executor.shutdown(wait=False)
+
+        print("\n" + "="*80)
+        print("✅ TEST COMPLETED")
+        print("="*80 + "\n")
+
+    async def _async_failover(self, primary_node: str) -> Optional[str]:
+        print("\n📋 Step 5: Simulate PRIMARY node failure")
+        print(f"\n⚠️  Stopping PRIMARY node: {primary_node}")
+        self.latency.set_phase("election")
+        injected_at = time.perf_counter()
+        stopping = asyncio.create_task(self.call(self.stop_container, self.nodes[primary_node]['container']))
+
+        print("\n📋 Step 6: Observe failover process")
+        new_primary = await self.wait_for_state(
+            "new primary elected", functools.partial(self._new_primary_elected, primary_node),
+            timeout=FAILOVER_MAX_WAIT)
+        if new_primary:
+            self.election_duration = time.perf_counter() - injected_at
+            print(f"✅ NEW PRIMARY ELECTED: {new_primary} (Port: {self.nodes[new_primary]['port']})")
+        await stopping
+        self.latency.set_phase("post-failover")
+        return new_primary
+
+    async def _async_recover(self, container_name: str, node_name: str) -> None:
+        print("\n📋 Step 7: Restart old primary node")
+        self.latency.set_phase("rejoin")
+        if not await self.call(self.recreate_container, container_name):
+            return
+        # Readiness polls with backoff and logs each phase itself
+        readiness = await self.call(self.wait_until_ready, node_name)
+        for phase, duration in readiness.phases:
+            self._mark(f"{node_name} {phase}", duration, announce=False)
+
+    def _print_phase_timeline(self) -> None:
+        print(f"\n🗓️  Phase Timeline:")
+        for name, at, duration in self.phase_timeline:
+            took = f"{duration:.3f}s" if duration is not None else "timed out"
+            print(f"  +{at:8.3f}s  {name:<32} {took}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Asyncio MySQL Group Replication primary failover test")
+    parser.add_argument("--rate", type=float, default=WORKLOAD_TARGET_RATE,
+                        help="target inserts per second for the open-loop workload")
+    parser.add_argument("--clients", type=int, default=ASYNC_CLIENTS,
+                        help="number of concurrent client coroutines")
+    parser.add_argument("--executor-threads", type=int, default=EXECUTOR_THREADS,
+                        help="threads for blocking inserts with the executor driver")
+    parser.add_argument("--driver", choices=("auto", "executor", "aiomysql"), default="auto",
+                        help="insert driver (auto uses aiomysql when installed)")
+    parser.add_argument("--db-connections", type=int, default=DB_CONNECTIONS,
+                        help="aiomysql connections per node; clients queue for them")
+    parser.add_argument("--histogram-out", metavar="PATH",
+                        help="export per-phase latency histograms to this JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        test = AsyncFailoverTest(target_rate=args.rate, clients=args.clients,
+                                 executor_threads=args.executor_threads,
+                                 histogram_path=args.histogram_out, driver=args.driver,
+                                 db_connections=args.db_connections)
+        asyncio.run(test.run())
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test interrupted by user")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import mysql.connector
+from mysql.connector import Error
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from readiness import CONNECT_TIMEOUT, NodeReadiness, READY_TIMEOUT, gtid_count
+from test import GroupReplicationFailoverTest
+
+BACKLOG_SIZES = (1000, 10000, 100000)  # transactions built while the node is down
+PAYLOAD_BYTES = 1024  # payload bytes per row
+ROWS_PER_TRANSACTION = 1
+SAMPLE_INTERVAL = 0.25  # seconds between catch-up samples on the rejoining node
+CATCH_UP_TIMEOUT = 1800  # seconds
+BACKLOG_TABLE = "catchup_backlog"
+
+# Plugin already installed
+PLUGIN_EXISTS_ERRORS = {1125}
+
+
+class CatchUpBenchmark:
+    """Measure how fast a restarted member applies the backlog built while it was down.
+
+    For each backlog size a SECONDARY is stopped, N transactions of M bytes
+    are committed on the primary, and the node is recreated. From the moment
+    mysqld accepts connections the node's ``gtid_executed`` is sampled until
+    it contains the group's ``gtid_executed`` as of the end of the backlog;
+    each sample gives the applier's transactions/s and bytes/s. The recovery
+    path (incremental or clone) comes from :class:`NodeReadiness`.
+    """
+
+    def __init__(self, payload_bytes: int = PAYLOAD_BYTES, rows_per_transaction: int = ROWS_PER_TRANSACTION,
+                 clone_threshold: Optional[int] = None, compose_file_path: Optional[str] = None):
+        kwargs = {'compose_file_path': compose_file_path} if compose_file_path else {}
+        self.harness = GroupReplicationFailoverTest(**kwargs)
+        self.payload = os.urandom(payload_bytes)  # incompressible, so bytes applied ~ bytes written
+        self.rows_per_transaction = rows_per_transaction
+        self.transaction_bytes = payload_bytes * rows_per_transaction
+        self.clone_threshold = clone_threshold
+        # node -> (global value, persisted value or None) before _enable_clone
+        self.saved_clone_threshold: Dict[str, Any] = {}
+        self.results: List[Dict[str, Any]] = []
+
+    # --- Setup --------------------------------------------------------------
+
+    def setup(self) -> bool:
+        primary_node, _ = self.harness.get_primary_node()
+        if not primary_node:
+            print("❌ No primary node found!")
+            return False
+        database = self.harness.db_config['database']
+        conn = self._connect(primary_node, database=None)
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {database}.{BACKLOG_TABLE} (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    payload LONGBLOB NOT NULL
+                ) ENGINE=InnoDB
+            """)
+        conn.close()
+        if self.clone_threshold is not None:
+            self._enable_clone()
+        return True
+
+    def _enable_clone(self) -> None:
+        """Load the clone plugin everywhere and lower the joiner's clone threshold."""
+        for node_name in self.harness.nodes:
+            conn = self._connect(node_name)
+            with conn.cursor() as cursor:
+                try:
+                    cursor.execute("INSTALL PLUGIN clone SONAME 'mysql_clone.so'")
+                except Error as e:
+                    if e.errno not in PLUGIN_EXISTS_ERRORS:
+                        raise
+                cursor.execute("SELECT @@GLOBAL.group_replication_clone_threshold")
+                (current,) = cursor.fetchone()
+                cursor.execute("SELECT VARIABLE_VALUE FROM performance_schema.persisted_variables "
+                               "WHERE VARIABLE_NAME = 'group_replication_clone_threshold'")
+                row = cursor.fetchone()
+                self.saved_clone_threshold.setdefault(node_name, (current, row[0] if row else None))
+                cursor.execute("SET PERSIST group_replication_clone_threshold = %s", (self.clone_threshold,))
+            conn.close()
+        print(f"✅ Clone plugin loaded, group_replication_clone_threshold = {self.clone_threshold}")
+
+    def restore_clone_threshold(self) -> None:
+        """Put back the clone threshold (and its persisted setting) that _enable_clone replaced."""
+        if not self.saved_clone_threshold:
+            return
+        for node_name, (current, persisted) in list(self.saved_clone_threshold.items()):
+            try:
+                conn = self._connect(node_name)
+                with conn.cursor() as cursor:
+                    if persisted is None:
+                        cursor.execute("SET GLOBAL group_replication_clone_threshold = %s", (int(current),))
+                        cursor.execute("RESET PERSIST IF EXISTS group_replication_clone_threshold")
+                    else:
+                        cursor.execute("SET PERSIST group_replication_clone_threshold = %s", (int(persisted),))
+                conn.close()
+                del self.saved_clone_threshold[node_name]
+            except Error as e:
+                print(f"⚠️  Could not restore group_replication_clone_threshold on {node_name}: {e}")
+        if not self.saved_clone_threshold:
+            print("✅ group_replication_clone_threshold restored")
+
+    def _connect(self, node_name: str, database: Optional[str] = None):
+        node = self.harness.nodes[node_name]
+        return mysql.connector.connect(
+            host=node['host'],
+            port=node['port'],
+            user=self.harness.db_config['user'],
+            password=self.harness.db_config['password'],
+            database=database,
+            autocommit=True,
+            connection_timeout=CONNECT_TIMEOUT
+        )
+
+    # --- One run -------------------------------------------------------------
+
+    def run_once(self, backlog: int) -> Optional[Dict[str, Any]]:
+        primary_node, _ = self.harness.get_primary_node()
+        if not primary_node:
+            print("❌ No primary node found!")
+            return None
+        victim = next(name for name in self.harness.nodes if name != primary_node)
+        container = self.harness.nodes[victim]['container']
+
+        print(f"\n{'='*80}")
+        print(f"📦 Backlog {backlog} transactions x {self.transaction_bytes} bytes "
+              f"(stopping {victim}, primary {primary_node})")
+        print(f"{'='*80}")
+
+        self.harness.stop_container(container)
+        down_at = time.perf_counter()
+        build_s = self._build_backlog(primary_node, backlog)
+        target_gtid = self._gtid_executed(primary_node)
+
+        self.harness.recreate_container(container)
+        restarted_at = time.perf_counter()
+
+        readiness = NodeReadiness(victim, self.harness.nodes[victim], self.harness.db_config['user'],
+                                  self.harness.db_config['password'], timeout=READY_TIMEOUT)
+        waiter = threading.Thread(target=readiness.wait, daemon=True)
+        waiter.start()
+        samples = self._sample_catch_up(victim, target_gtid, backlog)
+        waiter.join()
+
+        result = self._summarize(backlog, samples, readiness)
+        result.update({
+            'node': victim,
+            'build_s': build_s,
+            'down_s': restarted_at - down_at
+        })
+        self._print_result(result)
+        self.results.append(result)
+        return result
+
+    def _build_backlog(self, primary_node: str, backlog: int) -> float:
+        conn = self._connect(primary_node, database=self.harness.db_config['database'])
+        conn.autocommit = False
+        rows = [(self.payload,)] * self.rows_per_transaction
+        query = f"INSERT INTO {BACKLOG_TABLE} (payload) VALUES (%s)"
+        started = time.perf_counter()
+        with conn.cursor() as cursor:
+            for i in range(backlog):
+                cursor.executemany(query, rows)
+                conn.commit()
+                if (i + 1) % max(1, backlog // 10) == 0:
+                    print(f"  ... {i + 1}/{backlog} transactions")
+        elapsed = time.perf_counter() - started
+        conn.close()
+        print(f"✅ Backlog built in {elapsed:.2f}s ({backlog / elapsed:.0f} TPS)")
+        return elapsed
+
+    def _gtid_executed(self, node_name: str) -> str:
+        conn = self._connect(node_name)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT @@GLOBAL.gtid_executed")
+            gtid_set = cursor.fetchone()[0]
+        conn.close()
+        return gtid_set
+
+    def _sample_catch_up(self, node_name: str, target_gtid: str, backlog: int) -> List[Dict[str, float]]:
+        """Sample (time, transactions still missing) until the node holds ``target_gtid``."""
+        samples: List[Dict[str, float]] = []
+        conn = None
+        started = time.perf_counter()
+        deadline = started + CATCH_UP_TIMEOUT
+        while time.perf_counter() < deadline:
+            try:
+                if conn is None:
+                    conn = self._connect(node_name)
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT GTID_SUBTRACT(%s, @@GLOBAL.gtid_executed)", (target_gtid,))
+                    missing = gtid_count(cursor.fetchone()[0])
+            except Error:
+                # Not accepting connections yet, or restarting after a clone
+                conn = None
+                time.sleep(SAMPLE_INTERVAL)
+                continue
+
+            samples.append({'t': time.perf_counter() - started, 'missing': missing})
+            if len(samples) == 1 or missing == 0 or len(samples) % 20 == 0:
+                print(f"  ⏳ {node_name}: {missing}/{backlog} transactions left")
+            if missing == 0:
+                break
+            time.sleep(SAMPLE_INTERVAL)
+        if conn is not None:
+            conn.close()
+        return samples
+
+    def _summarize(self, backlog: int, samples: List[Dict[str, float]],
+                   readiness: NodeReadiness) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            'backlog_transactions': backlog,
+            'backlog_bytes': backlog * self.transaction_bytes,
+            'path': readiness.recovery['path'],
+            'phases': {phase: duration for phase, duration in readiness.phases},
+            'caught_up': bool(samples) and samples[-1]['missing'] == 0,
+            'catch_up_s': None,
+            'avg_tps': None,
+            'peak_tps': None,
+            'avg_bytes_per_s': None
+        }
+        if len(samples) < 2:
+            return result
+
+        first, last = samples[0], samples[-1]
+        applied = first['missing'] - last['missing']
+        elapsed = last['t'] - first['t']
+        rates = [
+            (a['missing'] - b['missing']) / (b['t'] - a['t'])
+            for a, b in zip(samples, samples[1:]) if b['t'] > a['t']
+        ]
+        # Time from the container restart until nothing is missing
+        result['catch_up_s'] = last['t'] if result['caught_up'] else None
+        if elapsed > 0:
+            result['avg_tps'] = applied / elapsed
+            result['avg_bytes_per_s'] = result['avg_tps'] * self.transaction_bytes
+        result['peak_tps'] = max(rates) if rates else None
+        return result
+
+    def _print_result(self, result: Dict[str, Any]) -> None:
+        def fmt(value: Optional[float], unit: str = "") -> str:
+            return f"{value:,.1f}{unit}" if value is not None else "n/a"
+
+        print(f"\n⏱️  Catch-up of {result['node']} ({result['path'] or 'unknown'} recovery):")
+        for phase, duration in result['phases'].items():
+            print(f"  {phase:<32} {fmt(duration, 's')}")
+        print(f"  Caught up: {'yes' if result['caught_up'] else 'NO'} after {fmt(result['catch_up_s'], 's')}")
+        mb_per_s = result['avg_bytes_per_s'] / 1024 / 1024 if result['avg_bytes_per_s'] else None
+        print(f"  Applier: avg {fmt(result['avg_tps'])} TPS, peak {fmt(result['peak_tps'])} TPS, "
+              f"{fmt(mb_per_s, ' MB/s')}")
+
+    # --- Sweep ---------------------------------------------------------------
+
+    def sweep(self, backlogs: List[int]) -> List[Dict[str, Any]]:
+        for backlog in backlogs:
+            if self.run_once(backlog) is None:
+                break
+        self.print_summary()
+        return self.results
+
+    def print_summary(self) -> None:
+        print(f"\n{'='*80}")
+        print("📈 CATCH-UP SWEEP")
+        print(f"{'='*80}")
+        print(f"{'Backlog':>10} {'MB':>10} {'Path':<12} {'Catch-up s':>11} {'Avg TPS':>10} {'MB/s':>8}")
+        for r in self.results:
+            mb_per_s = r['avg_bytes_per_s'] / 1024 / 1024 if r['avg_bytes_per_s'] else 0.0
+            catch_up = f"{r['catch_up_s']:.2f}" if r['catch_up_s'] is not None else "timeout"
+            print(f"{r['backlog_transactions']:>10} {r['backlog_bytes'] / 1024 / 1024:>10.1f} "
+                  f"{str(r['path']):<12} {catch_up:>11} {r['avg_tps'] or 0:>10.0f} {mb_per_s:>8.2f}")
+
+        switch = next((r for r in self.results if r['path'] == 'clone'), None)
+        if switch:
+            print(f"\nRecovery switched to clone at a backlog of {switch['backlog_transactions']} transactions")
+        else:
+            print("\nAll runs recovered incrementally")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure rejoin catch-up throughput for growing backlogs")
+    parser.add_argument("--backlogs", default=",".join(map(str, BACKLOG_SIZES)),
+                        help="comma-separated backlog sizes in transactions")
+    parser.add_argument("--payload-bytes", type=int, default=PAYLOAD_BYTES, help="bytes per row")
+    parser.add_argument("--rows-per-transaction", type=int, default=ROWS_PER_TRANSACTION)
+    parser.add_argument("--clone-threshold", type=int,
+                        help="load the clone plugin and set group_replication_clone_threshold")
+    parser.add_argument("--json", metavar="PATH", help="write per-run results to this JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchmark = CatchUpBenchmark(args.payload_bytes, args.rows_per_transaction, args.clone_threshold)
+    try:
+        if not benchmark.setup():
+            sys.exit(1)
+        benchmark.sweep([int(size) for size in args.backlogs.split(",")])
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Benchmark interrupted by user")
+    finally:
+        benchmark.restore_clone_threshold()
+        benchmark.harness.pool.close_all()
+        benchmark.harness.probe_pool.close_all()
+        benchmark.harness.probe.shutdown()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(benchmark.results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1021 @@
+import mysql.connector
+from mysql.connector import Error
+import argparse
+import random
+import re
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+GROUP_NAME = "aaaaaaaa-bbbb-cccc-dddd-eeeeffff0000"  # loose-group_replication_group_name in node*.cnf
+CLUSTER_NETWORK = "group_mysql-cluster"
+MEMBER_VERSION = "8.0.36"
+ELECTION_DELAY = 0.5  # seconds from losing the primary to a new one taking writes
+EXPEL_DELAY = 1.0  # seconds an unreachable member stays in the majority's view
+STARTUP_DELAY = 0.2  # seconds before a started mysqld accepts connections
+RECOVERY_DELAY = 0.5  # seconds a (re)joining member spends RECOVERING
+APPLY_LAG = 0.0  # seconds before a secondary applies a transaction
+HANG_TIMEOUT = 2.0  # seconds a statement to an unreachable node hangs without a read timeout
+ACK_LOSS = 0.0  # fraction of commits whose acknowledgement is lost after they committed
+FLOW_CONTROL_THRESHOLD = 25000
+# connect() arguments the C extension (_mysql_connector) only accepts as int
+INT_CONNECT_ARGS = ('port', 'connection_timeout')
+
+# Client errno values the harness already handles
+ER_NOT_SUPPORTED_YET = 1235
+ER_DUP_ENTRY = 1062
+ER_OPTION_PREVENTS_STATEMENT = 1290  # super_read_only on a secondary
+ER_NO_SUCH_TABLE = 1146
+ER_GR_ALREADY_RUNNING = 3093
+ER_TRANSACTION_ROLLBACK_DURING_COMMIT = 3101
+CR_CONN_HOST_ERROR = 2003
+CR_SERVER_LOST = 2013
+
+MEMBER_COLUMNS = ('CHANNEL_NAME', 'MEMBER_ID', 'MEMBER_HOST', 'MEMBER_PORT', 'MEMBER_STATE',
+                  'MEMBER_ROLE', 'MEMBER_VERSION')
+
+Row = Dict[str, Any]
+
+
+def _check_connect_args(kwargs: Dict[str, Any]) -> None:
+    """Reject argument types the C extension rejects, so the fake fails where a real node would."""
+    for name in INT_CONNECT_ARGS:
+        value = kwargs.get(name)
+        if value is not None and not isinstance(value, int):
+            raise TypeError(f"{name}: argument must be int, not {type(value).__name__}")
+
+
+class FakeTable:
+    """Rows of one user table on one node, keyed by primary key."""
+
+    def __init__(self, columns: List[str], key: str, defaults: Dict[str, str],
+                 unique: Sequence[Tuple[str, Tuple[str, ...]]] = ()):
+        self.columns = columns
+        self.key = key
+        self.defaults = defaults  # column -> 'now' for CURRENT_TIMESTAMP defaults
+        self.unique = list(unique)  # (index name, columns) of UNIQUE keys
+        self.unique_values: Dict[str, set] = {name: set() for name, _ in self.unique}
+        self.rows: Dict[int, Row] = {}
+        self.auto_increment = 1
+
+    def duplicate(self, row: Row, pending: Sequence[Row] = ()) -> Optional[Tuple[str, Tuple]]:
+        """The (index, value) a new ``row`` would duplicate, checking ``pending`` rows too."""
+        for name, columns in self.unique:
+            value = tuple(row.get(c) for c in columns)
+            if value in self.unique_values[name] or any(
+                    tuple(other.get(c) for c in columns) == value for other in pending):
+                return name, value
+        return None
+
+    def store(self, key: int, row: Row) -> None:
+        self.rows[key] = row
+        self.auto_increment = max(self.auto_increment, key + 1)
+        for name, columns in self.unique:
+            self.unique_values[name].add(tuple(row.get(c) for c in columns))
+
+
+class FakeNode:
+    """One simulated mysqld: process state, group membership and its copy of the data."""
+
+    def __init__(self, name: str, host: str, port: int, container: str, index: int):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.container = container
+        self.uuid = f"00000000-0000-0000-0000-{index:012d}"
+        self.up = True
+        self.boot = 0  # bumped on every stop/start so old connections break
+        self.accepting_at = 0.0
+        self.gr_running = True
+        self.recovering_until: Optional[float] = None
+        self.unreachable_since: Optional[float] = None
+        self.isolated = False
+        self.isolate_clients = True
+        self.frozen_view: List[Tuple[str, str]] = []  # (member, role) seen when isolated
+        self.tables: Dict[str, FakeTable] = {}
+        self.applied = 0  # entries of the group log applied here
+        self.proposed = 0
+
+
+class FakeGroupCluster:
+    """In-process stand-in for a three-node single-primary Group Replication group.
+
+    Every node keeps its own tables and applies a shared, ordered log of
+    committed transactions (and DDL); the primary applies at commit, ONLINE
+    secondaries ``apply_lag`` seconds later, and a joining member applies the
+    backlog when it leaves RECOVERING. Membership follows the real protocol
+    closely enough for the harness: a gracefully stopped member leaves at
+    once, a killed or partitioned one shows UNREACHABLE for ``expel_delay``
+    seconds (only while the rest still has a majority), and a new primary is
+    elected ``election_delay`` seconds after the old one left the group.
+
+    Connections come from ``connect`` or, inside ``install()``, from
+    ``mysql.connector.connect`` for the nodes' host/port. They understand the
+    statements the failover harness, readiness, flow-control and checksum
+    code send and raise the same ``mysql.connector.Error`` codes as a real
+    group: 1290 for writes on a secondary, 3101 for a commit whose primary
+    was demoted, 2003/2013 for a stopped node, and a hang up to the read
+    timeout for a node cut off by a partition. State changes are computed
+    lazily from timestamps on every statement, so no background threads run.
+    """
+
+    def __init__(self, nodes: Dict[str, Dict[str, Any]], election_delay: float = ELECTION_DELAY,
+                 expel_delay: float = EXPEL_DELAY, startup_delay: float = STARTUP_DELAY,
+                 recovery_delay: float = RECOVERY_DELAY, apply_lag: float = APPLY_LAG,
+                 latency: float = 0.0, hang_timeout: float = HANG_TIMEOUT, ack_loss: float = ACK_LOSS,
+                 seed: Optional[int] = None):
+        self.election_delay = election_delay
+        self.expel_delay = expel_delay
+        self.startup_delay = startup_delay
+        self.recovery_delay = recovery_delay
+        self.apply_lag = apply_lag
+        self.latency = latency  # seconds of simulated round trip per statement
+        self.hang_timeout = hang_timeout
+        self.ack_loss = ack_loss
+        self._rng = random.Random(seed)
+        self.nodes: Dict[str, FakeNode] = {
+            name: FakeNode(name, config['host'], config['port'], config.get('container', name), i + 1)
+            for i, (name, config) in enumerate(nodes.items())
+        }
+        self._by_address = {(node.host, node.port): node for node in self.nodes.values()}
+        self._by_container = {node.container: node for node in self.nodes.values()}
+        self._lock = threading.RLock()
+        self._log: List[Tuple[float, str, Tuple]] = []  # (committed_at, kind, payload)
+        self._group: Dict[str, FakeNode] = dict(self.nodes)
+        self.primary: Optional[str] = next(iter(self.nodes), None)
+        self._primary_lost_at: Optional[float] = None
+        self.events: List[Tuple[float, str]] = []  # (perf_counter, description)
+        self.statements = 0
+
+    # --- Faults ---------------------------------------------------------------
+
+    def stop(self, name: str) -> None:
+        """Graceful shutdown: the member leaves the group before mysqld exits."""
+        with self._lock:
+            node = self._node(name)
+            if not node.up:
+                return
+            self._leave(node, time.perf_counter())
+            self._shutdown(node)
+            self._event(f"{node.name} stopped")
+
+    def kill(self, name: str) -> None:
+        """SIGKILL: mysqld disappears and the group notices only when it stops answering."""
+        with self._lock:
+            node = self._node(name)
+            if not node.up:
+                return
+            self._shutdown(node)
+            if node.name in self._group:
+                node.unreachable_since = time.perf_counter()
+            self._event(f"{node.name} killed")
+
+    def start(self, name: str) -> None:
+        """Start mysqld; with start_on_boot the member rejoins through RECOVERING."""
+        with self._lock:
+            node = self._node(name)
+            if node.up:
+                return
+            now = time.perf_counter()
+            node.up = True
+            node.boot += 1
+            node.accepting_at = now + self.startup_delay
+            node.gr_running = True
+            if node.name in self._group:
+                # Restarted before it was expelled: the old incarnation goes first
+                self._leave(node, now)
+            self._join(node, node.accepting_at)
+            self._event(f"{node.name} started")
+
+    def partition(self, names: Sequence[str], isolate_clients: bool = True) -> None:
+        """Cut nodes off the group network; ``isolate_clients`` also hides them from clients
+        (like a container disconnected from the network its ports are published on)."""
+        with self._lock:
+            now = time.perf_counter()
+            self._advance(now)
+            for name in names:
+                node = self._node(name)
+                node.frozen_view = [(m.name, self._role(m)) for m in self._group.values()]
+                node.isolated = True
+                node.isolate_clients = isolate_clients
+                if node.name in self._group and node.unreachable_since is None:
+                    node.unreachable_since = now
+                self._event(f"{node.name} partitioned")
+
+    def heal(self, names: Sequence[str]) -> None:
+        """Reconnect partitioned nodes; expelled members rejoin through RECOVERING."""
+        with self._lock:
+            now = time.perf_counter()
+            self._advance(now)
+            for name in names:
+                node = self._node(name)
+                if not node.isolated:
+                    continue
+                node.isolated = False
+                if node.up and node.gr_running and node.name not in self._group:
+                    self._join(node, now)
+                self._event(f"{node.name} reconnected")
+
+    def member_states(self) -> Dict[str, str]:
+        """Each node's own MEMBER_STATE (or DOWN), for reports and assertions."""
+        with self._lock:
+            self._advance(time.perf_counter())
+            return {name: self._self_state(node) if node.up else 'DOWN' for name, node in self.nodes.items()}
+
+    # --- Connections ------------------------------------------------------------
+
+    def connect(self, name: str, **kwargs) -> "FakeConnection":
+        _check_connect_args(kwargs)
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            node = self._node(name)
+            now = time.perf_counter()
+            if not node.up or now < node.accepting_at:
+                raise Error(msg=f"Can't connect to MySQL server on '{node.host}:{node.port}'",
+                            errno=CR_CONN_HOST_ERROR)
+            unreachable = node.isolated and node.isolate_clients
+        if unreachable:
+            self._hang(kwargs.get('connection_timeout'))
+            raise Error(msg=f"Can't connect to MySQL server on '{node.host}:{node.port}' (timed out)",
+                        errno=CR_CONN_HOST_ERROR)
+        return FakeConnection(self, node, node.boot, autocommit=kwargs.get('autocommit', False),
+                              timeout=kwargs.get('connection_timeout'))
+
+    @contextmanager
+    def install(self) -> Iterator["FakeGroupCluster"]:
+        """Route ``mysql.connector.connect`` for the nodes' host/port to this cluster."""
+        original = mysql.connector.connect
+
+        def connect(*args, **kwargs):
+            node = self._by_address.get((kwargs.get('host'), kwargs.get('port', 3306)))
+            if node is None:
+                return original(*args, **kwargs)
+            return self.connect(node.name, **kwargs)
+
+        mysql.connector.connect = connect
+        try:
+            yield self
+        finally:
+            mysql.connector.connect = original
+
+    def _hang(self, timeout: Optional[float]) -> None:
+        time.sleep(timeout if timeout is not None else self.hang_timeout)
+
+    # --- Statement execution ----------------------------------------------------
+
+    def execute(self, conn: "FakeConnection", query: str, params: Sequence[Any]) -> Tuple[List[str], List[tuple]]:
+        """Run one statement on ``conn``'s node; returns (column names, rows)."""
+        if self.latency:
+            time.sleep(self.latency)
+        sql = " ".join(query.split()).rstrip(";")
+        self._check_alive(conn)
+        with self._lock:
+            self.statements += 1
+            self._advance(time.perf_counter())
+            handled = next(((handler, match) for pattern, handler in self._handlers
+                            for match in [pattern.match(sql)] if match), None)
+            if handled is None:
+                raise Error(msg=f"Statement not supported by the fake cluster: {sql[:80]}",
+                            errno=ER_NOT_SUPPORTED_YET)
+            handler, match = handled
+            result = handler(self, conn, match, list(params or ()))
+        # DDL commits implicitly; the commit may hang, so it runs without the lock
+        if conn.pending and (conn.autocommit or any(kind != 'insert' for kind, _ in conn.pending)):
+            self.commit(conn)
+        return result
+
+    def commit(self, conn: "FakeConnection") -> None:
+        self._check_alive(conn)
+        pending, conn.pending = conn.pending, []
+        if not pending:
+            return
+        with self._lock:
+            now = time.perf_counter()
+            self._advance(now)
+            node = conn.node
+            hang = node.isolated and self._thinks_primary(node)
+            if not hang:
+                if self.primary != node.name or node.name not in self._group:
+                    raise Error(msg="Plugin instructed the server to rollback the current transaction.",
+                                errno=ER_TRANSACTION_ROLLBACK_DURING_COMMIT)
+                self._check_unique(node, pending)
+                for kind, payload in pending:
+                    self._log.append((now, kind, payload))
+                    node.proposed += 1
+                self._apply(node, len(self._log))
+                lost = self.ack_loss and self._rng.random() < self.ack_loss
+                if not lost:
+                    return
+        if not hang:
+            # Committed in the group, but the client never hears back
+            raise Error(msg="Lost connection to MySQL server during query", errno=CR_SERVER_LOST)
+        # A primary without a majority cannot certify: the commit waits for a quorum that never comes
+        self._hang(conn.timeout)
+        raise Error(msg="Lost connection to MySQL server during query", errno=CR_SERVER_LOST)
+
+    def ping(self, conn: "FakeConnection") -> None:
+        self._check_alive(conn)
+
+    def _check_alive(self, conn: "FakeConnection") -> None:
+        with self._lock:
+            node = conn.node
+            lost = conn.closed or not node.up or node.boot != conn.boot
+            unreachable = node.isolated and node.isolate_clients
+        if lost:
+            raise Error(msg="Lost connection to MySQL server during query", errno=CR_SERVER_LOST)
+        if unreachable:
+            self._hang(conn.timeout)
+            raise Error(msg="Lost connection to MySQL server during query", errno=CR_SERVER_LOST)
+
+    # --- Group state (lock held) ------------------------------------------------
+
+    def _node(self, name: str) -> FakeNode:
+        node = self.nodes.get(name) or self._by_container.get(name)
+        if node is None:
+            raise KeyError(name)
+        return node
+
+    def _event(self, description: str) -> None:
+        self.events.append((time.perf_counter(), description))
+
+    def _reachable(self, node: FakeNode) -> bool:
+        return node.up and node.gr_running and not node.isolated
+
+    def _has_majority(self) -> bool:
+        reachable = sum(1 for m in self._group.values() if self._reachable(m))
+        return reachable > len(self._group) // 2
+
+    def _advance(self, now: float) -> None:
+        """Bring membership, election and apply progress up to ``now``."""
+        majority = self._has_majority()
+        for node in list(self._group.values()):
+            if self._reachable(node):
+                node.unreachable_since = None
+            elif node.unreachable_since is None:
+                node.unreachable_since = now
+            elif majority and now - node.unreachable_since >= self.expel_delay:
+                # Dated when the expel would have happened, not when it is noticed here
+                self._leave(node, node.unreachable_since + self.expel_delay)
+                self._event(f"{node.name} expelled")
+
+        for node in self._group.values():
+            if node.recovering_until is not None and now >= node.recovering_until and self._reachable(node):
+                node.recovering_until = None
+                self._apply(node, len(self._log))
+                self._event(f"{node.name} ONLINE")
+
+        if self.primary is None and self._primary_lost_at is not None and self._has_majority() \
+                and now - self._primary_lost_at >= self.election_delay:
+            candidates = sorted(m.name for m in self._group.values()
+                                if self._reachable(m) and m.recovering_until is None)
+            if candidates:
+                new_primary = self.nodes[candidates[0]]
+                # The new primary applies its backlog before it accepts writes
+                self._apply(new_primary, len(self._log))
+                self.primary = new_primary.name
+                self._primary_lost_at = None
+                self._event(f"{new_primary.name} elected PRIMARY")
+
+        for node in self._group.values():
+            if node.name != self.primary and node.recovering_until is None and self._reachable(node):
+                target = node.applied
+                while target < len(self._log) and self._log[target][0] + self.apply_lag <= now:
+                    target += 1
+                self._apply(node, target)
+
+    def _join(self, node: FakeNode, at: float) -> None:
+        node.unreachable_since = None
+        node.recovering_until = at + self.recovery_delay
+        self._group[node.name] = node
+        if self.primary is None and self._primary_lost_at is None:
+            self._primary_lost_at = at
+
+    def _leave(self, node: FakeNode, now: float) -> None:
+        self._group.pop(node.name, None)
+        node.unreachable_since = None
+        node.recovering_until = None
+        if self.primary == node.name:
+            self.primary = None
+            self._primary_lost_at = now
+
+    def _shutdown(self, node: FakeNode) -> None:
+        node.up = False
+        node.boot += 1
+        node.gr_running = False
+
+    def _role(self, node: FakeNode) -> str:
+        return 'PRIMARY' if self.primary == node.name else 'SECONDARY'
+
+    def _thinks_primary(self, node: FakeNode) -> bool:
+        """Whether ``node`` takes writes in its own view (an isolated node keeps its old role)."""
+        if node.isolated:
+            return dict(node.frozen_view).get(node.name) == 'PRIMARY'
+        return self.primary == node.name and node.recovering_until is None
+
+    def _self_state(self, node: FakeNode) -> str:
+        if not node.gr_running:
+            return 'OFFLINE'
+        if node.isolated:
+            return 'ONLINE'  # It cannot tell it was expelled until it reconnects
+        if node.name not in self._group:
+            return 'ERROR'
+        return 'RECOVERING' if node.recovering_until is not None else 'ONLINE'
+
+    def _view(self, node: FakeNode) -> List[Row]:
+        """replication_group_members as ``node`` sees it."""
+        if not node.gr_running or (node.name not in self._group and not node.isolated):
+            members = [(node, self._self_state(node), '')]
+        elif node.isolated:
+            members = [(self.nodes[name], 'ONLINE' if name == node.name else 'UNREACHABLE', role)
+                       for name, role in node.frozen_view]
+        else:
+            members = []
+            for member in self._group.values():
+                if member.unreachable_since is not None:
+                    state = 'UNREACHABLE'
+                else:
+                    state = 'RECOVERING' if member.recovering_until is not None else 'ONLINE'
+                members.append((member, state, self._role(member)))
+        rows = [{
+            'CHANNEL_NAME': 'group_replication_applier',
+            'MEMBER_ID': member.uuid,
+            'MEMBER_HOST': member.container,
+            'MEMBER_PORT': 3306,
+            'MEMBER_STATE': state,
+            'MEMBER_ROLE': role,
+            'MEMBER_VERSION': MEMBER_VERSION
+        } for member, state, role in members]
+        rows.sort(key=lambda r: (r['MEMBER_ROLE'] != 'PRIMARY', r['MEMBER_HOST']))
+        return rows
+
+    def _apply(self, node: FakeNode, upto: int) -> None:
+        for _, kind, payload in self._log[node.applied:upto]:
+            if kind == 'create':
+                table, columns, key, defaults, unique = payload
+                node.tables.setdefault(table, FakeTable(columns, key, defaults, unique))
+            elif kind == 'drop':
+                node.tables.pop(payload[0], None)
+            else:
+                table, key, row = payload
+                target = node.tables.get(table)
+                if target is not None:
+                    target.store(key, row)
+        node.applied = max(node.applied, upto)
+
+    def _gtid_executed(self, node: FakeNode) -> str:
+        return f"{GROUP_NAME}:1-{node.applied}" if node.applied else ""
+
+    # --- Statement handlers (lock held) -----------------------------------------
+
+    def _writable(self, conn: "FakeConnection") -> None:
+        # An isolated primary accepts the statement; the commit is what blocks without a quorum
+        if not self._thinks_primary(conn.node):
+            raise Error(msg="The MySQL server is running with the --super-read-only option "
+                            "so it cannot execute this statement", errno=ER_OPTION_PREVENTS_STATEMENT)
+
+    def _write(self, conn: "FakeConnection", kind: str, payload: Tuple) -> None:
+        self._writable(conn)
+        conn.pending.append((kind, payload))
+
+    def _check_unique(self, node: FakeNode, pending: List[Tuple[str, Tuple]]) -> None:
+        """Raise 1062 if a pending insert duplicates a committed or earlier pending row."""
+        staged: Dict[str, List[Row]] = {}
+        for kind, payload in pending:
+            if kind != 'insert':
+                continue
+            name, _, row = payload
+            table = node.tables.get(name)
+            duplicate = table.duplicate(row, staged.get(name, ())) if table is not None else None
+            if duplicate:
+                index, value = duplicate
+                raise Error(msg=f"Duplicate entry '{'-'.join(str(v) for v in value)}' "
+                                f"for key '{name}.{index}'", errno=ER_DUP_ENTRY)
+            staged.setdefault(name, []).append(row)
+
+    def _table(self, node: FakeNode, name: str) -> FakeTable:
+        table = node.tables.get(name)
+        if table is None:
+            raise Error(msg=f"Table '{name}' doesn't exist", errno=ER_NO_SUCH_TABLE)
+        return table
+
+    def _group_replication(self, conn, match, params):
+        node = conn.node
+        if match.group(1).upper() == 'STOP':
+            self._leave(node, time.perf_counter())
+            node.gr_running = False
+        elif node.gr_running and (node.name in self._group or node.isolated):
+            raise Error(msg="The START GROUP_REPLICATION command failed since the group is already running.",
+                        errno=ER_GR_ALREADY_RUNNING)
+        else:
+            node.gr_running = True
+            self._join(node, time.perf_counter())
+        return [], []
+
+    def _noop(self, conn, match, params):
+        return [], []
+
+    def _create_table(self, conn, match, params):
+        name, body = match.group(2), match.group(3)
+        columns, key, defaults, unique = [], None, {}, []
+        for definition in _split_top_level(body):
+            words = definition.split()
+            if words and words[0].upper() == 'UNIQUE':
+                index = re.match(r"UNIQUE (?:KEY|INDEX)? ?`?(\w+)?`? ?\((.*)\)", definition, re.I)
+                if index:
+                    index_columns = tuple(c.strip().strip('`') for c in index.group(2).split(','))
+                    unique.append((index.group(1) or index_columns[0], index_columns))
+                continue
+            if not words or words[0].upper() in ('PRIMARY', 'INDEX', 'KEY', 'CONSTRAINT'):
+                continue
+            column = words[0].strip('`')
+            columns.append(column)
+            upper = definition.upper()
+            if 'PRIMARY KEY' in upper or 'AUTO_INCREMENT' in upper:
+                key = key or column
+            elif re.search(r"\bUNIQUE\b", upper):
+                unique.append((column, (column,)))
+            if 'DEFAULT CURRENT_TIMESTAMP' in upper:
+                defaults[column] = 'now'
+        exists = name in conn.node.tables
+        if match.group(1) and exists:
+            return [], []
+        if exists:
+            raise Error(msg=f"Table '{name}' already exists", errno=1050)
+        self._write(conn, 'create', (name, columns, key or columns[0], defaults, unique))
+        return [], []
+
+    def _drop_table(self, conn, match, params):
+        name = match.group(2)
+        if name not in conn.node.tables:
+            if match.group(1):
+                return [], []
+            raise Error(msg=f"Unknown table '{name}'", errno=1051)
+        self._write(conn, 'drop', (name,))
+        return [], []
+
+    def _insert(self, conn, match, params):
+        self._writable(conn)
+        table = self._table(conn.node, match.group(1))
+        columns = [c.strip().strip('`') for c in match.group(2).split(',')]
+        values = [_literal(token, params) for token in _split_top_level(match.group(3))]
+        now = _timestamp()
+        row = {column: now if default == 'now' else None for column, default in
+               ((c, table.defaults.get(c)) for c in table.columns)}
+        row.update(zip(columns, values))
+        staged = [p[2] for kind, p in conn.pending if kind == 'insert' and p[0] == match.group(1)]
+        duplicate = table.duplicate(row, staged)
+        if duplicate:
+            index, value = duplicate
+            raise Error(msg=f"Duplicate entry '{'-'.join(str(v) for v in value)}' "
+                            f"for key '{match.group(1)}.{index}'", errno=ER_DUP_ENTRY)
+        key = row.get(table.key)
+        if key is None:
+            key = row[table.key] = table.auto_increment
+        # Reserved at execute time, like InnoDB, so a rolled back insert leaves a gap
+        table.auto_increment = max(table.auto_increment, int(key) + 1)
+        conn.lastrowid = key
+        self._write(conn, 'insert', (match.group(1), int(key), row))
+        return [], []
+
+    def _members(self, conn, match, params):
+        rows = self._view(conn.node)
+        state = re.search(r"WHERE MEMBER_STATE = '(\w+)'", match.string, re.I)
+        if state:
+            rows = [r for r in rows if r['MEMBER_STATE'] == state.group(1).upper()]
+        columns = _select_list(match.group(1), MEMBER_COLUMNS)
+        if not set(columns) <= set(MEMBER_COLUMNS):
+            raise Error(msg=f"Member columns not supported by the fake cluster: {match.group(1)}",
+                        errno=ER_NOT_SUPPORTED_YET)
+        return columns, [tuple(r[c] for c in columns) for r in rows]
+
+    def _readiness_member(self, conn, match, params):
+        node = conn.node
+        state = self._self_state(node)
+        backlog = len(self._log) - node.applied
+        recovering = node.recovering_until is not None
+        row = (state, 0 if recovering else backlog,
+               f"{GROUP_NAME}:{node.applied + 1}-{len(self._log)}" if recovering and backlog else None,
+               'ON' if recovering else 'OFF')
+        return ['MEMBER_STATE', 'applier_queue', 'recovery_backlog', 'recovery_channel'], [row]
+
+    def _member_stats(self, conn, match, params):
+        node = conn.node
+        if not node.gr_running:
+            return [], []
+        columns = ['COUNT_TRANSACTIONS_IN_QUEUE', 'COUNT_TRANSACTIONS_CHECKED', 'COUNT_CONFLICTS_DETECTED',
+                   'COUNT_TRANSACTIONS_ROWS_VALIDATING', 'COUNT_TRANSACTIONS_REMOTE_IN_APPLIER_QUEUE',
+                   'COUNT_TRANSACTIONS_REMOTE_APPLIED', 'COUNT_TRANSACTIONS_LOCAL_PROPOSED']
+        row = (0, len(self._log), 0, 0, len(self._log) - node.applied,
+               max(0, node.applied - node.proposed), node.proposed)
+        return columns, [row]
+
+    def _clone_status(self, conn, match, params):
+        raise Error(msg="Table 'performance_schema.clone_status' doesn't exist", errno=ER_NO_SUCH_TABLE)
+
+    def _flow_control(self, conn, match, params):
+        return (['mode', 'certifier_threshold', 'applier_threshold'],
+                [('QUOTA', FLOW_CONTROL_THRESHOLD, FLOW_CONTROL_THRESHOLD)])
+
+    def _variable(self, conn, match, params):
+        name = match.group(1).lower()
+        values = {'gtid_executed': self._gtid_executed(conn.node), 'server_uuid': conn.node.uuid,
+                  'hostname': conn.node.container}
+        if name not in values:
+            raise Error(msg=f"Unknown system variable '{name}'", errno=1193)
+        return [match.group(0)[len('SELECT '):]], [(values[name],)]
+
+    def _key_bounds(self, conn, match, params):
+        table = self._table(conn.node, match.group(3))
+        keys = table.rows.keys()
+        return ['min', 'max'], [(min(keys, default=None), max(keys, default=None))]
+
+    def _chunk_checksums(self, conn, match, params):
+        table = self._table(conn.node, match.group(3))
+        low, step, start, end = (int(p) for p in params)
+        hash_columns = _hash_columns(match.group(2))
+        chunks: Dict[int, List[int]] = {}
+        for key, row in table.rows.items():
+            if start <= key < end:
+                chunk = chunks.setdefault((key - low) // step, [0, 0])
+                chunk[0] += 1
+                chunk[1] ^= _row_crc(row, hash_columns)
+        return ['chunk', 'count', 'checksum'], [(c, n, crc) for c, (n, crc) in sorted(chunks.items())]
+
+    def _row_checksums(self, conn, match, params):
+        table = self._table(conn.node, match.group(3))
+        start, end = (int(p) for p in params)
+        hash_columns = _hash_columns(match.group(2))
+        return ['key', 'crc'], [(key, _row_crc(row, hash_columns))
+                                for key, row in sorted(table.rows.items()) if start <= key < end]
+
+    def _column(self, conn, match, params):
+        table = self._table(conn.node, match.group(2))
+        column = match.group(1)
+        if column not in table.columns:
+            raise Error(msg=f"Unknown column '{column}' in 'field list'", errno=1054)
+        return [column], [(row.get(column),) for _, row in sorted(table.rows.items())]
+
+    def _count(self, conn, match, params):
+        return ['COUNT(*)'], [(len(self._table(conn.node, match.group(1)).rows),)]
+
+    def _select_one(self, conn, match, params):
+        return ['1'], [(1,)]
+
+    _handlers = [
+        (re.compile(r"^(START|STOP) GROUP_REPLICATION$", re.I), _group_replication),
+        (re.compile(r"^(CREATE DATABASE|USE|SET|COMMIT|BEGIN|START TRANSACTION)\b", re.I), _noop),
+        (re.compile(r"^CREATE TABLE (IF NOT EXISTS )?`?(\w+)`? \((.*)\)[^)]*$", re.I), _create_table),
+        (re.compile(r"^DROP TABLE (IF EXISTS )?`?(\w+)`?$", re.I), _drop_table),
+        (re.compile(r"^INSERT INTO `?(\w+)`? \(([^)]*)\) VALUES \((.*)\)$", re.I), _insert),
+        (re.compile(r"^SELECT .* LEFT JOIN performance_schema\.replication_group_member_stats", re.I),
+         _readiness_member),
+        (re.compile(r"^SELECT .* FROM performance_schema\.replication_group_member_stats", re.I), _member_stats),
+        (re.compile(r"^SELECT (.*?) FROM performance_schema\.replication_group_members", re.I), _members),
+        (re.compile(r"^SELECT .* FROM performance_schema\.clone_status", re.I), _clone_status),
+        (re.compile(r"^SELECT @@GLOBAL\.group_replication_flow_control_mode", re.I), _flow_control),
+        (re.compile(r"^SELECT @@(?:GLOBAL\.)?(\w+)$", re.I), _variable),
+        (re.compile(r"^SELECT MIN\(`?(\w+)`?\), MAX\(`?(\w+)`?\) FROM `?(\w+)`?$", re.I), _key_bounds),
+        (re.compile(r"^SELECT \(`?(\w+)`? - %s\) DIV %s AS chunk, COUNT\(\*\), BIT_XOR\((.*)\) "
+                    r"FROM `?(\w+)`? WHERE .* GROUP BY chunk$", re.I), _chunk_checksums),
+        (re.compile(r"^SELECT `?(\w+)`?, (CRC32\(.*\)) FROM `?(\w+)`? WHERE .*$", re.I), _row_checksums),
+        (re.compile(r"^SELECT COUNT\(\*\) FROM `?(\w+)`?$", re.I), _count),
+        (re.compile(r"^SELECT `?(\w+)`? FROM `?(\w+)`?$", re.I), _column),
+        (re.compile(r"^SELECT 1$"), _select_one),
+    ]
+
+
+class FakeConnection:
+    """The subset of ``MySQLConnection`` the harness uses, bound to one node incarnation."""
+
+    def __init__(self, cluster: FakeGroupCluster, node: FakeNode, boot: int, autocommit: bool = False,
+                 timeout: Optional[float] = None):
+        self.cluster = cluster
+        self.node = node
+        self.boot = boot
+        self.autocommit = autocommit
+        self.timeout = timeout
+        self.pending: List[Tuple[str, Tuple]] = []
+        self.lastrowid: Optional[int] = None
+        self.closed = False
+
+    @property
+    def in_transaction(self) -> bool:
+        return bool(self.pending)
+
+    def cursor(self, dictionary: bool = False, prepared: bool = False, **kwargs) -> "FakeCursor":
+        return FakeCursor(self, dictionary)
+
+    def commit(self) -> None:
+        self.cluster.commit(self)
+
+    def rollback(self) -> None:
+        self.pending = []
+
+    def ping(self, reconnect: bool = False, attempts: int = 1, delay: int = 0) -> None:
+        self.cluster.ping(self)
+
+    def is_connected(self) -> bool:
+        try:
+            self.cluster.ping(self)
+            return True
+        except Error:
+            return False
+
+    def close(self) -> None:
+        self.closed = True
+        self.pending = []
+
+    def __enter__(self) -> "FakeConnection":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class FakeCursor:
+    """Buffered cursor returning tuples, or dicts with ``dictionary=True``."""
+
+    def __init__(self, connection: FakeConnection, dictionary: bool = False):
+        self.connection = connection
+        self.dictionary = dictionary
+        self.column_names: List[str] = []
+        self.rowcount = -1
+        self.lastrowid: Optional[int] = None
+        self._rows: List[Any] = []
+
+    def execute(self, query: str, params: Sequence[Any] = ()) -> None:
+        columns, rows = self.connection.cluster.execute(self.connection, query, params)
+        self.column_names = columns
+        self._rows = [dict(zip(columns, row)) for row in rows] if self.dictionary else list(rows)
+        self.rowcount = len(rows) if columns else 1
+        self.lastrowid = self.connection.lastrowid
+
+    def executemany(self, query: str, seq_params: Sequence[Sequence[Any]]) -> None:
+        count = 0
+        for params in seq_params:
+            self.execute(query, params)
+            count += self.rowcount
+        self.rowcount = count
+
+    def fetchone(self) -> Optional[Any]:
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self) -> List[Any]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self) -> None:
+        self._rows = []
+
+    def __enter__(self) -> "FakeCursor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# --- Docker stand-in -------------------------------------------------------------
+
+class NotFound(Exception):
+    """Unknown container or network (docker.errors.NotFound in the real SDK)."""
+
+
+class ExecResult(NamedTuple):
+    exit_code: int
+    output: bytes
+
+
+class FakeContainer:
+    def __init__(self, cluster: FakeGroupCluster, name: str):
+        self.cluster = cluster
+        self.name = name
+
+    @property
+    def status(self) -> str:
+        return 'running' if self.cluster._node(self.name).up else 'exited'
+
+    def stop(self, timeout: int = 10) -> None:
+        self.cluster.stop(self.name)
+
+    def kill(self, signal: Any = None) -> None:
+        self.cluster.kill(self.name)
+
+    def start(self) -> None:
+        self.cluster.start(self.name)
+
+    def restart(self, timeout: int = 10) -> None:
+        self.cluster.stop(self.name)
+        self.cluster.start(self.name)
+
+    def remove(self, force: bool = False) -> None:
+        # The data directory is a bind mount, so a recreated container keeps its data
+        self.cluster.kill(self.name)
+
+    def pause(self) -> None:
+        # A frozen mysqld looks like a partitioned one: silent to the group and to clients
+        self.cluster.partition([self.name])
+
+    def unpause(self) -> None:
+        self.cluster.heal([self.name])
+
+    def exec_run(self, cmd: Any, **kwargs) -> ExecResult:
+        return ExecResult(126, b"exec is not supported by the fake cluster")
+
+    def reload(self) -> None:
+        pass
+
+
+class FakeNetwork:
+    """The group network drives partitions; any other network is inert."""
+
+    def __init__(self, cluster: FakeGroupCluster, name: str, group: bool = True):
+        self.cluster = cluster
+        self.name = name
+        self.group = group
+
+    def disconnect(self, container: Any, force: bool = False) -> None:
+        if self.group:
+            self.cluster.partition([getattr(container, 'name', container)])
+
+    def connect(self, container: Any, **kwargs) -> None:
+        if self.group:
+            self.cluster.heal([getattr(container, 'name', container)])
+
+    def remove(self) -> None:
+        pass
+
+
+class _Containers:
+    def __init__(self, cluster: FakeGroupCluster):
+        self.cluster = cluster
+
+    def get(self, name: str) -> FakeContainer:
+        if name not in self.cluster._by_container:
+            raise NotFound(f"No such container: {name}")
+        return FakeContainer(self.cluster, name)
+
+    def list(self, all: bool = False, **kwargs) -> List[FakeContainer]:
+        containers = [FakeContainer(self.cluster, name) for name in self.cluster._by_container]
+        return containers if all else [c for c in containers if c.status == 'running']
+
+
+class _Networks:
+    def __init__(self, cluster: FakeGroupCluster, network: str):
+        self.cluster = cluster
+        self.network = network
+
+    def get(self, name: str) -> FakeNetwork:
+        if name != self.network:
+            raise NotFound(f"network {name} not found")
+        return FakeNetwork(self.cluster, name)
+
+    def list(self, names: Optional[List[str]] = None, **kwargs) -> List[FakeNetwork]:
+        if names and self.network not in names:
+            return []
+        return [FakeNetwork(self.cluster, self.network)]
+
+    def create(self, name: str, **kwargs) -> FakeNetwork:
+        return FakeNetwork(self.cluster, name, group=False)
+
+
+class FakeDockerClient:
+    """``docker.from_env()`` stand-in: container stop/kill/start and network
+    disconnect/connect on the group network drive the fake cluster."""
+
+    def __init__(self, cluster: FakeGroupCluster, network: str = CLUSTER_NETWORK):
+        self.containers = _Containers(cluster)
+        self.networks = _Networks(cluster, network)
+
+
+# --- SQL helpers ---------------------------------------------------------------
+
+def _timestamp() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses and quotes."""
+    parts, depth, quote, current = [], 0, None, []
+    for char in text:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _literal(token: str, params: List[Any]) -> Any:
+    upper = token.upper()
+    if token == '%s':
+        return params.pop(0)
+    if upper.startswith(('NOW(', 'CURRENT_TIMESTAMP')):
+        return _timestamp()
+    if upper == 'NULL':
+        return None
+    if token[:1] in "'\"":
+        return token[1:-1]
+    try:
+        return int(token)
+    except ValueError:
+        return float(token)
+
+
+def _select_list(select: str, available: Sequence[str]) -> List[str]:
+    if select.strip() == '*':
+        return list(available)
+    return [c.strip().split('.')[-1].strip('`') for c in select.split(',')]
+
+
+def _hash_columns(expression: str) -> List[str]:
+    """Columns of checksum.py's ``CRC32(CONCAT_WS('#', key, cols..., CONCAT(ISNULL flags)))``."""
+    return re.findall(r"`(\w+)`", expression.split("CONCAT(ISNULL", 1)[0])
+
+
+def _row_crc(row: Row, columns: List[str]) -> int:
+    values = [row.get(c) for c in columns]
+    text = [v.decode('utf-8', 'replace') if isinstance(v, bytes) else str(v) for v in values if v is not None]
+    flags = "".join('1' if v is None else '0' for v in values[1:])
+    return zlib.crc32("#".join(text + [flags]).encode('utf-8'))
+
+
+# --- Harness runner ---------------------------------------------------------------
+
+class FakeComposeMixin:
+    """Mix into a harness class so ``recreate_container`` starts the fake container
+    instead of running docker-compose."""
+
+    def _compose_up(self, container_name: str) -> Tuple[bool, str]:
+        self.client.containers.get(container_name).start()
+        return True, ""
+
+
+def run_harness(args: argparse.Namespace) -> None:
+    """Run the full failover harness (test.py) against the fake cluster."""
+    import test as harness
+
+    class FakeFailoverTest(FakeComposeMixin, harness.GroupReplicationFailoverTest):
+        pass
+
+    harness.INITIAL_WORKLOAD_DURATION = args.duration
+    harness.POST_FAILOVER_WORKLOAD_DURATION = args.duration
+    harness.CONSISTENCY_CHECK_WAIT = args.apply_lag + 0.1
+
+    cluster = FakeGroupCluster(harness.NODES, election_delay=args.election_delay, expel_delay=args.expel_delay,
+                               startup_delay=args.startup_delay, recovery_delay=args.recovery_delay,
+                               apply_lag=args.apply_lag, latency=args.latency, ack_loss=args.ack_loss,
+                               seed=args.seed)
+    with cluster.install():
+        started = time.perf_counter()
+        test = FakeFailoverTest(compose_file_path="", target_rate=args.rate, workers=args.workers,
+                                histogram_path=args.histogram_out, flow_path=args.flow_out,
+                                client=FakeDockerClient(cluster),
+                                retry_policy=harness.make_policy(args.retry_policy, seed=args.seed),
+                                idempotent=args.idempotent, profile_path=args.profile)
+        test.run_test()
+        elapsed = time.perf_counter() - started
+
+    print(f"🧪 Fake cluster run took {elapsed:.2f}s ({cluster.statements} statements)")
+    for at, description in cluster.events:
+        print(f"  {at - started:>8.3f}s  {description}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the failover harness against an in-process fake group")
+    parser.add_argument("--rate", type=float, default=500, help="target inserts per second")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=2.0,
+                        help="seconds of workload before and after the failover")
+    parser.add_argument("--election-delay", type=float, default=ELECTION_DELAY)
+    parser.add_argument("--expel-delay", type=float, default=EXPEL_DELAY)
+    parser.add_argument("--startup-delay", type=float, default=STARTUP_DELAY)
+    parser.add_argument("--recovery-delay", type=float, default=RECOVERY_DELAY)
+    parser.add_argument("--apply-lag", type=float, default=APPLY_LAG, help="seconds before secondaries apply")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per statement round trip")
+    parser.add_argument("--ack-loss", type=float, default=ACK_LOSS,
+                        help="fraction of commits that succeed but report a lost connection to the client")
+    parser.add_argument("--seed", type=int, help="seed for ack loss and retry jitter")
+    parser.add_argument("--retry-policy", choices=("none", "immediate", "backoff", "refresh"), default="none")
+    parser.add_argument("--no-idempotency", dest="idempotent", action="store_false")
+    parser.add_argument("--profile", metavar="PREFIX", help="profile the harness hot paths (see test.py --profile)")
+    parser.add_argument("--histogram-out", metavar="PATH")
+    parser.add_argument("--flow-out", metavar="PATH")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run_harness(parse_args())
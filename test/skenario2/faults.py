@@ -0,0 +1,649 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:  # optional: schedules can always be written as JSON
+    yaml = None
+
+from test import GroupReplicationFailoverTest  # also puts the shared test/ modules on sys.path
+from latency import Histogram
+
+CLUSTER_NETWORK = "group_mysql-cluster"
+SIDE_NETWORK = "fault-side"  # nodes partitioned together keep talking over this network
+FAULT_TYPES = ('stop', 'kill', 'pause', 'partition', 'latency', 'loss', 'disk_full')
+SETTLE = 10.0  # seconds of load after the last fault of a repetition is reverted
+TIMELINE_INTERVAL = 0.1  # seconds per throughput/latency bucket
+BASELINE_WINDOW = 5.0  # seconds before a fault used as its baseline
+RECOVERY_WINDOW = 1.0  # seconds of rolling throughput compared against the baseline
+RECOVERED_FRACTION = 0.9  # of baseline throughput that counts as recovered
+NETEM_DEVICE = "eth0"
+DISK_FILL_PATH = "/var/lib/mysql/.fault-disk-full"
+DISK_FULL_MAX_MB = 4096  # refuse to allocate more (the datadir is a bind mount on the host disk)
+
+
+class FaultError(Exception):
+    """A fault could not be injected or reverted."""
+
+
+class Fault:
+    """One timeline entry: what to break, where, when and for how long.
+
+    ``at`` is the offset in seconds from the start of the repetition,
+    ``duration`` how long the fault stays before it is reverted (None keeps
+    it until the end of the run). ``target`` is a node name, ``primary``,
+    ``secondary`` or ``random``, or a list of those for a partition.
+    ``jitter`` shifts ``at`` by up to that many seconds either way, drawn
+    from the schedule's seeded RNG.
+    """
+
+    def __init__(self, spec: Dict[str, Any], index: int):
+        spec = dict(spec)
+        self.index = index
+        self.type = spec.pop('type', None)
+        if self.type not in FAULT_TYPES:
+            raise ValueError(f"fault {index}: type must be one of {', '.join(FAULT_TYPES)}, got {self.type!r}")
+        if 'at' not in spec:
+            raise ValueError(f"fault {index}: 'at' (seconds from the start) is required")
+        self.at = float(spec.pop('at'))
+        duration = spec.pop('duration', None)
+        self.duration = float(duration) if duration is not None else None
+        self.jitter = float(spec.pop('jitter', 0.0))
+        target = spec.pop('target', 'primary')
+        self.targets: List[str] = list(target) if isinstance(target, (list, tuple)) else [target]
+        self.params = spec
+        if self.type == 'latency' and 'delay_ms' not in spec:
+            raise ValueError(f"fault {index}: latency needs delay_ms")
+        if self.type == 'loss' and 'percent' not in spec:
+            raise ValueError(f"fault {index}: loss needs percent")
+
+    @property
+    def label(self) -> str:
+        return f"f{self.index} {self.type}"
+
+    @property
+    def latest_end(self) -> float:
+        return self.at + self.jitter + (self.duration or 0.0)
+
+
+class FaultSchedule:
+    """A timeline of faults, repeated ``repeat`` times with one seeded RNG."""
+
+    def __init__(self, faults: List[Fault], seed: Optional[int] = None, repeat: int = 1,
+                 settle: float = SETTLE, duration: Optional[float] = None):
+        self.faults = sorted(faults, key=lambda f: f.at)
+        self.seed = seed
+        self.repeat = repeat
+        self.settle = settle
+        self.duration = duration
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FaultSchedule":
+        faults = [Fault(spec, i + 1) for i, spec in enumerate(data.get('faults') or [])]
+        if not faults:
+            raise ValueError("schedule has no faults")
+        return cls(faults, seed=data.get('seed'), repeat=int(data.get('repeat', 1)),
+                   settle=float(data.get('settle', SETTLE)), duration=data.get('duration'))
+
+    @classmethod
+    def load(cls, path: str) -> "FaultSchedule":
+        """Read a schedule from YAML (``.yaml``/``.yml``, needs PyYAML) or JSON."""
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    raise RuntimeError("PyYAML is not installed; install it or write the schedule as JSON")
+                return cls.from_dict(yaml.safe_load(f))
+            return cls.from_dict(json.load(f))
+
+    def length(self) -> float:
+        """Seconds one repetition lasts."""
+        if self.duration is not None:
+            return float(self.duration)
+        return max(f.latest_end for f in self.faults) + self.settle
+
+
+class FaultInjector:
+    """Applies and reverts faults on the group's containers with the Docker SDK.
+
+    ``stop`` and ``kill`` are reverted with the harness's ``start_container``
+    (recreate, then wait until the member is ONLINE). ``pause`` uses the
+    container freezer. ``partition`` disconnects the targets from the group
+    network; several targets share a side network so they form their own
+    side of the partition. ``latency`` and ``loss`` add a ``tc netem`` qdisc
+    inside the container, which needs the NET_ADMIN capability and iproute2
+    in the image. ``disk_full`` fills the datadir's filesystem with one
+    ``fallocate``d file, up to ``max_mb``.
+    """
+
+    def __init__(self, harness: GroupReplicationFailoverTest, network: str = CLUSTER_NETWORK):
+        self.harness = harness
+        self.client = harness.client
+        self.network = network
+
+    def resolve(self, fault: Fault, rng: random.Random) -> List[str]:
+        """Containers ``fault`` hits right now; aliases never pick the same node twice."""
+        harness = self.harness
+        containers = {name: config['container'] for name, config in harness.nodes.items()}
+        primary, _ = harness.get_primary_node()
+        chosen: List[str] = []
+        for target in fault.targets:
+            free = sorted(name for name in containers if name not in chosen)
+            if target == 'primary':
+                if primary is None:
+                    raise FaultError("no primary to target")
+                name = primary
+            elif target == 'secondary':
+                candidates = [name for name in free if name != primary]
+                if not candidates:
+                    raise FaultError("no secondary left to target")
+                name = rng.choice(candidates)
+            elif target == 'random':
+                name = rng.choice(free)
+            elif target in containers:
+                name = target
+            else:
+                raise FaultError(f"unknown target {target!r}")
+            if name not in chosen:
+                chosen.append(name)
+        return [containers[name] for name in chosen]
+
+    def inject(self, fault: Fault, containers: List[str]) -> Any:
+        """Apply ``fault``; returns whatever ``revert`` needs to undo it."""
+        return getattr(self, f"_inject_{fault.type}")(fault, containers)
+
+    def revert(self, fault: Fault, containers: List[str], state: Any) -> None:
+        getattr(self, f"_revert_{fault.type}")(fault, containers, state)
+
+    # --- Process faults -------------------------------------------------------
+
+    def _inject_stop(self, fault: Fault, containers: List[str]) -> None:
+        for container in containers:
+            if not self.harness.stop_container(container):
+                raise FaultError(f"could not stop {container}")
+
+    def _inject_kill(self, fault: Fault, containers: List[str]) -> None:
+        for container in containers:
+            print(f"\n💀 Killing container: {container}")
+            self.client.containers.get(container).kill(signal="SIGKILL")
+            self.harness._invalidate_container_connections(container)
+
+    def _revert_stop(self, fault: Fault, containers: List[str], state: Any) -> None:
+        for container in containers:
+            if not self.harness.start_container(container):
+                raise FaultError(f"{container} did not come back ONLINE")
+
+    _revert_kill = _revert_stop
+
+    def _inject_pause(self, fault: Fault, containers: List[str]) -> None:
+        for container in containers:
+            print(f"\n⏸️  Pausing container: {container}")
+            self.client.containers.get(container).pause()
+
+    def _revert_pause(self, fault: Fault, containers: List[str], state: Any) -> None:
+        for container in containers:
+            print(f"\n▶️  Unpausing container: {container}")
+            self.client.containers.get(container).unpause()
+
+    # --- Network faults ---------------------------------------------------------
+
+    def _inject_partition(self, fault: Fault, containers: List[str]) -> Any:
+        network = self.client.networks.get(self.network)
+        side = None
+        if len(containers) > 1 and fault.params.get('together', True):
+            name = f"{SIDE_NETWORK}-{fault.index}"
+            for stale in self.client.networks.list(names=[name]):
+                stale.remove()
+            side = self.client.networks.create(name, driver="bridge", internal=True)
+        for container in containers:
+            print(f"\n✂️  Disconnecting {container} from {self.network}")
+            network.disconnect(container, force=True)
+            if side is not None:
+                side.connect(container)
+        return side
+
+    def _revert_partition(self, fault: Fault, containers: List[str], side: Any) -> None:
+        network = self.client.networks.get(self.network)
+        for container in containers:
+            if side is not None:
+                side.disconnect(container, force=True)
+            print(f"\n🔗 Reconnecting {container} to {self.network}")
+            network.connect(container)
+        if side is not None:
+            side.remove()
+
+    def _inject_latency(self, fault: Fault, containers: List[str]) -> None:
+        netem = ["delay", f"{fault.params['delay_ms']}ms"]
+        if fault.params.get('jitter_ms'):
+            netem.append(f"{fault.params['jitter_ms']}ms")
+        self._netem(fault, containers, netem)
+
+    def _inject_loss(self, fault: Fault, containers: List[str]) -> None:
+        self._netem(fault, containers, ["loss", f"{fault.params['percent']}%"])
+
+    def _netem(self, fault: Fault, containers: List[str], netem: List[str]) -> None:
+        device = fault.params.get('device', NETEM_DEVICE)
+        for container in containers:
+            print(f"\n🐢 {container}: netem {' '.join(netem)} on {device}")
+            self._exec(container, ["tc", "qdisc", "replace", "dev", device, "root", "netem"] + netem)
+
+    def _revert_latency(self, fault: Fault, containers: List[str], state: Any) -> None:
+        device = fault.params.get('device', NETEM_DEVICE)
+        for container in containers:
+            self._exec(container, ["tc", "qdisc", "del", "dev", device, "root"])
+
+    _revert_loss = _revert_latency
+
+    # --- Disk faults --------------------------------------------------------------
+
+    def _inject_disk_full(self, fault: Fault, containers: List[str]) -> None:
+        path = fault.params.get('path', DISK_FILL_PATH)
+        max_mb = float(fault.params.get('max_mb', DISK_FULL_MAX_MB))
+        for container in containers:
+            output = self._exec(container, ["df", "-Pk", os.path.dirname(path)])
+            available_kb = int(output.splitlines()[-1].split()[3])
+            if available_kb / 1024 > max_mb:
+                raise FaultError(f"{container}: filling the disk needs {available_kb / 1024:.0f} MB "
+                                 f"(max_mb is {max_mb:.0f}); put the datadir on a smaller volume")
+            print(f"\n💾 {container}: allocating {available_kb / 1024:.0f} MB at {path}")
+            self._exec(container, ["fallocate", "-l", f"{available_kb}KiB", path])
+
+    def _revert_disk_full(self, fault: Fault, containers: List[str], state: Any) -> None:
+        path = fault.params.get('path', DISK_FILL_PATH)
+        for container in containers:
+            self._exec(container, ["rm", "-f", path])
+
+    def _exec(self, container: str, command: List[str]) -> str:
+        result = self.client.containers.get(container).exec_run(command, user="root")
+        output = result.output.decode("utf-8", "replace").strip() if result.output else ""
+        if result.exit_code != 0:
+            raise FaultError(f"{container}: {' '.join(command)} failed ({result.exit_code}): {output}")
+        return output
+
+
+class ImpactTracker:
+    """Commits, failures and latency in ``interval`` buckets for per-fault impact."""
+
+    def __init__(self, committed: Callable[[], int], failed: Callable[[], int],
+                 interval: float = TIMELINE_INTERVAL):
+        self._committed = committed
+        self._failed = failed
+        self.interval = interval
+        self.buckets: List[Tuple[float, int, int, Histogram]] = []  # (end t, commits, failures, latency)
+        self._lock = threading.Lock()
+        self._window = Histogram()
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+
+    def now(self) -> float:
+        """Seconds since ``start``."""
+        return time.perf_counter() - self.started_at
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._window.record(latency)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._running.set()
+        self._thread = threading.Thread(target=self._loop, name="fault-impact", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _loop(self) -> None:
+        committed, failed = self._committed(), self._failed()
+        next_tick = self.started_at + self.interval
+        while self._running.is_set():
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+            now_committed, now_failed = self._committed(), self._failed()
+            with self._lock:
+                window, self._window = self._window, Histogram()
+            self.buckets.append((next_tick - self.started_at, now_committed - committed,
+                                 now_failed - failed, window))
+            committed, failed = now_committed, now_failed
+            next_tick += self.interval
+
+    def window(self, start: float, end: float) -> Dict[str, Any]:
+        """Throughput, failures and latency of the buckets ending in (start, end]."""
+        buckets = [b for b in self.buckets if start < b[0] <= end]
+        latency = Histogram()
+        for _, _, _, histogram in buckets:
+            latency.merge(histogram)
+        span = len(buckets) * self.interval
+        return {
+            'tps': sum(b[1] for b in buckets) / span if span else None,
+            'failed': sum(b[2] for b in buckets),
+            'p50_ms': latency.percentile(50.0) / 1000 if latency.total_count else None,
+            'p99_ms': latency.percentile(99.0) / 1000 if latency.total_count else None,
+            'max_ms': latency.max_us / 1000 if latency.total_count else None
+        }
+
+    def rolling_tps(self, start: float, end: float, span: float = RECOVERY_WINDOW) -> List[Tuple[float, float]]:
+        """(t, commits/s over the ``span`` seconds up to t) for buckets ending in (start, end]."""
+        per_span = max(1, int(round(span / self.interval)))
+        commits = [b[1] for b in self.buckets]
+        series = []
+        for i, bucket in enumerate(self.buckets):
+            if start < bucket[0] <= end:
+                recent = commits[max(0, i - per_span + 1):i + 1]
+                series.append((bucket[0], sum(recent) / (len(recent) * self.interval)))
+        return series
+
+    def longest_stall(self, start: float, end: float) -> float:
+        """Longest run of seconds in (start, end] with no commit at all."""
+        longest = current = 0.0
+        for t, commits, _, _ in self.buckets:
+            if start < t <= end:
+                current = current + self.interval if commits == 0 else 0.0
+                longest = max(longest, current)
+        return longest
+
+
+class ScheduledFailoverTest(GroupReplicationFailoverTest):
+    """The failover harness driven by a fault schedule instead of one primary stop.
+
+    The workload runs for ``repeat`` repetitions of the timeline. Each fault
+    fires on its own timer thread at its offset from the start of the
+    repetition (so a slow stop or restart never delays the next fault), is
+    reverted ``duration`` seconds after its planned start, and every
+    affected node is then waited for until it is ONLINE again. Per fault the
+    report compares throughput and latency with the ``BASELINE_WINDOW``
+    seconds before it, and measures how long the group needed to get back to
+    ``RECOVERED_FRACTION`` of the baseline throughput.
+    """
+
+    def __init__(self, schedule: FaultSchedule, network: str = CLUSTER_NETWORK, **kwargs):
+        super().__init__(**kwargs)
+        self.schedule = schedule
+        self.injector = FaultInjector(self, network)
+        self.tracker = ImpactTracker(self._committed_count, self._failed_count)
+        self.rng = random.Random(schedule.seed)
+        self.runs: List[Dict[str, Any]] = []
+        self._active: Dict[int, str] = {}
+        self._active_lock = threading.Lock()
+
+    def _record_latency(self, seq: int, latency: float, start_lag: float) -> None:
+        super()._record_latency(seq, latency, start_lag)
+        self.tracker.record(latency)
+
+    def _failed_count(self) -> int:
+        if self.process_load:
+            return self.process_load.live_total('failed_inserts')
+        return self.workload_stats['failed_inserts']
+
+    def run_schedule(self) -> None:
+        self._print_test_header()
+        if not self._validate_initial_state():
+            return
+        if not self.setup_test_database():
+            return
+
+        print(f"\n📋 Starting workload for {self.schedule.repeat} x {self.schedule.length():.0f}s "
+              f"of fault schedule (seed {self.schedule.seed})")
+        self._set_phase("steady")
+        self.topology.start()
+        self.flow.start()
+        self.tracker.start()
+        self.workload_running = True
+        self.workload_thread = threading.Thread(target=self.continuous_workload, daemon=True)
+        self.workload_thread.start()
+
+        for repetition in range(self.schedule.repeat):
+            self._run_timeline(repetition)
+
+        self.tracker.stop()
+        self._finalize_test()
+        self.print_fault_report()
+
+    def _run_timeline(self, repetition: int) -> None:
+        origin = time.perf_counter()
+        print(f"\n{'='*80}\n🧨 Fault schedule repetition {repetition + 1}/{self.schedule.repeat}\n{'='*80}")
+        threads = []
+        for fault in self.schedule.faults:
+            # Offsets and per-fault RNGs are drawn in schedule order, so a seed replays the same run
+            offset = fault.at + (self.rng.uniform(-fault.jitter, fault.jitter) if fault.jitter else 0.0)
+            rng = random.Random(self.rng.random())
+            thread = threading.Thread(target=self._fire, args=(fault, repetition, origin, max(0.0, offset), rng),
+                                      name=f"fault-{fault.index}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        time.sleep(max(0.0, origin + self.schedule.length() - time.perf_counter()))
+
+    def _fire(self, fault: Fault, repetition: int, origin: float, offset: float, rng: random.Random) -> None:
+        run: Dict[str, Any] = {
+            'repetition': repetition + 1,
+            'fault': fault.index,
+            'type': fault.type,
+            'label': fault.label,
+            'params': fault.params,
+            'targets': [],
+            'planned': self._at(origin + offset),
+            'fired': None,
+            'injected': None,
+            'reverted': None,
+            'online': None,
+            'error': None
+        }
+        self.runs.append(run)
+        time.sleep(max(0.0, origin + offset - time.perf_counter()))
+
+        try:
+            containers = self.injector.resolve(fault, rng)
+        except FaultError as e:
+            run['error'] = str(e)
+            print(f"⚠️  {fault.label} skipped: {e}")
+            return
+        run['targets'] = containers
+        run['fired'] = self.tracker.now()
+        with self._active_lock:
+            self._active[id(run)] = fault.label
+        self._set_phase(fault.label)
+        print(f"\n🧨 {fault.label} on {', '.join(containers)} at +{run['fired'] - self._at(origin):.3f}s "
+              f"(skew {(run['fired'] - run['planned']) * 1000:.1f} ms)")
+
+        state = None
+        try:
+            state = self.injector.inject(fault, containers)
+            run['injected'] = self.tracker.now()
+            if fault.duration is None:
+                return
+            time.sleep(max(0.0, origin + offset + fault.duration - time.perf_counter()))
+            self.injector.revert(fault, containers, state)
+            run['reverted'] = self.tracker.now()
+            # start_container already waited for stop/kill targets
+            for container in containers if fault.type not in ('stop', 'kill') else []:
+                node_name = self._map_host_to_node(container)
+                if node_name and self.wait_until_ready(node_name).phases[-1][1] is None:
+                    raise FaultError(f"{node_name} did not come back ONLINE")
+            run['online'] = self.tracker.now()
+        except Exception as e:
+            run['error'] = str(e)
+            print(f"❌ {fault.label} on {', '.join(containers)}: {e}")
+        finally:
+            if fault.duration is not None:
+                with self._active_lock:
+                    self._active.pop(id(run), None)
+                    remaining = list(self._active.values())
+                self._set_phase(remaining[-1] if remaining else "steady")
+
+    def _at(self, perf_time: float) -> float:
+        return perf_time - self.tracker.started_at
+
+    # --- Reporting ----------------------------------------------------------------
+
+    def impact(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        """Throughput/latency before, during and after one fired fault."""
+        fired = run['fired']
+        if run['injected'] is None:
+            end = fired  # Injection failed: nothing to measure beyond the baseline
+        else:
+            end = run['online'] or run['reverted'] or self.tracker.now()
+        later = [r['fired'] for r in self.runs if r['fired'] is not None and r['fired'] > fired]
+        horizon = min(later) if later else self.tracker.now()
+        baseline = self.tracker.window(fired - BASELINE_WINDOW, fired)
+        during = self.tracker.window(fired, end)
+
+        recovery = None
+        if baseline['tps']:
+            series = self.tracker.rolling_tps(fired, horizon)
+            threshold = baseline['tps'] * RECOVERED_FRACTION
+            dipped = False
+            for t, tps in series:
+                if tps < threshold:
+                    dipped = True
+                elif dipped:
+                    recovery = t - fired
+                    break
+            if not dipped and series:
+                recovery = 0.0
+        min_tps = min((tps for _, tps in self.tracker.rolling_tps(fired, horizon)), default=None)
+
+        return {
+            **{key: run[key] for key in ('repetition', 'fault', 'type', 'label', 'targets', 'error')},
+            'fired_s': fired,
+            'skew_ms': (fired - run['planned']) * 1000,
+            'baseline_tps': baseline['tps'],
+            'baseline_p99_ms': baseline['p99_ms'],
+            'during_tps': during['tps'],
+            'during_p99_ms': during['p99_ms'],
+            'during_max_ms': during['max_ms'],
+            'failed_ops': during['failed'],
+            'min_tps': min_tps,
+            'longest_stall_s': self.tracker.longest_stall(fired, horizon),
+            'recovery_s': recovery,
+            'online_after_s': run['online'] - fired if run['online'] is not None else None
+        }
+
+    def impacts(self) -> List[Dict[str, Any]]:
+        fired = sorted((r for r in self.runs if r['fired'] is not None), key=lambda r: r['fired'])
+        skipped = [r for r in self.runs if r['fired'] is None]
+        return [self.impact(r) for r in fired] + [
+            {**{key: r[key] for key in ('repetition', 'fault', 'type', 'label', 'targets', 'error')}}
+            for r in skipped
+        ]
+
+    def by_type(self, impacts: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Mean recovery, stall and failed operations per fault type over all repetitions."""
+        grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for impact in impacts:
+            if 'fired_s' in impact:
+                grouped[impact['type']].append(impact)
+        summary = {}
+        for fault_type, rows in grouped.items():
+            recoveries = [r['recovery_s'] for r in rows if r['recovery_s'] is not None]
+            summary[fault_type] = {
+                'runs': len(rows),
+                'recovered': len(recoveries),
+                'mean_recovery_s': sum(recoveries) / len(recoveries) if recoveries else None,
+                'max_recovery_s': max(recoveries, default=None),
+                'mean_stall_s': sum(r['longest_stall_s'] for r in rows) / len(rows),
+                'failed_ops': sum(r['failed_ops'] for r in rows)
+            }
+        return summary
+
+    def print_fault_report(self) -> None:
+        impacts = self.impacts()
+
+        def fmt(value: Optional[float], spec: str = ".1f") -> str:
+            return format(value, spec) if value is not None else "-"
+
+        print(f"\n{'='*120}")
+        print("🧨 FAULT IMPACT")
+        print(f"{'='*120}")
+        print(f"{'Rep':>3} {'Fault':<16} {'Targets':<14} {'At s':>7} {'Skew ms':>8} {'Base TPS':>9} "
+              f"{'TPS':>7} {'Min TPS':>8} {'p99 ms':>8} {'Failed':>7} {'Stall s':>8} {'Recov s':>8} {'ONLINE s':>9}")
+        for impact in impacts:
+            targets = ",".join(impact['targets']) or "-"
+            if 'fired_s' not in impact:
+                print(f"{impact['repetition']:>3} {impact['label']:<16} {targets:<14} skipped: {impact['error']}")
+                continue
+            print(f"{impact['repetition']:>3} {impact['label']:<16} {targets:<14} {impact['fired_s']:>7.2f} "
+                  f"{impact['skew_ms']:>8.1f} {fmt(impact['baseline_tps'], '.0f'):>9} "
+                  f"{fmt(impact['during_tps'], '.0f'):>7} {fmt(impact['min_tps'], '.0f'):>8} "
+                  f"{fmt(impact['during_p99_ms']):>8} {impact['failed_ops']:>7} "
+                  f"{impact['longest_stall_s']:>8.1f} {fmt(impact['recovery_s'], '.2f'):>8} "
+                  f"{fmt(impact['online_after_s'], '.2f'):>9}")
+            if impact['error']:
+                print(f"    ⚠️  {impact['error']}")
+
+        print(f"\n{'Type':<10} {'Runs':>5} {'Recovered':>10} {'Mean recov s':>13} {'Max recov s':>12} "
+              f"{'Mean stall s':>13} {'Failed ops':>11}")
+        for fault_type, row in sorted(self.by_type(impacts).items()):
+            print(f"{fault_type:<10} {row['runs']:>5} {row['recovered']:>10} {fmt(row['mean_recovery_s'], '.2f'):>13} "
+                  f"{fmt(row['max_recovery_s'], '.2f'):>12} {row['mean_stall_s']:>13.1f} {row['failed_ops']:>11}")
+        print(f"(recovered = rolling {RECOVERY_WINDOW:g}s throughput back to {RECOVERED_FRACTION:.0%} "
+              f"of the {BASELINE_WINDOW:g}s before the fault)")
+
+    def export(self, path: str) -> None:
+        impacts = self.impacts()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                'seed': self.schedule.seed,
+                'repeat': self.schedule.repeat,
+                'faults': impacts,
+                'by_type': self.by_type(impacts),
+                'timeline': [{'t': t, 'commits': commits, 'failed': failed}
+                             for t, commits, failed, _ in self.tracker.buckets]
+            }, f, indent=2)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the failover workload against a fault schedule")
+    parser.add_argument("schedule", help="fault schedule (.json, or .yaml/.yml with PyYAML installed)")
+    parser.add_argument("--seed", type=int, help="override the schedule's seed")
+    parser.add_argument("--repeat", type=int, help="override how many times the timeline runs")
+    parser.add_argument("--rate", type=float, default=500, help="target inserts per second")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--network", default=CLUSTER_NETWORK, help="Docker network the group talks over")
+    parser.add_argument("--fake", action="store_true",
+                        help="run against the in-process fake cluster (fakecluster.py) instead of Docker")
+    parser.add_argument("--json", metavar="PATH", help="export per-fault impact and the timeline to JSON")
+    parser.add_argument("--histogram-out", metavar="PATH")
+    parser.add_argument("--flow-out", metavar="PATH")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    schedule = FaultSchedule.load(args.schedule)
+    if args.seed is not None:
+        schedule.seed = args.seed
+    if args.repeat is not None:
+        schedule.repeat = args.repeat
+    options = dict(network=args.network, target_rate=args.rate, workers=args.workers,
+                   histogram_path=args.histogram_out, flow_path=args.flow_out)
+
+    if args.fake:
+        from fakecluster import FakeComposeMixin, FakeDockerClient, FakeGroupCluster
+        from test import NODES
+
+        class FakeScheduledFailoverTest(FakeComposeMixin, ScheduledFailoverTest):
+            pass
+
+        cluster = FakeGroupCluster(NODES)
+        with cluster.install():
+            test = FakeScheduledFailoverTest(schedule, client=FakeDockerClient(cluster, args.network), **options)
+            test.run_schedule()
+    else:
+        test = ScheduledFailoverTest(schedule, **options)
+        test.run_schedule()
+
+    if args.json:
+        test.export(args.json)
+        print(f"Fault impact exported to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import csv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from latency import Histogram
+
+SAMPLE_INTERVAL = 1.0  # seconds; one sample row per second of workload
+DEFAULT_THRESHOLD = 25000  # group_replication_flow_control_{certifier,applier}_threshold default
+
+# Each member's own row: other members' rows are only as fresh as the last stats broadcast
+MEMBER_STATS_QUERY = """
+    SELECT
+        COUNT_TRANSACTIONS_IN_QUEUE,
+        COUNT_TRANSACTIONS_CHECKED,
+        COUNT_CONFLICTS_DETECTED,
+        COUNT_TRANSACTIONS_ROWS_VALIDATING,
+        COUNT_TRANSACTIONS_REMOTE_IN_APPLIER_QUEUE,
+        COUNT_TRANSACTIONS_REMOTE_APPLIED,
+        COUNT_TRANSACTIONS_LOCAL_PROPOSED
+    FROM performance_schema.replication_group_member_stats
+    WHERE MEMBER_ID = @@server_uuid
+"""
+
+FLOW_CONTROL_QUERY = """
+    SELECT
+        @@GLOBAL.group_replication_flow_control_mode AS mode,
+        @@GLOBAL.group_replication_flow_control_certifier_threshold AS certifier_threshold,
+        @@GLOBAL.group_replication_flow_control_applier_threshold AS applier_threshold
+"""
+
+# Cumulative counters reported as per-interval deltas
+DELTA_COLUMNS = ('COUNT_TRANSACTIONS_CHECKED', 'COUNT_CONFLICTS_DETECTED',
+                 'COUNT_TRANSACTIONS_REMOTE_APPLIED', 'COUNT_TRANSACTIONS_LOCAL_PROPOSED')
+
+MemberStats = Dict[str, Any]
+
+
+class FlowControlCollector:
+    """Per-second timeline of workload throughput/latency and each member's queues.
+
+    Every ``interval`` seconds each node is asked for its own row of
+    ``replication_group_member_stats`` (in parallel, so a dead node only
+    blanks its own columns), and the sample is stored next to the
+    workload's commits and latency for the same interval. Flow control
+    throttles the group when a member's certifier queue
+    (``COUNT_TRANSACTIONS_IN_QUEUE``) or applier queue
+    (``COUNT_TRANSACTIONS_REMOTE_IN_APPLIER_QUEUE``) exceeds its threshold,
+    so samples over a threshold are flagged as throttled.
+
+    ``fetch(node, query)`` returns the rows of ``query`` as dicts, or None
+    if the node could not be queried. ``committed()`` returns the cumulative
+    number of committed operations; ``record(latency)`` feeds per-interval
+    latency, and ``absorb(window)`` adds a histogram recorded elsewhere
+    (a worker process's interval, see ``take_window``).
+    """
+
+    def __init__(self, nodes: List[str], fetch: Callable[[str, str], Optional[List[Dict[str, Any]]]],
+                 committed: Callable[[], int], interval: float = SAMPLE_INTERVAL, phase: str = "default"):
+        self.nodes = list(nodes)
+        self._fetch = fetch
+        self._committed = committed
+        self.interval = interval
+        self.phase = phase
+        self.flow_control: Dict[str, Any] = {
+            'mode': None,
+            'certifier_threshold': DEFAULT_THRESHOLD,
+            'applier_threshold': DEFAULT_THRESHOLD
+        }
+        self.samples: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._window = Histogram()
+        self._previous: Dict[str, MemberStats] = {}
+        self._executor = ThreadPoolExecutor(max_workers=len(self.nodes), thread_name_prefix="flow")
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._last_committed = 0
+        self._last_sampled_at = 0.0
+
+    def set_phase(self, phase: str) -> None:
+        self.phase = phase
+
+    def record(self, latency: float) -> None:
+        """Add one operation's latency to the current interval."""
+        with self._lock:
+            self._window.record(latency)
+
+    def absorb(self, window: Histogram) -> None:
+        """Merge latencies recorded outside this process into the current interval."""
+        with self._lock:
+            self._window.merge(window)
+
+    def take_window(self) -> Histogram:
+        """Return the latencies recorded since the last call and start a new interval."""
+        with self._lock:
+            window, self._window = self._window, Histogram()
+        return window
+
+    def start(self) -> None:
+        self._read_thresholds()
+        for node_name, stats in self._sample_members().items():
+            if stats is not None:
+                self._previous[node_name] = stats
+        self._started_at = self._last_sampled_at = time.perf_counter()
+        self._last_committed = self._committed()
+        self._running.set()
+        self._thread = threading.Thread(target=self._loop, name="flow-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2 + 1)
+        self._executor.shutdown(wait=False)
+
+    def _read_thresholds(self) -> None:
+        for node_name in self.nodes:
+            rows = self._fetch(node_name, FLOW_CONTROL_QUERY)
+            if rows:
+                self.flow_control.update(rows[0])
+                return
+
+    def _loop(self) -> None:
+        next_tick = self._started_at + self.interval
+        while self._running.is_set():
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._take_sample()
+            # A slow sample (dead node) skips ticks instead of bunching up behind them
+            next_tick = max(next_tick + self.interval, time.perf_counter())
+
+    def _sample_members(self) -> Dict[str, Optional[MemberStats]]:
+        futures = {node_name: self._executor.submit(self._fetch, node_name, MEMBER_STATS_QUERY)
+                   for node_name in self.nodes}
+        wait(futures.values(), timeout=self.interval)
+        result: Dict[str, Optional[MemberStats]] = {}
+        for node_name, future in futures.items():
+            rows = future.result() if future.done() and not future.exception() else None
+            result[node_name] = rows[0] if rows else None
+        return result
+
+    def _take_sample(self) -> None:
+        window = self.take_window()
+        now = time.perf_counter()
+        committed = self._committed()
+        members = self._sample_members()
+
+        sample: Dict[str, Any] = {
+            't': now - self._started_at,
+            'phase': self.phase,
+            'commits_per_sec': (committed - self._last_committed) / max(now - self._last_sampled_at, 1e-9),
+            'latency_count': window.total_count,
+            'p50_ms': window.percentile(50.0) / 1000 if window.total_count else None,
+            'p99_ms': window.percentile(99.0) / 1000 if window.total_count else None,
+            'members': {},
+            'throttled_by': []
+        }
+        self._last_committed = committed
+        self._last_sampled_at = now
+
+        for node_name, stats in members.items():
+            if stats is None:
+                sample['members'][node_name] = None
+                continue
+            member = {
+                'queue': int(stats['COUNT_TRANSACTIONS_IN_QUEUE']),
+                'applier_queue': int(stats['COUNT_TRANSACTIONS_REMOTE_IN_APPLIER_QUEUE']),
+                'rows_validating': int(stats['COUNT_TRANSACTIONS_ROWS_VALIDATING'])
+            }
+            previous = self._previous.get(node_name)
+            for column in DELTA_COLUMNS:
+                key = column[len('COUNT_'):].lower()
+                # A restarted member starts counting from zero again
+                if previous is None or int(stats[column]) < int(previous[column]):
+                    member[key] = None
+                else:
+                    member[key] = int(stats[column]) - int(previous[column])
+            self._previous[node_name] = stats
+            sample['members'][node_name] = member
+            if member['queue'] > int(self.flow_control['certifier_threshold']) or \
+                    member['applier_queue'] > int(self.flow_control['applier_threshold']):
+                sample['throttled_by'].append(node_name)
+
+        self.samples.append(sample)
+
+    # --- Reporting ------------------------------------------------------------
+
+    def throttled_seconds(self) -> float:
+        seconds, previous = 0.0, 0.0
+        for sample in self.samples:
+            if sample['throttled_by']:
+                seconds += sample['t'] - previous
+            previous = sample['t']
+        return seconds
+
+    def print_report(self) -> None:
+        if not self.samples:
+            return
+        fc = self.flow_control
+        print(f"\n🚰 Flow Control Timeline (mode {fc['mode'] or 'unknown'}, "
+              f"thresholds certifier {fc['certifier_threshold']} / applier {fc['applier_threshold']}):")
+        header = f"{'t (s)':>6} {'Phase':<14} {'TPS':>7} {'p99 ms':>8}"
+        for node_name in self.nodes:
+            header += f" {node_name + ' q/aq/conf':>22}"
+        print(header + "  Throttled")
+        for sample in self.samples:
+            p99 = f"{sample['p99_ms']:.1f}" if sample['p99_ms'] is not None else "-"
+            row = f"{sample['t']:>6.1f} {sample['phase']:<14} {sample['commits_per_sec']:>7.0f} {p99:>8}"
+            for node_name in self.nodes:
+                member = sample['members'].get(node_name)
+                if member is None:
+                    cell = "down"
+                else:
+                    conflicts = member['conflicts_detected']
+                    cell = (f"{member['queue']}/{member['applier_queue']}/"
+                            f"{conflicts if conflicts is not None else '-'}")
+                row += f" {cell:>22}"
+            print(row + ("  " + ",".join(sample['throttled_by']) if sample['throttled_by'] else ""))
+        print(f"Seconds over a flow-control threshold: {self.throttled_seconds():.1f}")
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Samples flattened to one row per interval (``<node>_<column>`` per member)."""
+        columns = ('queue', 'applier_queue', 'rows_validating', 'conflicts_detected',
+                   'transactions_checked', 'transactions_remote_applied', 'transactions_local_proposed')
+        flat = []
+        for sample in self.samples:
+            row = {key: sample[key] for key in ('t', 'phase', 'commits_per_sec', 'latency_count', 'p50_ms', 'p99_ms')}
+            for node_name in self.nodes:
+                member = sample['members'].get(node_name) or {}
+                for column in columns:
+                    row[f"{node_name}_{column}"] = member.get(column)
+            row['throttled_by'] = ",".join(sample['throttled_by'])
+            flat.append(row)
+        return flat
+
+    def export(self, path: str) -> None:
+        """Write the timeline as CSV, one row per interval."""
+        rows = self.rows()
+        if not rows:
+            return
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
@@ -0,0 +1,289 @@
+import mysql.connector
+from mysql.connector import Error
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from probe import has_quorum
+from test import DB_CONFIG, NODES
+
+MONITOR_INTERVAL = 0.05  # seconds between ticks
+MONITOR_TIMEOUT = 1  # seconds; connect/read timeout per node (an int: the C extension rejects floats)
+RECONNECT_BACKOFF = 1.0  # seconds between reconnect attempts to a failing node
+CONTAINER_REFRESH_INTERVAL = 1.0  # seconds between Docker state refreshes
+
+# Table missing / unknown database: fall back to the membership-only query
+MISSING_TABLE_ERRORS = {1049, 1146}
+
+MEMBER_FIELDS = ('MEMBER_HOST', 'MEMBER_STATE', 'MEMBER_ROLE', 'records')
+
+MEMBERS_QUERY = """
+    SELECT MEMBER_HOST, MEMBER_STATE, MEMBER_ROLE
+    FROM performance_schema.replication_group_members
+"""
+
+
+class NodeMonitor:
+    """One long-lived connection to a node and its combined status query.
+
+    With a Docker client, a node whose published port does not answer is
+    asked through ``docker exec`` instead, like ``monitor.sh``. A node cut
+    off the cluster network (skenario3 ``isolate.sh``) keeps showing its
+    own minority view instead of turning unreachable.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any], database: str, table: Optional[str],
+                 docker_client: Optional[Any] = None):
+        self.name = name
+        self.config = config
+        self.host = config['container']
+        self.table = f"`{database}`.`{table}`" if table else None
+        self.docker = docker_client
+        self._connection = None
+        self._next_connect = 0.0
+        self._next_exec = 0.0
+        self._last_exec: Optional[Tuple[float, Dict[str, Any]]] = None  # (monotonic time, sample)
+
+    def _query(self) -> str:
+        if not self.table:
+            return MEMBERS_QUERY
+        # Records count rides along as a scalar subquery: one round trip per tick
+        return f"""
+            SELECT MEMBER_HOST, MEMBER_STATE, MEMBER_ROLE,
+                   (SELECT COUNT(*) FROM {self.table}) AS records
+            FROM performance_schema.replication_group_members
+        """
+
+    def _connect(self):
+        if self._connection is None:
+            if time.monotonic() < self._next_connect:
+                raise Error(msg="waiting before reconnect")
+            self._next_connect = time.monotonic() + RECONNECT_BACKOFF
+            self._connection = mysql.connector.connect(
+                host=self.config['host'],
+                port=self.config['port'],
+                user=DB_CONFIG['user'],
+                password=DB_CONFIG['password'],
+                autocommit=True,
+                connection_timeout=MONITOR_TIMEOUT
+            )
+        return self._connection
+
+    def sample(self) -> Dict[str, Any]:
+        """Fetch state, role, record count and the node's view of the group."""
+        started = time.perf_counter()
+        try:
+            connection = self._connect()
+            with connection.cursor(dictionary=True) as cursor:
+                cursor.execute(self._query())
+                view = cursor.fetchall()
+        except Error as e:
+            if getattr(e, 'errno', None) in MISSING_TABLE_ERRORS:
+                self.table = None
+                return self.sample()
+            self._drop_connection()
+            if self.docker is not None:
+                return self._sample_exec_throttled(started, str(e))
+            return {'reachable': False, 'error': str(e)}
+        return self._summarize(view, started)
+
+    def _sample_exec_throttled(self, started: float, reason: str) -> Dict[str, Any]:
+        """docker exec at most once per reconnect backoff; in between the last answer is shown as stale."""
+        now = time.monotonic()
+        if now < self._next_exec and self._last_exec is not None:
+            sampled_at, sample = self._last_exec
+            return dict(sample, stale_ms=round((now - sampled_at) * 1000, 1))
+        self._next_exec = now + RECONNECT_BACKOFF
+        sample = self._sample_exec(started, reason)
+        self._last_exec = (time.monotonic(), sample)
+        return sample
+
+    def _sample_exec(self, started: float, reason: str) -> Dict[str, Any]:
+        """Run the status query with the mysql client inside the container."""
+        command = ["mysql", f"-u{DB_CONFIG['user']}", f"-p{DB_CONFIG['password']}", "-sN", "-e", self._query()]
+        try:
+            result = self.docker.containers.get(self.host).exec_run(command, demux=True)
+        except Exception as e:
+            return {'reachable': False, 'error': f"{reason}; docker exec: {e}"}
+        stdout, stderr = result.output if isinstance(result.output, tuple) else (result.output, None)
+        if result.exit_code != 0:
+            message = (stderr or stdout or b"").decode(errors="replace").strip().splitlines()
+            if self.table and any(f"ERROR {errno}" in line for errno in MISSING_TABLE_ERRORS for line in message):
+                self.table = None
+                return self._sample_exec(started, reason)
+            detail = message[-1] if message else f"exit code {result.exit_code}"
+            return {'reachable': False, 'error': f"{reason}; docker exec: {detail}"}
+
+        view = [dict(zip(MEMBER_FIELDS, line.split("\t")))
+                for line in (stdout or b"").decode(errors="replace").splitlines() if line]
+        for member in view:
+            if member.get('records') is not None:
+                member['records'] = int(member['records']) if member['records'].isdigit() else None
+        return dict(self._summarize(view, started), via='docker exec')
+
+    def _summarize(self, view: List[Dict[str, Any]], started: float) -> Dict[str, Any]:
+        me = next((m for m in view if m['MEMBER_HOST'] == self.host), None)
+        online = sum(1 for m in view if m['MEMBER_STATE'] == 'ONLINE')
+        return {
+            'reachable': True,
+            'state': me['MEMBER_STATE'] if me else None,
+            'role': me['MEMBER_ROLE'] if me else None,
+            'records': view[0].get('records') if view else None,
+            'online': online,
+            'total': len(view),
+            'quorum_needed': len(view) // 2 + 1,
+            'quorum': has_quorum(view),
+            'latency_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    def _drop_connection(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class ContainerWatcher(threading.Thread):
+    """Refresh container running/network state from the Docker API in the background."""
+
+    def __init__(self, containers: List[str], network_hint: str = "mysql-cluster"):
+        super().__init__(daemon=True)
+        import docker
+        self.client = docker.from_env()
+        self.containers = containers
+        self.network_hint = network_hint
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self.running = True
+
+    def run(self) -> None:
+        while self.running:
+            for name in self.containers:
+                try:
+                    attrs = self.client.api.inspect_container(name)
+                    networks = attrs['NetworkSettings']['Networks'].keys()
+                    self.state[name] = {
+                        'running': attrs['State']['Running'],
+                        'connected': any(self.network_hint in n for n in networks)
+                    }
+                except Exception:
+                    self.state[name] = {'running': False, 'connected': False}
+            time.sleep(CONTAINER_REFRESH_INTERVAL)
+
+
+class ClusterMonitor:
+    """Python port of the skenario2/skenario3 monitor.sh scripts.
+
+    Each tick runs one combined query per node, all nodes in parallel, over
+    a persistent connection. A node that does not answer within the tick
+    keeps its in-flight query; its last sample is shown as stale until
+    ``MONITOR_TIMEOUT`` passes, after which it is reported unreachable.
+    """
+
+    def __init__(self, database: str, table: Optional[str], interval: float = MONITOR_INTERVAL,
+                 containers: bool = False):
+        self.interval = interval
+        self.watcher = ContainerWatcher([c['container'] for c in NODES.values()]) if containers else None
+        docker_client = self.watcher.client if self.watcher else None
+        self.monitors = {name: NodeMonitor(name, config, database, table, docker_client)
+                         for name, config in NODES.items()}
+        self._executor = ThreadPoolExecutor(max_workers=len(self.monitors), thread_name_prefix="monitor")
+        self._inflight: Dict[str, Tuple[Future, float]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+
+    def tick(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        for name, monitor in self.monitors.items():
+            if name not in self._inflight:
+                self._inflight[name] = (self._executor.submit(monitor.sample), now)
+
+        # Wait at most one interval so a hung node never slows the refresh rate
+        deadline = now + self.interval
+        nodes: Dict[str, Any] = {}
+        for name, (future, submitted) in list(self._inflight.items()):
+            try:
+                self._last[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                del self._inflight[name]
+                nodes[name] = dict(self._last[name])
+            except FutureTimeoutError:
+                waited = time.monotonic() - submitted
+                if waited >= MONITOR_TIMEOUT or name not in self._last:
+                    nodes[name] = {'reachable': False, 'error': f'no answer for {waited * 1000:.0f} ms'}
+                else:
+                    nodes[name] = dict(self._last[name], stale_ms=round(waited * 1000, 1))
+            if self.watcher:
+                nodes[name]['container'] = self.watcher.state.get(NODES[name]['container'])
+
+        return {'ts': time.time(), 'nodes': nodes}
+
+    def run(self, output_json: bool, count: Optional[int] = None) -> None:
+        if self.watcher:
+            self.watcher.start()
+        ticks = 0
+        next_tick = time.perf_counter()
+        while count is None or ticks < count:
+            snapshot = self.tick()
+            if output_json:
+                sys.stdout.write(json.dumps(snapshot) + "\n")
+                sys.stdout.flush()
+            else:
+                self._render(snapshot)
+            ticks += 1
+            next_tick += self.interval
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    def _render(self, snapshot: Dict[str, Any]) -> None:
+        lines = ["\033[H\033[2J=== CLUSTER STATUS === "
+                 + datetime.fromtimestamp(snapshot['ts']).strftime('%H:%M:%S.%f')[:-3], ""]
+        for name, node in snapshot['nodes'].items():
+            container = node.get('container')
+            prefix = f"  {name:<6}"
+            if container is not None:
+                prefix += (f" {'RUNNING' if container['running'] else 'STOPPED':<8}"
+                           f" {'net' if container['connected'] else 'ISOLATED':<8}")
+            if not node['reachable']:
+                lines.append(f"{prefix} unreachable ({node['error']})")
+                continue
+            quorum = "quorum" if node['quorum'] else "NO QUORUM (read-only)"
+            stale = f", stale {node['stale_ms']:.0f} ms" if node.get('stale_ms') else ""
+            lines.append(f"{prefix} State: {str(node['state']):<12} Role: {str(node['role']):<10} "
+                         f"Records: {str(node['records']):<8} "
+                         f"Online: {node['online']}/{node['total']} (need {node['quorum_needed']}) {quorum} "
+                         f"[{node['latency_ms']:.1f} ms{' via docker exec' if node.get('via') else ''}"
+                         f"{stale}]")
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Group Replication monitor with one connection per node")
+    parser.add_argument("--database", default=DB_CONFIG['database'])
+    parser.add_argument("--table", default="transactions",
+                        help="table to count records in (use network_partition_test for skenario3)")
+    parser.add_argument("--interval", type=float, default=MONITOR_INTERVAL, help="seconds between ticks")
+    parser.add_argument("--json", action="store_true", help="emit one JSON object per tick")
+    parser.add_argument("--containers", action="store_true",
+                        help="also show container running/network state via the Docker API, and query "
+                             "nodes whose port does not answer (e.g. isolated) through docker exec")
+    parser.add_argument("--count", type=int, help="stop after this many ticks")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    monitor = ClusterMonitor(args.database, args.table, args.interval, args.containers)
+    try:
+        monitor.run(args.json, args.count)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+import mysql.connector
+from mysql.connector import Error
+import argparse
+import bisect
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from latency import LatencyRecorder
+from pool import NodeConnectionPool
+from test import DB_CONFIG, NODES
+from workload import OpenLoopWorkload
+
+MODES = ("single", "multi")
+DISTRIBUTIONS = ("uniform", "zipfian")
+KEY_COUNTS = (100000, 10000, 1000, 100, 10)  # fewer hot keys = more contention
+TARGET_RATE = 600  # updates per second offered to the whole group, in both modes
+WORKERS_PER_NODE = 16
+RUN_DURATION = 20  # seconds per point on the curve
+WARMUP = 2  # seconds before a run whose samples are discarded
+ZIPF_EXPONENT = 0.99
+HOT_TABLE = "hot_keys"
+POOL_ACQUIRE_TIMEOUT = 5  # seconds
+CONNECT_TIMEOUT = 2  # seconds; an int, the C extension rejects float connection_timeout
+
+# Another member's transaction was certified first on the same rows
+CERTIFICATION_ERRORS = {3101}  # ER_TRANSACTION_ROLLBACK_DURING_COMMIT
+# Local lock conflicts, including local transactions killed by an applied remote one
+LOCK_ERRORS = {1205, 1213}  # lock wait timeout / deadlock
+
+UPDATE_QUERY = f"UPDATE {HOT_TABLE} SET counter = counter + 1, updated_at = NOW(3) WHERE id = %s"
+
+MEMBER_STATS_QUERY = """
+    SELECT MEMBER_ID, COUNT_CONFLICTS_DETECTED
+    FROM performance_schema.replication_group_member_stats
+    WHERE MEMBER_ID = @@server_uuid
+"""
+
+
+class KeyChooser:
+    """Pick hot-key ids in ``[1, keys]`` uniformly or from a Zipf distribution.
+
+    The Zipf CDF is built once, so a pick is one ``random()`` and a bisect.
+    Key 1 is the hottest; with exponent ~1 and 1000 keys it takes ~13% of
+    all picks.
+    """
+
+    def __init__(self, keys: int, distribution: str = "uniform", exponent: float = ZIPF_EXPONENT,
+                 seed: Optional[int] = None):
+        if keys <= 0:
+            raise ValueError("keys must be positive")
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"unknown distribution {distribution!r}")
+        self.keys = keys
+        self.distribution = distribution
+        self._local = threading.local()
+        self._seed = itertools.count(seed if seed is not None else random.randrange(1 << 30))
+        self._cdf: List[float] = []
+        if distribution == "zipfian":
+            weights = list(itertools.accumulate(1.0 / rank ** exponent for rank in range(1, keys + 1)))
+            self._cdf = [w / weights[-1] for w in weights]
+
+    def _rng(self) -> random.Random:
+        rng = getattr(self._local, 'rng', None)
+        if rng is None:
+            rng = self._local.rng = random.Random(next(self._seed))
+        return rng
+
+    def next(self) -> int:
+        rng = self._rng()
+        if not self._cdf:
+            return rng.randrange(self.keys) + 1
+        return min(bisect.bisect_left(self._cdf, rng.random()), self.keys - 1) + 1
+
+
+class ContentionBenchmark:
+    """Throughput and certification failures against row contention, per group mode.
+
+    For each mode the group is switched with
+    ``group_replication_switch_to_{multi,single}_primary_mode()``; the same
+    open-loop update load (``target_rate`` in total) then goes to every
+    member in multi-primary mode, split evenly, or all to the primary in
+    single-primary mode. Every update increments one row of ``hot_keys``
+    picked from ``keys`` rows, so shrinking ``keys`` raises the chance that
+    two members update the same row concurrently and one of them fails
+    certification at commit. Commits, certification rollbacks, local lock
+    conflicts and latency are recorded per writing node.
+    """
+
+    def __init__(self, target_rate: float = TARGET_RATE, workers: int = WORKERS_PER_NODE,
+                 duration: float = RUN_DURATION, exponent: float = ZIPF_EXPONENT):
+        self.target_rate = target_rate
+        self.workers = workers
+        self.duration = duration
+        self.exponent = exponent
+        self.nodes = {name: dict(config) for name, config in NODES.items()}
+        self.pool = NodeConnectionPool(self._connect, max_size=workers + 2,
+                                       acquire_timeout=POOL_ACQUIRE_TIMEOUT)
+        self.latency = LatencyRecorder()
+        self.results: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._recording = False
+        self._running = False
+
+    def _connect(self, node_name: str, database: Optional[str] = DB_CONFIG['database']):
+        node = self.nodes[node_name]
+        return mysql.connector.connect(
+            host=node['host'],
+            port=node['port'],
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            database=database,
+            autocommit=False,
+            connection_timeout=CONNECT_TIMEOUT
+        )
+
+    # --- Group mode -----------------------------------------------------------
+
+    def _query_any(self, query: str, params: tuple = ()) -> List[tuple]:
+        last_error: Optional[Error] = None
+        for node_name in self.nodes:
+            try:
+                conn = self._connect(node_name, database=None)
+            except Error as e:
+                last_error = e
+                continue
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    return cursor.fetchall()
+            finally:
+                conn.close()
+        raise last_error or Error("no node reachable")
+
+    def members(self) -> List[Dict[str, Any]]:
+        rows = self._query_any("""
+            SELECT MEMBER_HOST, MEMBER_STATE, MEMBER_ROLE
+            FROM performance_schema.replication_group_members
+        """)
+        return [{'MEMBER_HOST': host, 'MEMBER_STATE': state, 'MEMBER_ROLE': role} for host, state, role in rows]
+
+    def current_mode(self) -> str:
+        roles = {m['MEMBER_ROLE'] for m in self.members() if m['MEMBER_STATE'] == 'ONLINE'}
+        return "multi" if roles == {'PRIMARY'} else "single"
+
+    def writers(self, mode: str) -> List[str]:
+        """Nodes that take writes in ``mode``: every ONLINE member, or just the primary."""
+        hosts = {config['container']: name for name, config in self.nodes.items()}
+        online = [m for m in self.members() if m['MEMBER_STATE'] == 'ONLINE']
+        if mode == "single":
+            online = [m for m in online if m['MEMBER_ROLE'] == 'PRIMARY']
+        return [hosts[m['MEMBER_HOST']] for m in online if m['MEMBER_HOST'] in hosts]
+
+    def switch_mode(self, mode: str) -> None:
+        if self.current_mode() == mode:
+            print(f"✅ Group already in {mode}-primary mode")
+            return
+        function = "group_replication_switch_to_multi_primary_mode" if mode == "multi" \
+            else "group_replication_switch_to_single_primary_mode"
+        print(f"🔀 Switching group to {mode}-primary mode...")
+        started = time.perf_counter()
+        # The switch is a group action; it returns once every member has changed mode
+        message = self._query_any(f"SELECT {function}()")[0][0]
+        print(f"✅ {message} ({time.perf_counter() - started:.2f}s)")
+
+    # --- Setup ----------------------------------------------------------------
+
+    def setup(self, keys: int) -> None:
+        """(Re)create ``hot_keys`` with ``keys`` rows on a writable member."""
+        writer = self.writers(self.current_mode())[0]
+        conn = self._connect(writer, database=None)
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_CONFIG['database']}")
+            cursor.execute(f"USE {DB_CONFIG['database']}")
+            cursor.execute(f"DROP TABLE IF EXISTS {HOT_TABLE}")
+            cursor.execute(f"""
+                CREATE TABLE {HOT_TABLE} (
+                    id INT PRIMARY KEY,
+                    counter BIGINT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP(3) NULL
+                ) ENGINE=InnoDB
+            """)
+            for start in range(1, keys + 1, 1000):
+                ids = [(i,) for i in range(start, min(start + 1000, keys + 1))]
+                cursor.executemany(f"INSERT INTO {HOT_TABLE} (id) VALUES (%s)", ids)
+                conn.commit()
+        conn.close()
+        # Drop connections (and cached statements) that point at the old table
+        for node_name in self.nodes:
+            self.pool.invalidate(node_name)
+
+    # --- One run --------------------------------------------------------------
+
+    def run_once(self, mode: str, keys: int, distribution: str) -> Dict[str, Any]:
+        writers = self.writers(mode)
+        label = f"{mode}-{distribution}-{keys}"
+        print(f"\n{'='*80}")
+        print(f"🔥 {label}: {self.target_rate:.0f} updates/s over {', '.join(writers)}")
+        print(f"{'='*80}")
+
+        self.setup(keys)
+        chooser = KeyChooser(keys, distribution, self.exponent)
+        self._counters = {name: defaultdict(int) for name in writers}
+        self.latency.set_phase(label)
+        conflicts_before = self._conflicts_detected(writers)
+
+        self._running = True
+        self._recording = False
+        threads = [
+            threading.Thread(target=self._drive, args=(name, chooser, self.target_rate / len(writers)),
+                             name=f"writer-{name}", daemon=True)
+            for name in writers
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(WARMUP)
+        self._recording = True
+        measured_from = time.perf_counter()
+        time.sleep(self.duration)
+        self._recording = False
+        elapsed = time.perf_counter() - measured_from
+        self._running = False
+        for thread in threads:
+            thread.join()
+
+        conflicts_after = self._conflicts_detected(writers)
+        result = self._summarize(label, mode, keys, distribution, elapsed)
+        result['conflicts_detected'] = {
+            name: conflicts_after.get(name, 0) - conflicts_before.get(name, 0) for name in writers
+        }
+        self._print_result(result)
+        self.results.append(result)
+        return result
+
+    def _drive(self, node_name: str, chooser: KeyChooser, rate: float) -> None:
+        def record(seq: int, latency: float, start_lag: float) -> None:
+            if self._recording:
+                self.latency.record(node_name, latency)
+
+        workload = OpenLoopWorkload(lambda seq: self._update(node_name, chooser.next()), rate,
+                                    self.workers, lambda: self._running, record)
+        workload.run()
+
+    def _update(self, node_name: str, key: int) -> None:
+        counters = self._counters[node_name]
+        try:
+            conn = self.pool.acquire(node_name)
+        except Error:
+            self._count(counters, 'connection_failed')
+            return
+        discard = False
+        try:
+            self.pool.prepared(conn, UPDATE_QUERY).execute(UPDATE_QUERY, (key,))
+            conn.commit()
+            self._count(counters, 'commits')
+        except Error as e:
+            errno = getattr(e, 'errno', None)
+            if errno in CERTIFICATION_ERRORS:
+                self._count(counters, 'cert_rollbacks')
+            elif errno in LOCK_ERRORS:
+                self._count(counters, 'lock_conflicts')
+            else:
+                self._count(counters, f"error_{errno}")
+            discard = self.pool.report_error(conn, e)
+            if not discard:
+                try:
+                    conn.rollback()
+                except Error:
+                    discard = True
+        finally:
+            self.pool.release(node_name, conn, discard=discard)
+
+    def _count(self, counters: Dict[str, int], key: str) -> None:
+        if self._recording:
+            with self._lock:
+                counters[key] += 1
+
+    def _conflicts_detected(self, writers: List[str]) -> Dict[str, int]:
+        """Each member's certifier conflict counter (cumulative since it joined)."""
+        counts = {}
+        for node_name in writers:
+            try:
+                conn = self._connect(node_name, database=None)
+            except Error:
+                continue
+            with conn.cursor() as cursor:
+                cursor.execute(MEMBER_STATS_QUERY)
+                row = cursor.fetchone()
+            conn.close()
+            if row:
+                counts[node_name] = int(row[1])
+        return counts
+
+    def _summarize(self, label: str, mode: str, keys: int, distribution: str, elapsed: float) -> Dict[str, Any]:
+        histograms = self.latency.snapshot().get(label, {})
+        per_node = {}
+        for name, counters in self._counters.items():
+            commits = counters.get('commits', 0)
+            attempts = sum(counters.values())
+            summary = histograms[name].summary() if name in histograms else {}
+            per_node[name] = {
+                **counters,
+                'commits': commits,
+                'attempts': attempts,
+                'commits_per_sec': commits / elapsed,
+                'cert_rollback_rate': counters.get('cert_rollbacks', 0) / attempts if attempts else 0.0,
+                'p50_ms': summary.get('p50_ms'),
+                'p99_ms': summary.get('p99_ms')
+            }
+        commits = sum(n['commits'] for n in per_node.values())
+        attempts = sum(n['attempts'] for n in per_node.values())
+        rollbacks = sum(n.get('cert_rollbacks', 0) for n in per_node.values())
+        return {
+            'label': label,
+            'mode': mode,
+            'keys': keys,
+            'distribution': distribution,
+            'offered_rate': self.target_rate,
+            'elapsed_s': elapsed,
+            'commits_per_sec': commits / elapsed,
+            'cert_rollbacks': rollbacks,
+            'cert_rollback_rate': rollbacks / attempts if attempts else 0.0,
+            'nodes': per_node
+        }
+
+    @staticmethod
+    def _print_result(result: Dict[str, Any]) -> None:
+        print(f"{'Node':<8} {'commits/s':>10} {'cert rb':>8} {'rb %':>6} {'lock':>6} {'other':>6} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'conflicts':>10}")
+        for name, n in result['nodes'].items():
+            other = n['attempts'] - n['commits'] - n.get('cert_rollbacks', 0) - n.get('lock_conflicts', 0)
+            p50 = f"{n['p50_ms']:.2f}" if n['p50_ms'] is not None else "-"
+            p99 = f"{n['p99_ms']:.2f}" if n['p99_ms'] is not None else "-"
+            print(f"{name:<8} {n['commits_per_sec']:>10.1f} {n.get('cert_rollbacks', 0):>8} "
+                  f"{n['cert_rollback_rate'] * 100:>6.2f} {n.get('lock_conflicts', 0):>6} {other:>6} "
+                  f"{p50:>8} {p99:>8} {result['conflicts_detected'].get(name, '-'):>10}")
+
+    # --- Curve ----------------------------------------------------------------
+
+    def curve(self, modes: List[str], keys: List[int], distributions: List[str]) -> List[Dict[str, Any]]:
+        original = self.current_mode()
+        try:
+            for mode in modes:
+                self.switch_mode(mode)
+                for distribution in distributions:
+                    for key_count in keys:
+                        self.run_once(mode, key_count, distribution)
+        finally:
+            # The node configs pin single-primary mode; leave the group as found
+            self.switch_mode(original)
+        self.print_curve()
+        return self.results
+
+    def print_curve(self) -> None:
+        print(f"\n{'='*80}")
+        print(f"📈 THROUGHPUT vs CONTENTION (offered {self.target_rate:.0f} updates/s)")
+        print(f"{'='*80}")
+        print(f"{'Distribution':<12} {'Keys':>8} " + " ".join(
+            f"{mode + ' c/s':>12} {mode + ' rb %':>10}" for mode in MODES))
+        points: Dict[tuple, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        for r in self.results:
+            points[(r['distribution'], r['keys'])][r['mode']] = r
+        for (distribution, keys), by_mode in points.items():
+            row = f"{distribution:<12} {keys:>8} "
+            for mode in MODES:
+                r = by_mode.get(mode)
+                row += (f"{r['commits_per_sec']:>12.1f} {r['cert_rollback_rate'] * 100:>10.2f} " if r
+                        else f"{'-':>12} {'-':>10} ")
+            print(row)
+
+
+def _list(cast: Callable[[str], Any]) -> Callable[[str], List[Any]]:
+    return lambda value: [cast(v) for v in value.split(",") if v]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Certification failures and throughput vs row contention "
+                                                 "in multi-primary and single-primary mode")
+    parser.add_argument("--modes", type=_list(str), default=list(MODES), help="comma-separated: single,multi")
+    parser.add_argument("--keys", type=_list(int), default=list(KEY_COUNTS),
+                        help="comma-separated hot-key counts (the contention axis)")
+    parser.add_argument("--distributions", type=_list(str), default=["uniform"],
+                        help="comma-separated: uniform,zipfian")
+    parser.add_argument("--zipf-exponent", type=float, default=ZIPF_EXPONENT)
+    parser.add_argument("--rate", type=float, default=TARGET_RATE, help="updates/s offered to the whole group")
+    parser.add_argument("--workers", type=int, default=WORKERS_PER_NODE, help="writer threads per node")
+    parser.add_argument("--duration", type=float, default=RUN_DURATION, help="measured seconds per point")
+    parser.add_argument("--json", metavar="PATH", help="write per-run results to this JSON file")
+    parser.add_argument("--histogram-out", metavar="PATH", help="write latency histograms to this JSON file")
+    args = parser.parse_args()
+    for mode in args.modes:
+        if mode not in MODES:
+            parser.error(f"unknown mode {mode!r}")
+    for distribution in args.distributions:
+        if distribution not in DISTRIBUTIONS:
+            parser.error(f"unknown distribution {distribution!r}")
+    return args
+
+
+def main():
+    args = parse_args()
+    benchmark = ContentionBenchmark(args.rate, args.workers, args.duration, args.zipf_exponent)
+    try:
+        benchmark.curve(args.modes, args.keys, args.distributions)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Benchmark interrupted by user")
+    except Error as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        benchmark.pool.close_all()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(benchmark.results, f, indent=2)
+        print(f"Results written to {args.json}")
+    if args.histogram_out:
+        benchmark.latency.export(args.histogram_out)
+        print(f"Histograms written to {args.histogram_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+from mysql.connector import Error
+
+# Client-side errno values meaning the server or socket is gone
+CONNECTION_LOST_ERRORS = {2003, 2006, 2013, 2055}
+
+
+class PoolExhaustedError(Error):
+    """Raised when a node's pool stays at max size for the whole acquire timeout."""
+
+
+class NodeConnectionPool:
+    """Per-node MySQL connection pool with health checks and idle eviction.
+
+    Idle connections are kept in a LIFO stack per node so the most recently
+    used (and therefore most likely healthy) connection is handed out first.
+    A connection that has been idle for longer than ``health_check_after``
+    seconds is pinged before reuse; connections idle for longer than
+    ``idle_timeout`` seconds are closed. Each pooled connection keeps its
+    own cache of server-side prepared statements (see ``prepared``).
+    """
+
+    def __init__(self, connect: Callable[[str], Any], max_size: int = 4,
+                 idle_timeout: float = 30.0, health_check_after: float = 1.0,
+                 acquire_timeout: float = 5.0):
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.acquire_timeout = acquire_timeout
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle: Dict[str, Deque[Tuple[Any, float]]] = defaultdict(deque)
+        self._open: Dict[str, int] = defaultdict(int)
+        self._owner: Dict[int, str] = {}
+        self._generation: Dict[str, int] = defaultdict(int)
+        self._conn_generation: Dict[int, int] = {}
+        self._statements: Dict[int, Dict[str, Any]] = {}
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'reconnects': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'prepares': 0,
+            'statement_hits': 0
+        }
+
+    def acquire(self, node_name: str) -> Any:
+        """Check out a healthy connection for ``node_name``, opening one if needed."""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._lock:
+                self._evict_idle(node_name)
+                pooled = self._idle[node_name].pop() if self._idle[node_name] else None
+                if pooled is None:
+                    if self._open[node_name] < self.max_size:
+                        self._open[node_name] += 1
+                        self.stats['misses'] += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(
+                            msg=f"Connection pool for {node_name} exhausted "
+                                f"({self.max_size} connections in use)")
+                    self._available.wait(remaining)
+                    continue
+
+            connection, released_at = pooled
+            if time.monotonic() - released_at < self.health_check_after or self._is_healthy(connection):
+                with self._lock:
+                    self.stats['hits'] += 1
+                return connection
+
+            # Stale connection: drop it and replace it with a fresh one
+            self._close_quietly(connection)
+            with self._lock:
+                self._forget(connection)
+                self._open[node_name] += 1
+                self.stats['reconnects'] += 1
+                break
+
+        try:
+            connection = self._connect(node_name)
+        except Exception:
+            with self._lock:
+                self._open[node_name] -= 1
+                self._available.notify()
+            raise
+
+        with self._lock:
+            self._owner[id(connection)] = node_name
+            self._conn_generation[id(connection)] = self._generation[node_name]
+        return connection
+
+    def release(self, node_name: str, connection: Any, discard: bool = False) -> None:
+        """Return a connection to the pool, or close it if it is no longer usable."""
+        if not discard:
+            try:
+                if connection.in_transaction:
+                    connection.rollback()
+            except Error:
+                discard = True
+
+        with self._lock:
+            stale = self._conn_generation.get(id(connection)) != self._generation[node_name]
+            if discard or stale:
+                self._forget(connection)
+            else:
+                self._idle[node_name].append((connection, time.monotonic()))
+            self._available.notify()
+
+        if discard or stale:
+            self._close_quietly(connection)
+
+    def prepared(self, connection: Any, query: str) -> Any:
+        """Prepared cursor for ``query`` on a checked-out connection.
+
+        The cursor is cached per connection, so the statement is PREPAREd once
+        per connection and every later execute only sends the bound values.
+        Only the thread holding the connection touches its cache.
+        """
+        with self._lock:
+            statements = self._statements.setdefault(id(connection), {})
+            cursor = statements.get(query)
+            if cursor is None:
+                self.stats['prepares'] += 1
+            else:
+                self.stats['statement_hits'] += 1
+        if cursor is None:
+            cursor = statements[query] = connection.cursor(prepared=True)
+        return cursor
+
+    def report_error(self, connection: Any, error: Error) -> bool:
+        """Invalidate the owning node if ``error`` means its connection is gone."""
+        if getattr(error, 'errno', None) not in CONNECTION_LOST_ERRORS:
+            return False
+        with self._lock:
+            node_name = self._owner.get(id(connection))
+        if node_name:
+            self.invalidate(node_name)
+        return True
+
+    def invalidate(self, node_name: str) -> None:
+        """Close every idle connection to ``node_name`` and retire checked-out ones."""
+        with self._lock:
+            self._generation[node_name] += 1
+            idle = list(self._idle[node_name])
+            self._idle[node_name].clear()
+            for connection, _ in idle:
+                self._forget(connection)
+            self.stats['invalidations'] += 1
+            self._available.notify_all()
+
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def close_all(self) -> None:
+        """Close every pooled connection on every node."""
+        for node_name in list(self._idle.keys()):
+            self.invalidate(node_name)
+
+    def _evict_idle(self, node_name: str) -> None:
+        """Close connections that sat idle longer than ``idle_timeout`` (lock held)."""
+        idle = self._idle[node_name]
+        now = time.monotonic()
+        # Oldest connections are at the left end of the deque
+        while idle and now - idle[0][1] > self.idle_timeout:
+            connection, _ = idle.popleft()
+            self._forget(connection)
+            self.stats['evictions'] += 1
+            self._close_quietly(connection)
+
+    def _forget(self, connection: Any) -> None:
+        """Drop bookkeeping for a connection that leaves the pool (lock held)."""
+        node_name = self._owner.pop(id(connection), None)
+        self._conn_generation.pop(id(connection), None)
+        # Prepared statements die with the connection
+        self._statements.pop(id(connection), None)
+        if node_name:
+            self._open[node_name] -= 1
+
+    @staticmethod
+    def _is_healthy(connection: Any) -> bool:
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
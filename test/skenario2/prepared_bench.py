@@ -0,0 +1,171 @@
+import mysql.connector
+import argparse
+import itertools
+import time
+from typing import Any, Dict
+
+from pool import NodeConnectionPool
+from test import DB_CONFIG, DESCRIPTION_SIZE, INSERT_QUERY, NODES, GroupReplicationFailoverTest
+from payload import PayloadPool  # test.py puts the shared test/ modules on sys.path
+
+BENCH_ROWS = 10000  # inserts per mode
+COMMIT_EVERY = 1  # the failover workload commits every insert
+MODES = ("text", "prepare-each", "prepared-cached")
+
+SESSION_STATUS = ("Bytes_sent", "Bytes_received", "Questions", "Com_insert",
+                  "Com_stmt_prepare", "Com_stmt_execute")
+
+# Server time per statement class for this session's thread (picoseconds)
+SERVER_TIME_QUERY = """
+    SELECT EVENT_NAME, COUNT_STAR, SUM_TIMER_WAIT
+    FROM performance_schema.events_statements_summary_by_thread_by_event_name
+    WHERE THREAD_ID = PS_CURRENT_THREAD_ID()
+      AND EVENT_NAME IN ('statement/sql/insert', 'statement/com/Prepare', 'statement/com/Execute')
+"""
+
+
+class PreparedStatementBenchmark:
+    """Insert the failover workload's rows three ways and compare client and server cost.
+
+    ``text`` interpolates the values into the SQL on the client and the
+    server parses every statement; ``prepare-each`` prepares a fresh
+    statement per insert (the cost of prepared statements without a cache);
+    ``prepared-cached`` uses the pool's per-connection statement cache, so
+    only the binary-encoded values go over the wire after the first insert.
+    Session status deltas give bytes and statement counts; the server time
+    comes from performance_schema for the benchmark's own thread.
+    """
+
+    def __init__(self, node_name: str, rows: int = BENCH_ROWS):
+        self.node_name = node_name
+        self.rows = rows
+        self.payloads = PayloadPool(DESCRIPTION_SIZE)
+        self.pool = NodeConnectionPool(self._connect, max_size=1)
+        # Negative request keys never collide with the failover workload's, nor with earlier runs
+        self.request_keys = itertools.count(-time.time_ns())
+
+    def _connect(self, node_name: str):
+        node = NODES[node_name]
+        return mysql.connector.connect(
+            host=node['host'],
+            port=node['port'],
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            database=DB_CONFIG['database'],
+            autocommit=False
+        )
+
+    def setup(self) -> None:
+        node = NODES[self.node_name]
+        conn = mysql.connector.connect(host=node['host'], port=node['port'],
+                                       user=DB_CONFIG['user'], password=DB_CONFIG['password'])
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_CONFIG['database']}")
+            cursor.execute(f"USE {DB_CONFIG['database']}")
+            cursor.execute(GroupReplicationFailoverTest._get_table_schema(idempotent=False)
+                           .replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+        conn.close()
+
+    def run(self, mode: str) -> Dict[str, Any]:
+        # A fresh connection per mode keeps session counters and caches separate
+        self.pool.invalidate(self.node_name)
+        conn = self.pool.acquire(self.node_name)
+        try:
+            before_status, before_server = self._session_status(conn), self._server_time(conn)
+            insert = getattr(self, f"_insert_{mode.replace('-', '_')}")
+            started = time.perf_counter()
+            for seq in range(self.rows):
+                insert(conn, (next(self.request_keys), 100 + seq % 900, self.payloads.next()))
+                if (seq + 1) % COMMIT_EVERY == 0:
+                    conn.commit()
+            conn.commit()
+            elapsed = time.perf_counter() - started
+            after_status, after_server = self._session_status(conn), self._server_time(conn)
+        finally:
+            self.pool.release(self.node_name, conn)
+
+        status = {key: after_status[key] - before_status[key] for key in SESSION_STATUS}
+        server_ps = sum(after_server.values()) - sum(before_server.values())
+        return {
+            'mode': mode,
+            'rows': self.rows,
+            'elapsed_s': elapsed,
+            'rows_per_sec': self.rows / elapsed,
+            'client_us_per_row': elapsed / self.rows * 1e6,
+            'server_us_per_row': server_ps / 1e6 / self.rows,
+            'bytes_to_server_per_row': status['Bytes_received'] / self.rows,
+            'bytes_from_server_per_row': status['Bytes_sent'] / self.rows,
+            **status
+        }
+
+    @staticmethod
+    def _insert_text(conn, params) -> None:
+        with conn.cursor() as cursor:
+            cursor.execute(INSERT_QUERY, params)
+
+    @staticmethod
+    def _insert_prepare_each(conn, params) -> None:
+        cursor = conn.cursor(prepared=True)
+        cursor.execute(INSERT_QUERY, params)
+        cursor.close()
+
+    def _insert_prepared_cached(self, conn, params) -> None:
+        self.pool.prepared(conn, INSERT_QUERY).execute(INSERT_QUERY, params)
+
+    @staticmethod
+    def _session_status(conn) -> Dict[str, int]:
+        names = ", ".join(f"'{name}'" for name in SESSION_STATUS)
+        with conn.cursor() as cursor:
+            cursor.execute(f"SHOW SESSION STATUS WHERE Variable_name IN ({names})")
+            return {name: int(value) for name, value in cursor.fetchall()}
+
+    @staticmethod
+    def _server_time(conn) -> Dict[str, int]:
+        with conn.cursor() as cursor:
+            cursor.execute(SERVER_TIME_QUERY)
+            return {event: int(total) for event, _, total in cursor.fetchall()}
+
+
+def print_comparison(results) -> None:
+    print(f"\n{'='*96}")
+    print("📈 PREPARED STATEMENT BENCHMARK")
+    print(f"{'='*96}")
+    print(f"{'Mode':<16} {'rows/s':>9} {'client µs':>10} {'server µs':>10} "
+          f"{'B→server':>9} {'B←server':>9} {'prepares':>9} {'executes':>9} {'text':>7}")
+    for r in results:
+        print(f"{r['mode']:<16} {r['rows_per_sec']:>9.0f} {r['client_us_per_row']:>10.1f} "
+              f"{r['server_us_per_row']:>10.1f} {r['bytes_to_server_per_row']:>9.1f} "
+              f"{r['bytes_from_server_per_row']:>9.1f} {r['Com_stmt_prepare']:>9} "
+              f"{r['Com_stmt_execute']:>9} {r['Com_insert']:>7}")
+
+    base = next((r for r in results if r['mode'] == 'text'), None)
+    cached = next((r for r in results if r['mode'] == 'prepared-cached'), None)
+    if base and cached:
+        print(f"\nprepared-cached vs text: "
+              f"{(1 - cached['server_us_per_row'] / base['server_us_per_row']) * 100:+.1f}% server time saved, "
+              f"{(1 - cached['bytes_to_server_per_row'] / base['bytes_to_server_per_row']) * 100:+.1f}% "
+              f"bytes sent saved, throughput x{cached['rows_per_sec'] / base['rows_per_sec']:.2f}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Before/after benchmark for server-side prepared inserts")
+    parser.add_argument("--node", choices=list(NODES), default="node1", help="node to insert into (the primary)")
+    parser.add_argument("--rows", type=int, default=BENCH_ROWS, help="inserts per mode")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated subset of " + ", ".join(MODES))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchmark = PreparedStatementBenchmark(args.node, args.rows)
+    benchmark.setup()
+    results = []
+    for mode in args.modes.split(","):
+        print(f"⏳ {mode}: {args.rows} inserts on {args.node}...")
+        results.append(benchmark.run(mode))
+    benchmark.pool.close_all()
+    print_comparison(results)
+
+
+if __name__ == "__main__":
+    main()
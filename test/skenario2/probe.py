@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+MemberView = List[Dict[str, Any]]
+
+
+class ProbeResult(NamedTuple):
+    """Outcome of one parallel probe of every node."""
+    view: Optional[MemberView]  # first quorum-consistent membership view
+    source: Optional[str]  # node that reported ``view``
+    responses: Dict[str, MemberView]  # every view received before returning
+    timed_out: List[str]  # nodes that had not answered within the timeout
+    failed: List[str]  # nodes that answered with an error / no view
+    elapsed: float  # seconds
+
+    def any_view(self) -> Optional[MemberView]:
+        """The quorum view if there is one, otherwise any view that came back."""
+        if self.view:
+            return self.view
+        return next(iter(self.responses.values()), None)
+
+
+def has_quorum(view: MemberView, reporter_host: Optional[str] = None) -> bool:
+    """True if a majority of the view is ONLINE (and the reporter itself is ONLINE)."""
+    if not view:
+        return False
+    online = sum(1 for member in view if member['MEMBER_STATE'] == 'ONLINE')
+    if online < len(view) // 2 + 1:
+        return False
+    if reporter_host is None:
+        return True
+    return any(member['MEMBER_HOST'] == reporter_host and member['MEMBER_STATE'] == 'ONLINE'
+               for member in view)
+
+
+class ClusterProbe:
+    """Query every node's membership view at once and take the first good answer.
+
+    Probes run on a shared thread pool, so a stopped or partitioned node
+    costs at most ``timeout`` seconds instead of delaying the healthy nodes
+    queued behind it. The first view that shows a majority ONLINE (seen from
+    an ONLINE member) wins; nodes that did not answer in time are recorded.
+    """
+
+    def __init__(self, hosts: Dict[str, str], fetch: Callable[[str], Optional[MemberView]],
+                 timeout: float):
+        self.hosts = hosts
+        self._fetch = fetch
+        self.timeout = timeout
+        # Extra workers so probes stuck on a dead node don't starve the next round
+        self._executor = ThreadPoolExecutor(max_workers=len(hosts) * 4, thread_name_prefix="probe")
+        self._lock = threading.Lock()
+        self.timeouts: Dict[str, int] = defaultdict(int)
+        self.probes = 0
+
+    def probe(self) -> ProbeResult:
+        started = time.perf_counter()
+        futures = {self._executor.submit(self._fetch, node): node for node in self.hosts}
+        responses: Dict[str, MemberView] = {}
+        failed: List[str] = []
+        view, source = None, None
+
+        timed_out: List[str] = []
+        try:
+            for future in as_completed(futures, timeout=self.timeout):
+                node = futures[future]
+                try:
+                    status = future.result()
+                except Exception:
+                    status = None
+                if not status:
+                    failed.append(node)
+                    continue
+                responses[node] = status
+                if has_quorum(status, self.hosts[node]):
+                    view, source = status, node
+                    break
+        except TimeoutError:
+            # Only nodes still pending at the deadline count as timed out; after an
+            # early quorum answer the slower probes simply finish in the background.
+            timed_out = [node for future, node in futures.items() if not future.done()]
+
+        with self._lock:
+            self.probes += 1
+            for node in timed_out:
+                self.timeouts[node] += 1
+
+        return ProbeResult(view, source, responses, timed_out, failed, time.perf_counter() - started)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,217 @@
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples of every thread
+MAX_STACK_DEPTH = 64
+SERVER_FRAME = "[server wait]"
+CLIENT_FRAME = "[client]"
+
+_NULL_SPAN = nullcontext()
+
+
+class _Frame:
+    """One open span on a thread's span stack."""
+
+    __slots__ = ('name', 'started_ns', 'server_ns', 'child_ns', 'child_server_ns')
+
+    def __init__(self, name: str, started_ns: int):
+        self.name = name
+        self.started_ns = started_ns
+        self.server_ns = 0
+        self.child_ns = 0
+        self.child_server_ns = 0
+
+
+class SpanProfiler:
+    """Per-phase timing of the harness hot paths, split into client time and server wait.
+
+    ``span(name)`` brackets a harness method with ``perf_counter_ns``; spans
+    nest per thread, so ``_perform_insert;get_connection`` is kept apart from
+    a top-level ``get_connection``. ``server()`` brackets the calls that
+    block on MySQL (connect, execute, fetch, commit, membership probes), and
+    its time is charged to every open span on the thread. Whatever a span
+    spends outside ``server()`` is client time: pool locks, payloads, print,
+    strftime, dict rows and the GIL.
+
+    With ``sample_interval`` a sampler thread also records the Python stack
+    of every other thread, folded root-to-leaf, so the flame graphs show
+    where client time goes below the spans. ``phase()`` names the phase
+    samples and spans are filed under. A disabled profiler hands out a
+    shared no-op context manager, so the hooks cost one attribute check.
+    """
+
+    def __init__(self, enabled: bool = False, phase: Callable[[], str] = lambda: "default",
+                 sample_interval: Optional[float] = SAMPLE_INTERVAL):
+        self.enabled = enabled
+        self._phase = phase
+        self.sample_interval = sample_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # phase -> span path -> [count, total_ns, server_ns, exclusive client_ns, exclusive server_ns]
+        self.spans: Dict[str, Dict[str, List[int]]] = defaultdict(dict)
+        # phase -> folded stack -> samples
+        self.samples: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.sample_count = 0
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str):
+        """Context manager timing one call of ``name``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        stack = self._stack()
+        frame = _Frame(name, time.perf_counter_ns())
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            total = time.perf_counter_ns() - frame.started_ns
+            path = ";".join(f.name for f in stack)
+            stack.pop()
+            if stack:
+                stack[-1].child_ns += total
+                stack[-1].child_server_ns += frame.server_ns
+            own_server = frame.server_ns - frame.child_server_ns
+            own_client = total - frame.child_ns - own_server
+            phase = self._phase()
+            with self._lock:
+                entry = self.spans[phase].setdefault(path, [0, 0, 0, 0, 0])
+                entry[0] += 1
+                entry[1] += total
+                entry[2] += frame.server_ns
+                entry[3] += max(0, own_client)
+                entry[4] += own_server
+
+    def server(self):
+        """Context manager marking time spent blocked on the server or the network."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._server()
+
+    @contextmanager
+    def _server(self) -> Iterator[None]:
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            waited = time.perf_counter_ns() - started
+            for frame in self._stack():
+                frame.server_ns += waited
+
+    # --- Stack sampler ----------------------------------------------------------
+
+    def start(self) -> None:
+        if not self.enabled or not self.sample_interval or self._thread:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout=self.sample_interval + 1)
+            self._thread = None
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while self._running.is_set():
+            phase = self._phase()
+            folded = [_fold(frame) for ident, frame in sys._current_frames().items() if ident != own]
+            with self._lock:
+                for stack in folded:
+                    self.samples[phase][stack] += 1
+                self.sample_count += 1
+            time.sleep(self.sample_interval)
+
+    # --- Reporting --------------------------------------------------------------
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """phase -> span path -> count, total/client/server ms and client share."""
+        with self._lock:
+            spans = {phase: {path: list(entry) for path, entry in paths.items()}
+                     for phase, paths in self.spans.items()}
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for phase, paths in spans.items():
+            result[phase] = {}
+            for path, (count, total, server, _, _) in sorted(paths.items()):
+                result[phase][path] = {
+                    'count': count,
+                    'total_ms': total / 1e6,
+                    'client_ms': (total - server) / 1e6,
+                    'server_ms': server / 1e6,
+                    'mean_us': total / count / 1e3 if count else 0.0,
+                    'client_share': (total - server) / total if total else 0.0
+                }
+        return result
+
+    def print_report(self) -> None:
+        summary = self.summary()
+        if not summary:
+            return
+        print(f"\n🔬 Client vs Server Time (spans; server = blocked on MySQL or the network):")
+        print(f"{'Phase':<14} {'Span':<40} {'Calls':>7} {'Mean us':>9} {'Total ms':>10} "
+              f"{'Client ms':>10} {'Server ms':>10} {'Client':>7}")
+        for phase, paths in summary.items():
+            for path, row in paths.items():
+                print(f"{phase:<14} {path:<40} {row['count']:>7} {row['mean_us']:>9.1f} "
+                      f"{row['total_ms']:>10.1f} {row['client_ms']:>10.1f} {row['server_ms']:>10.1f} "
+                      f"{row['client_share'] * 100:>6.1f}%")
+        if self.sample_count:
+            print(f"Stack samples: {self.sample_count} every {self.sample_interval * 1000:g} ms")
+
+    def collapsed(self) -> Dict[str, List[Tuple[str, int]]]:
+        """phase -> (folded stack, weight) lines; span lines are weighted in microseconds."""
+        with self._lock:
+            spans = {phase: dict(paths) for phase, paths in self.spans.items()}
+            samples = {phase: dict(stacks) for phase, stacks in self.samples.items()}
+        result: Dict[str, List[Tuple[str, int]]] = {}
+        for phase in sorted(set(spans) | set(samples)):
+            lines: List[Tuple[str, int]] = []
+            for path, (_, _, _, own_client, own_server) in sorted(spans.get(phase, {}).items()):
+                if own_client >= 1000:
+                    lines.append((f"{path};{CLIENT_FRAME}", own_client // 1000))
+                if own_server >= 1000:
+                    lines.append((f"{path};{SERVER_FRAME}", own_server // 1000))
+            result[f"{phase}.spans"] = lines
+            result[f"{phase}.samples"] = sorted(samples.get(phase, {}).items())
+        return result
+
+    def export(self, prefix: str) -> List[str]:
+        """Write one collapsed-stack file per phase and source (``flamegraph.pl`` input)."""
+        written = []
+        for name, lines in self.collapsed().items():
+            if not lines:
+                continue
+            path = f"{prefix}.{name.replace(' ', '_')}.folded"
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, weight in lines:
+                    f.write(f"{stack} {weight}\n")
+            written.append(path)
+        return written
+
+
+def _fold(frame) -> str:
+    """``module:function`` names from the outermost frame to ``frame``, joined by ``;``."""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        names.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
@@ -0,0 +1,286 @@
+import mysql.connector
+from mysql.connector import Error
+import argparse
+import re
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+READY_TIMEOUT = 300  # seconds before a node is declared not ready
+READY_INITIAL_DELAY = 0.05  # seconds; first backoff delay
+READY_MAX_DELAY = 2.0  # seconds; backoff ceiling
+READY_BACKOFF_FACTOR = 2.0
+CONNECT_TIMEOUT = 1  # seconds; per connection attempt (an int: the C extension rejects floats)
+REJOIN_ATTEMPTS = 3  # START GROUP_REPLICATION attempts for an OFFLINE/ERROR member
+
+# Group replication already running / already starting: another START is pointless
+GR_ALREADY_RUNNING_ERRORS = {3092, 3093}
+CLONE_UNAVAILABLE_ERRORS = {1146}
+
+MEMBER_QUERY = """
+    SELECT m.MEMBER_STATE,
+           s.COUNT_TRANSACTIONS_REMOTE_IN_APPLIER_QUEUE AS applier_queue,
+           (SELECT GTID_SUBTRACT(c.RECEIVED_TRANSACTION_SET, @@GLOBAL.gtid_executed)
+            FROM performance_schema.replication_connection_status c
+            WHERE c.CHANNEL_NAME = 'group_replication_recovery') AS recovery_backlog,
+           (SELECT c.SERVICE_STATE
+            FROM performance_schema.replication_connection_status c
+            WHERE c.CHANNEL_NAME = 'group_replication_recovery') AS recovery_channel
+    FROM performance_schema.replication_group_members m
+    LEFT JOIN performance_schema.replication_group_member_stats s ON s.MEMBER_ID = m.MEMBER_ID
+    WHERE m.MEMBER_ID = @@server_uuid
+"""
+
+CLONE_QUERY = """
+    SELECT STATE, STAGE, TIMESTAMPDIFF(MICROSECOND, BEGIN_TIME, NOW(6)) / 1000000 AS age
+    FROM performance_schema.clone_status
+"""
+
+
+def backoff_delays(initial: float = READY_INITIAL_DELAY, maximum: float = READY_MAX_DELAY,
+                   factor: float = READY_BACKOFF_FACTOR) -> Iterator[float]:
+    """Exponentially growing poll delays, capped at ``maximum``."""
+    delay = initial
+    while True:
+        yield delay
+        delay = min(maximum, delay * factor)
+
+
+def gtid_count(gtid_set: Optional[str]) -> int:
+    """Number of transactions in a GTID set such as ``uuid:1-5:7,uuid2:1-3``."""
+    if not gtid_set:
+        return 0
+    total = 0
+    for interval in re.findall(r":(\d+)(?:-(\d+))?", "".join(gtid_set.split())):
+        start, end = int(interval[0]), int(interval[1] or interval[0])
+        total += end - start + 1
+    return total
+
+
+class NodeReadiness:
+    """Wait for a (re)started node to become a usable group member.
+
+    Polls with exponential backoff through three phases: mysqld accepting
+    connections, the member reaching RECOVERING, and the member reaching
+    ONLINE. While RECOVERING it tracks how many transactions distributed
+    recovery still has to apply and whether the node is catching up
+    incrementally or via clone. Every phase's duration is recorded in
+    ``phases``; a phase that timed out has a duration of None.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any], user: str, password: str,
+                 timeout: float = READY_TIMEOUT, rejoin: bool = True, verbose: bool = True):
+        self.name = name
+        self.config = config
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self.rejoin = rejoin
+        self.verbose = verbose
+        self.phases: List[Tuple[str, Optional[float]]] = []
+        self.recovery: Dict[str, Any] = {
+            'path': None,
+            'peak_backlog': 0,
+            'last_backlog': None,
+            'rejoin_attempts': 0,
+            'reconnects': 0
+        }
+        self._connection = None
+        self._clone_available = True
+        self._started = 0.0
+        self._deadline = 0.0
+
+    # --- Public API -------------------------------------------------------
+
+    def wait(self, until: str = 'ONLINE') -> bool:
+        """Wait up to ``timeout`` seconds for ``until`` ('accepting', 'RECOVERING' or 'ONLINE')."""
+        self._started = time.perf_counter()
+        self._deadline = self._started + self.timeout
+        try:
+            if not self._phase("mysqld accepting connections", self._accepting):
+                return False
+            if until == 'accepting':
+                return True
+            if not self._phase("member RECOVERING", lambda: self._member_state_in(('RECOVERING', 'ONLINE'))):
+                return False
+            if until == 'RECOVERING':
+                return True
+            return self._phase("member ONLINE", lambda: self._member_state_in(('ONLINE',)))
+        finally:
+            self._close()
+
+    def total_time(self) -> float:
+        return sum(duration or 0.0 for _, duration in self.phases)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'node': self.name,
+            'phases': {phase: duration for phase, duration in self.phases},
+            'total_s': self.total_time(),
+            **self.recovery
+        }
+
+    def print_report(self) -> None:
+        print(f"\n⏱️  Readiness of {self.name}:")
+        for phase, duration in self.phases:
+            took = f"{duration:.3f}s" if duration is not None else "timed out"
+            print(f"  {phase:<32} {took}")
+        print(f"  {'Total':<32} {self.total_time():.3f}s")
+        if self.recovery['path']:
+            print(f"  Recovery path: {self.recovery['path']} "
+                  f"(peak backlog {self.recovery['peak_backlog']} transactions, "
+                  f"{self.recovery['rejoin_attempts']} rejoin attempts, "
+                  f"{self.recovery['reconnects']} reconnects)")
+
+    # --- Phases -----------------------------------------------------------
+
+    def _phase(self, phase: str, check) -> bool:
+        """Poll ``check`` with exponential backoff until it passes or the deadline hits."""
+        started = time.perf_counter()
+        for delay in backoff_delays():
+            if check():
+                self.phases.append((phase, time.perf_counter() - started))
+                self._log(f"✅ {self.name}: {phase} after {self.phases[-1][1]:.3f}s")
+                return True
+            remaining = self._deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+        self.phases.append((phase, None))
+        self._log(f"❌ {self.name}: gave up waiting for {phase} after {time.perf_counter() - started:.1f}s")
+        return False
+
+    def _accepting(self) -> bool:
+        return self._connect() is not None
+
+    def _member_state_in(self, states: Tuple[str, ...]) -> bool:
+        connection = self._connect()
+        if connection is None:
+            # mysqld went away again (e.g. restarted after a clone)
+            return False
+        try:
+            with connection.cursor(dictionary=True) as cursor:
+                cursor.execute(MEMBER_QUERY)
+                member = cursor.fetchone()
+        except Error:
+            self._close()
+            return False
+
+        state = member['MEMBER_STATE'] if member else 'OFFLINE'
+        if state == 'RECOVERING':
+            self._track_recovery(connection, member)
+        elif state == 'ONLINE' and self.recovery['path'] is None:
+            self._detect_clone(connection)
+            self.recovery['path'] = self.recovery['path'] or 'incremental'
+        elif state in ('OFFLINE', 'ERROR') and self.rejoin:
+            self._start_group_replication(connection, state)
+        return state in states
+
+    # --- Recovery tracking --------------------------------------------------
+
+    def _track_recovery(self, connection, member: Dict[str, Any]) -> None:
+        backlog = gtid_count(member['recovery_backlog']) + int(member['applier_queue'] or 0)
+        self.recovery['peak_backlog'] = max(self.recovery['peak_backlog'], backlog)
+        if not self._detect_clone(connection) and member['recovery_channel'] == 'ON':
+            self.recovery['path'] = 'incremental'
+        if backlog != self.recovery['last_backlog']:
+            self.recovery['last_backlog'] = backlog
+            self._log(f"⏳ {self.name} RECOVERING ({self.recovery['path'] or 'starting'}): "
+                      f"{backlog} transactions left to apply")
+
+    def _detect_clone(self, connection) -> bool:
+        """True if a clone started during this wait (clone_status survives the restart)."""
+        if not self._clone_available:
+            return False
+        try:
+            with connection.cursor(dictionary=True) as cursor:
+                cursor.execute(CLONE_QUERY)
+                clone = cursor.fetchone()
+        except Error as e:
+            if e.errno in CLONE_UNAVAILABLE_ERRORS:
+                self._clone_available = False
+            return False
+        if not clone or clone['age'] is None:
+            return False
+        if float(clone['age']) > time.perf_counter() - self._started:
+            return False  # Left over from an earlier clone
+        if self.recovery['path'] != 'clone':
+            self._log(f"📦 {self.name}: recovering via clone ({clone['STATE']}, stage {clone['STAGE']})")
+        self.recovery['path'] = 'clone'
+        return True
+
+    def _start_group_replication(self, connection, state: str) -> None:
+        if self.recovery['rejoin_attempts'] >= REJOIN_ATTEMPTS:
+            return
+        self.recovery['rejoin_attempts'] += 1
+        self._log(f"🔄 {self.name} is {state}, starting group replication...")
+        try:
+            with connection.cursor() as cursor:
+                if state == 'ERROR':
+                    cursor.execute("STOP GROUP_REPLICATION")
+                cursor.execute("START GROUP_REPLICATION")
+        except Error as e:
+            if e.errno not in GR_ALREADY_RUNNING_ERRORS:
+                self._log(f"⚠️  {self.name}: START GROUP_REPLICATION failed: {e}")
+
+    # --- Connection -----------------------------------------------------------
+
+    def _connect(self):
+        if self._connection is None:
+            try:
+                self._connection = mysql.connector.connect(
+                    host=self.config['host'],
+                    port=self.config['port'],
+                    user=self.user,
+                    password=self.password,
+                    autocommit=True,
+                    connection_timeout=CONNECT_TIMEOUT
+                )
+                if self.phases:
+                    self.recovery['reconnects'] += 1
+            except (Error, OSError, TypeError, ValueError):
+                # A half-started mysqld can fail below the connector's Error
+                # hierarchy; treat anything raised here as "not accepting yet".
+                return None
+        return self._connection
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Wait for Group Replication nodes to become ready")
+    parser.add_argument("nodes", nargs="*", help="nodes to wait for (default: all)")
+    parser.add_argument("--until", choices=("accepting", "RECOVERING", "ONLINE"), default="ONLINE",
+                        help="state to wait for")
+    parser.add_argument("--timeout", type=float, default=READY_TIMEOUT, help="seconds per node")
+    parser.add_argument("--no-rejoin", action="store_true",
+                        help="do not START GROUP_REPLICATION on OFFLINE/ERROR members")
+    return parser.parse_args()
+
+
+def main():
+    # Imported here: test.py imports this module
+    from test import DB_CONFIG, NODES
+
+    args = parse_args()
+    ready = True
+    for name in args.nodes or list(NODES):
+        readiness = NodeReadiness(name, NODES[name], DB_CONFIG['user'], DB_CONFIG['password'],
+                                  timeout=args.timeout, rejoin=not args.no_rejoin)
+        ready = readiness.wait(args.until) and ready
+        readiness.print_report()
+    sys.exit(0 if ready else 1)
+
+
+if __name__ == "__main__":
+    main()
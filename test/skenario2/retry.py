@@ -0,0 +1,107 @@
+import random
+import threading
+import time
+from typing import Dict, Optional, Type
+
+from pool import CONNECTION_LOST_ERRORS
+from topology import QUORUM_ERRORS, READ_ONLY_ERRORS, TopologyCache
+
+RETRY_BUDGET = 10.0  # seconds one transaction may spend across all its attempts
+MAX_ATTEMPTS = 50
+BACKOFF_BASE = 0.02  # seconds; first backoff ceiling
+BACKOFF_CAP = 1.0  # seconds; backoff ceiling never grows past this
+REFRESH_TIMEOUT = 5.0  # seconds a retry waits for the topology cache to find a primary
+
+LOCK_ERRORS = {1205, 1213}  # lock wait timeout / deadlock
+RETRYABLE_ERRNOS = CONNECTION_LOST_ERRORS | READ_ONLY_ERRORS | QUORUM_ERRORS | LOCK_ERRORS
+# Failures the harness reports without an errno
+RETRYABLE_TYPES = {'no_primary', 'connection_failed', 'error_None'}
+
+
+def is_retryable(error_type: str) -> bool:
+    """True for failures a new attempt (possibly on a new primary) can fix."""
+    if error_type in RETRYABLE_TYPES:
+        return True
+    errno = error_type[len('error_'):] if error_type.startswith('error_') else ''
+    return errno.isdigit() and int(errno) in RETRYABLE_ERRNOS
+
+
+class RetryPolicy:
+    """Decides whether a failed insert is attempted again and what happens in between.
+
+    The base policy never retries, which is the harness's original
+    behaviour: a failed insert is a failed transaction. Subclasses retry
+    retryable failures until ``max_attempts`` or ``budget`` seconds since
+    the transaction's first attempt run out.
+    """
+
+    name = "none"
+    default_attempts = 1
+
+    def __init__(self, max_attempts: Optional[int] = None, budget: float = RETRY_BUDGET,
+                 seed: Optional[int] = None):
+        self.max_attempts = max_attempts or self.default_attempts
+        self.budget = budget
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def should_retry(self, attempt: int, error_type: str, deadline: float) -> bool:
+        return (attempt < self.max_attempts and is_retryable(error_type)
+                and time.perf_counter() < deadline)
+
+    def before_retry(self, attempt: int, deadline: float, topology: TopologyCache) -> None:
+        """Runs between attempt ``attempt`` and the next one."""
+
+    def describe(self) -> str:
+        if self.max_attempts == 1:
+            return self.name
+        return f"{self.name} (max {self.max_attempts} attempts, {self.budget:g}s budget)"
+
+
+class ImmediateRetry(RetryPolicy):
+    """Retry at once; the next attempt still goes through the cached primary."""
+
+    name = "immediate"
+    default_attempts = MAX_ATTEMPTS
+
+
+class BackoffRetry(RetryPolicy):
+    """Exponential backoff with full jitter: sleep uniform(0, min(cap, base * 2^(attempt-1)))."""
+
+    name = "backoff"
+    default_attempts = MAX_ATTEMPTS
+
+    def __init__(self, *args, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.base = base
+        self.cap = cap
+
+    def before_retry(self, attempt: int, deadline: float, topology: TopologyCache) -> None:
+        with self._rng_lock:
+            delay = self._rng.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+        time.sleep(max(0.0, min(delay, deadline - time.perf_counter())))
+
+    def describe(self) -> str:
+        return f"{super().describe()}, base {self.base * 1000:g} ms, cap {self.cap:g}s"
+
+
+class RefreshRetry(RetryPolicy):
+    """Drop the cached primary and wait for the topology cache to find one before retrying."""
+
+    name = "refresh"
+    default_attempts = MAX_ATTEMPTS
+
+    def before_retry(self, attempt: int, deadline: float, topology: TopologyCache) -> None:
+        topology.invalidate()
+        topology.wait_for_primary(max(0.0, min(REFRESH_TIMEOUT, deadline - time.perf_counter())))
+
+
+POLICIES: Dict[str, Type[RetryPolicy]] = {
+    policy.name: policy for policy in (RetryPolicy, ImmediateRetry, BackoffRetry, RefreshRetry)
+}
+
+
+def make_policy(name: str, **kwargs) -> RetryPolicy:
+    if name not in POLICIES:
+        raise ValueError(f"unknown retry policy {name!r} (choose from {', '.join(POLICIES)})")
+    return POLICIES[name](**kwargs)
@@ -4,41 +4,94 @@ import docker
 import time
 import threading
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
 from contextlib import contextmanager
 from typing import Optional, Dict, Any, List, Tuple
+import argparse
+import os
 import subprocess
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from checksum import ChunkedChecksumVerifier
+from flowcontrol import FlowControlCollector
+from latency import LatencyRecorder
+from payload import PayloadPool
+from pool import NodeConnectionPool
+from probe import ClusterProbe
+from profiler import SAMPLE_INTERVAL, SpanProfiler
+from procload import (
+    REPORT_INTERVAL, STOP_TIMEOUT, ProcessLoadGenerator, WorkerContext,
+    deserialize_histograms, serialize_histograms,
+)
+from readiness import NodeReadiness, READY_TIMEOUT
+from retry import POLICIES, RetryPolicy, make_policy
+from topology import TopologyCache
+from workload import OpenLoopWorkload
+
 # Constants
-WORKLOAD_INTERVAL = 0.5  # seconds between inserts
+WORKLOAD_TARGET_RATE = 500  # inserts per second offered by the open-loop workload
+WORKLOAD_WORKERS = 32  # concurrent insert workers
 INITIAL_WORKLOAD_DURATION = 10  # seconds
 POST_FAILOVER_WORKLOAD_DURATION = 10  # seconds
-MYSQL_STARTUP_WAIT = 10  # seconds
-CLUSTER_REJOIN_WAIT = 15  # seconds
 CONSISTENCY_CHECK_WAIT = 5  # seconds
 FAILOVER_MAX_WAIT = 60  # seconds
-FAILOVER_CHECK_INTERVAL = 2  # seconds
+ELECTION_POLL_INTERVAL = 0.1  # seconds between parallel probes while waiting for election
 PRIMARY_RETRY_ATTEMPTS = 3
 PRIMARY_RETRY_DELAY = 0.2  # seconds
+POOL_MAX_SIZE = WORKLOAD_WORKERS + 4  # connections per node (workers + status queries)
+POOL_IDLE_TIMEOUT = 30  # seconds before an idle connection is closed
+POOL_HEALTH_CHECK_AFTER = 1.0  # seconds idle before a connection is pinged on reuse
+POOL_ACQUIRE_TIMEOUT = 5  # seconds
+TOPOLOGY_REFRESH_INTERVAL = 1.0  # seconds between background membership refreshes
+PROBE_TIMEOUT = 1  # seconds; connect/read timeout for membership probes (an int: the C extension rejects floats)
+TRANSACTION_COLUMNS = ('request_key', 'transaction_time', 'amount', 'description', 'created_at')
+CONSISTENCY_REPORT_LIMIT = 20  # diverging ids printed
+DESCRIPTION_SIZE = 64  # bytes of pre-generated payload per insert (description column)
+DUPLICATE_KEY_ERROR = 1062  # a retry whose earlier attempt did commit after all
+
+# transaction_time is taken server-side so the client formats no timestamps;
+# request_key is the idempotency key, one per logical transaction (the workload seq)
+INSERT_QUERY = """
+    INSERT INTO transactions (request_key, transaction_time, amount, description)
+    VALUES (%s, NOW(3), %s, %s)
+"""
+
+NODES: Dict[str, Dict[str, Any]] = {
+    'node1': {'host': 'localhost', 'port': 3306, 'container': 'node1'},
+    'node2': {'host': 'localhost', 'port': 3307, 'container': 'node2'},
+    'node3': {'host': 'localhost', 'port': 3308, 'container': 'node3'}
+}
+
+DB_CONFIG = {
+    'user': 'root',
+    'password': 'pass',
+    'database': 'failover_test'
+}
 
 class GroupReplicationFailoverTest:
-    def __init__(self, compose_file_path: str = "/home/reynaldineo/sister/fp/group/docker-compose.yaml"):
+    def __init__(self, compose_file_path: str = "/home/reynaldineo/sister/fp/group/docker-compose.yaml",
+                 target_rate: float = WORKLOAD_TARGET_RATE, workers: int = WORKLOAD_WORKERS,
+                 histogram_path: Optional[str] = None, processes: int = 0,
+                 flow_path: Optional[str] = None, client: Optional[Any] = None,
+                 retry_policy: Optional[RetryPolicy] = None, idempotent: bool = True,
+                 profile_path: Optional[str] = None, profile_interval: Optional[float] = SAMPLE_INTERVAL):
         """Initialize the failover test with configuration."""
-        self.client = docker.from_env()
+        self.client = client or docker.from_env()
         self.compose_file_path = compose_file_path
+        self.target_rate = target_rate
+        self.workers = workers
+        self.histogram_path = histogram_path
+        self.flow_path = flow_path
+        self.processes = processes  # 0 = run the workload threads in this process
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.idempotent = idempotent  # UNIQUE request_key, so a retry cannot insert twice
+        self.process_load: Optional[ProcessLoadGenerator] = None
         
-        self.nodes: Dict[str, Dict[str, Any]] = {
-            'node1': {'host': 'localhost', 'port': 3306, 'container': 'node1'},
-            'node2': {'host': 'localhost', 'port': 3307, 'container': 'node2'},
-            'node3': {'host': 'localhost', 'port': 3308, 'container': 'node3'}
-        }
+        self.nodes: Dict[str, Dict[str, Any]] = {name: dict(config) for name, config in NODES.items()}
         
-        self.db_config = {
-            'user': 'root',
-            'password': 'pass',
-            'database': 'failover_test'
-        }
+        self.db_config = dict(DB_CONFIG)
         
         # Tracking variables
         self.workload_running = False
@@ -46,18 +99,63 @@ class GroupReplicationFailoverTest:
             'total_attempts': 0,
             'successful_inserts': 0,
             'failed_inserts': 0,
-            'errors': defaultdict(int)
+            'completed_ops': 0,
+            'start_lag_max': 0.0,
+            'retries': 0,
+            'dedup_hits': 0,
+            'errors': defaultdict(int),
+            'attempt_errors': defaultdict(int)
         }
+        # Idempotency keys of transactions the client saw commit / give up
+        self.acked_keys: set = set()
+        self.failed_keys: set = set()
+        self.stats_lock = threading.Lock()
+        self.latency = LatencyRecorder(phase="pre-failover")
+        self.workload_thread: Optional[threading.Thread] = None
+        self.workload_started_at: Optional[float] = None
+        self.workload_stopped_at: Optional[float] = None
+        self.progress_every = max(10, int(target_rate))
+        self.payloads = PayloadPool(DESCRIPTION_SIZE)
         self.failover_detected = False
         self.failover_start_time: Optional[float] = None
         self.failover_end_time: Optional[float] = None
 
-    @contextmanager
-    def get_connection(self, node_name: str, silent: bool = False):
-        connection = None
-        try:
-            node = self.nodes[node_name]
-            connection = mysql.connector.connect(
+        self.pool = NodeConnectionPool(
+            self._open_connection,
+            max_size=max(POOL_MAX_SIZE, workers + 4),
+            idle_timeout=POOL_IDLE_TIMEOUT,
+            health_check_after=POOL_HEALTH_CHECK_AFTER,
+            acquire_timeout=POOL_ACQUIRE_TIMEOUT
+        )
+        # Probes use their own short-timeout connections so a dead node fails fast
+        self.probe_pool = NodeConnectionPool(
+            self._open_probe_connection,
+            max_size=POOL_MAX_SIZE,
+            idle_timeout=POOL_IDLE_TIMEOUT,
+            health_check_after=POOL_HEALTH_CHECK_AFTER,
+            acquire_timeout=PROBE_TIMEOUT
+        )
+        self.probe = ClusterProbe(
+            {name: config['container'] for name, config in self.nodes.items()},
+            self.check_group_replication_status,
+            timeout=PROBE_TIMEOUT
+        )
+        self.last_probe = None
+        self.topology = TopologyCache(self.get_primary_node, refresh_interval=TOPOLOGY_REFRESH_INTERVAL)
+        self.election_duration: Optional[float] = None
+        self.readiness: List[NodeReadiness] = []
+        self.flow = FlowControlCollector(list(self.nodes), self.fetch_rows, self._committed_count,
+                                         phase=self.latency.phase)
+        # Hooks are no-ops unless profile_path is set
+        self.profile_path = profile_path
+        self.profiler = SpanProfiler(enabled=profile_path is not None, phase=lambda: self.latency.phase,
+                                     sample_interval=profile_interval)
+
+    def _open_connection(self, node_name: str):
+        """Open a new MySQL connection to a node (used by the pool on a miss)."""
+        node = self.nodes[node_name]
+        with self.profiler.server():
+            return mysql.connector.connect(
                 host=node['host'],
                 port=node['port'],
                 user=self.db_config['user'],
@@ -65,30 +163,67 @@ class GroupReplicationFailoverTest:
                 database=self.db_config['database'],
                 autocommit=False
             )
-            yield connection
+
+    def _open_probe_connection(self, node_name: str):
+        """Open a membership-probe connection with short connect/read timeouts."""
+        node = self.nodes[node_name]
+        with self.profiler.server():
+            return mysql.connector.connect(
+                host=node['host'],
+                port=node['port'],
+                user=self.db_config['user'],
+                password=self.db_config['password'],
+                autocommit=True,
+                connection_timeout=PROBE_TIMEOUT
+            )
+
+    @contextmanager
+    def get_connection(self, node_name: str, silent: bool = False, pool: Optional[NodeConnectionPool] = None):
+        pool = pool or self.pool
+        try:
+            with self.profiler.span('get_connection'):
+                connection = pool.acquire(node_name)
         except Error as e:
             if not silent:
                 print(f"❌ Error connecting to {node_name}: {e}")
             yield None
+            return
+
+        broken = False
+        try:
+            yield connection
+        except Error as e:
+            broken = True
+            pool.report_error(connection, e)
+            raise
         finally:
-            if connection and connection.is_connected():
-                connection.close()
+            pool.release(node_name, connection, discard=broken)
 
     def execute_query(self, connection, query: str, fetch: bool = False) -> Optional[Any]:
         if not connection:
             return None
             
         try:
-            with connection.cursor(dictionary=True) as cursor:
-                cursor.execute(query)
-                if fetch:
-                    return cursor.fetchall()
-                connection.commit()
+            with self.profiler.span('execute_query'), connection.cursor(dictionary=True) as cursor:
+                with self.profiler.server():
+                    cursor.execute(query)
+                    if fetch:
+                        return cursor.fetchall()
+                    connection.commit()
                 return True
         except Error as e:
+            self.pool.report_error(connection, e)
+            self.probe_pool.report_error(connection, e)
             print(f"❌ Query error: {e}")
             return None
 
+    def fetch_rows(self, node_name: str, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Run a read-only query on one node over a short-timeout probe connection."""
+        with self.get_connection(node_name, silent=True, pool=self.probe_pool) as conn:
+            if conn:
+                return self.execute_query(conn, query, fetch=True)
+        return None
+
     def check_group_replication_status(self, node_name: str) -> Optional[List[Dict[str, Any]]]:
         query = """
         SELECT 
@@ -102,24 +237,31 @@ class GroupReplicationFailoverTest:
         ORDER BY MEMBER_ROLE DESC, MEMBER_PORT
         """
         
-        with self.get_connection(node_name, silent=True) as conn:
+        started = time.perf_counter()
+        with self.get_connection(node_name, silent=True, pool=self.probe_pool) as conn:
             if conn:
-                return self.execute_query(conn, query, fetch=True)
+                status = self.execute_query(conn, query, fetch=True)
+                # Failed or timed-out probes would otherwise drag the probe p99 around
+                if status is not None:
+                    self.latency.record('probe', time.perf_counter() - started)
+                return status
         return None
 
     def get_primary_node(self) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
-        for node_name in self.nodes.keys():
-            status = self.check_group_replication_status(node_name)
+        """Probe all nodes in parallel and read the primary from the first quorum view."""
+        with self.profiler.span('get_primary_node'):
+            # The probe threads query every node; waiting on them is waiting on the servers
+            with self.profiler.server():
+                result = self.probe.probe()
+            self.last_probe = result
             
-            if status:
-                primary_member = self._find_primary_in_status(status)
+            if result.view:
+                primary_member = self._find_primary_in_status(result.view)
                 if primary_member:
                     node_name = self._map_host_to_node(primary_member['MEMBER_HOST'])
                     if node_name:
                         return node_name, primary_member
-                # No primary found in this status, might be mid-election
-                return None, None
-                
+        # No quorum view or no primary in it, might be mid-election
         return None, None
     
     def _find_primary_in_status(self, status: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
@@ -153,12 +295,11 @@ class GroupReplicationFailoverTest:
         print(f"{'='*80}\n")
     
     def _get_any_node_status(self) -> Optional[List[Dict[str, Any]]]:
-        """Try to get status from any available node."""
-        for node_name in self.nodes.keys():
-            status = self.check_group_replication_status(node_name)
-            if status:
-                return status
-        return None
+        """Get status from all nodes at once, preferring a quorum view."""
+        result = self.probe.probe()
+        if result.timed_out:
+            print(f"⚠️  No answer within {PROBE_TIMEOUT}s from: {', '.join(result.timed_out)}")
+        return result.any_view()
     
     def _print_status_rows(self, status: List[Dict[str, Any]]) -> None:
         """Print status rows for each member."""
@@ -177,85 +318,243 @@ class GroupReplicationFailoverTest:
 
     def continuous_workload(self) -> None:
         """Run continuous insert workload to test failover behavior."""
-        print("\n🔄 Starting continuous workload...")
+        if self.processes:
+            self._run_process_workload()
+            return
         
+        print(f"\n🔄 Starting continuous workload "
+              f"({self.target_rate:g} TPS target, {self.workers} workers)...")
+        
+        engine = OpenLoopWorkload(
+            self._workload_step,
+            target_rate=self.target_rate,
+            workers=self.workers,
+            should_run=lambda: self.workload_running,
+            on_complete=self._record_latency
+        )
+        self.workload_started_at = time.time()
+        engine.run()
+        self.workload_stopped_at = time.time()
+    
+    def _run_process_workload(self) -> None:
+        """Run the workload in worker processes and merge their results when it stops."""
+        threads = max(1, -(-self.workers // self.processes))
+        print(f"\n🔄 Starting continuous workload ({self.target_rate:g} TPS target, "
+              f"{self.processes} processes x {threads} workers)...")
+        
+        self.process_load = ProcessLoadGenerator(
+            _process_worker, self.processes, self.target_rate, threads,
+            args={'compose_file_path': self.compose_file_path, 'retry_policy': self.retry_policy.name,
+                  'retry_attempts': self.retry_policy.max_attempts, 'retry_budget': self.retry_policy.budget,
+                  'idempotent': self.idempotent},
+            phase=self.latency.phase,
+            on_window=self.flow.absorb
+        )
+        if not self.process_load.start():
+            return
+        self.workload_started_at = time.time()
         while self.workload_running:
+            time.sleep(1.0)
+            load = self.process_load
+            print(f"📝 Inserted {load.live_total('successful_inserts')} transactions "
+                  f"(Attempts: {load.live_total('total_attempts')}, "
+                  f"Failed: {load.live_total('failed_inserts')})")
+        reports = self.process_load.stop()
+        self.workload_stopped_at = time.time()
+        self._merge_process_reports(reports)
+    
+    def _process_report(self, final: bool = False) -> Dict[str, Any]:
+        """Cumulative counters a worker process sends to the parent (histograms when final).
+
+        ``window`` holds this interval's latencies for the parent's flow-control timeline.
+        """
+        with self.stats_lock:
+            stats = self.workload_stats
+            report = {
+                'counters': {key: stats[key] for key in
+                             ('total_attempts', 'successful_inserts', 'failed_inserts', 'completed_ops',
+                              'retries', 'dedup_hits')},
+                'start_lag_max': stats['start_lag_max'],
+                'errors': dict(stats['errors']),
+                'attempt_errors': dict(stats['attempt_errors']),
+                'failover_start': self.failover_start_time,
+                'failover_end': self.failover_end_time,
+                'pool': dict(self.pool.stats),
+                'topology': dict(self.topology.stats)
+            }
+        report['window'] = self.flow.take_window().to_dict()
+        if final:
+            report['histograms'] = serialize_histograms(self.latency.snapshot())
+            with self.stats_lock:
+                report['acked_keys'] = sorted(self.acked_keys)
+                report['failed_keys'] = sorted(self.failed_keys)
+        return report
+    
+    def _merge_process_reports(self, reports: List[Dict[str, Any]]) -> None:
+        """Fold worker-process counters, histograms and failover times into this test's stats."""
+        stats = self.workload_stats
+        for report in reports:
+            with self.stats_lock:
+                for key, value in report['counters'].items():
+                    stats[key] += value
+                stats['start_lag_max'] = max(stats['start_lag_max'], report['start_lag_max'])
+                for error_type, count in report['errors'].items():
+                    stats['errors'][error_type] += count
+                for error_type, count in report['attempt_errors'].items():
+                    stats['attempt_errors'][error_type] += count
+                self.acked_keys.update(report.get('acked_keys', ()))
+                self.failed_keys.update(report.get('failed_keys', ()))
+            for key, value in report['pool'].items():
+                self.pool.stats[key] += value
+            for key, value in report['topology'].items():
+                self.topology.stats[key] += value
+            if 'histograms' in report:
+                self.latency.absorb(deserialize_histograms(report['histograms']))
+            else:
+                print("⚠️  A worker process sent no final report; its latency histograms are missing")
+        
+        # Failover window: first failure in any process until the first success after it
+        starts = [r['failover_start'] for r in reports if r['failover_start']]
+        if starts:
+            self.failover_detected = True
+            self.failover_start_time = min(starts)
+            ends = [r['failover_end'] for r in reports
+                    if r['failover_end'] and r['failover_end'] > self.failover_start_time]
+            self.failover_end_time = min(ends) if ends else None
+    
+    def _set_phase(self, phase: str) -> None:
+        """Switch the latency phase here and in any worker processes."""
+        self.latency.set_phase(phase)
+        self.flow.set_phase(phase)
+        if self.process_load:
+            self.process_load.set_phase(phase)
+    
+    def _workload_step(self, seq: int) -> None:
+        """Run one scheduled transaction, retrying failed attempts as the retry policy allows."""
+        with self.stats_lock:
             self.workload_stats['total_attempts'] += 1
-            
-            primary_node = self._get_primary_with_retry()
-            
-            if not primary_node:
-                self._handle_no_primary()
-                time.sleep(WORKLOAD_INTERVAL)
-                continue
-            
-            self._check_failover_recovery()
-            self._perform_insert(primary_node)
-            time.sleep(WORKLOAD_INTERVAL)
+        
+        policy = self.retry_policy
+        deadline = time.perf_counter() + policy.budget
+        attempt = 1
+        while True:
+            error_type = self._attempt_insert(seq, retry=attempt > 1)
+            if error_type is None:
+                with self.stats_lock:
+                    self.acked_keys.add(seq)
+                return
+            with self.stats_lock:
+                self.workload_stats['attempt_errors'][error_type] += 1
+            if not policy.should_retry(attempt, error_type, deadline):
+                self._record_failed_insert(error_type)
+                with self.stats_lock:
+                    self.failed_keys.add(seq)
+                return
+            with self.stats_lock:
+                self.workload_stats['retries'] += 1
+            policy.before_retry(attempt, deadline, self.topology)
+            attempt += 1
+    
+    def _attempt_insert(self, seq: int, retry: bool = False) -> Optional[str]:
+        """One attempt: find the primary and insert; returns the error type, or None on commit."""
+        primary_node = self._get_primary_with_retry()
+        
+        if not primary_node:
+            self._handle_no_primary()
+            return 'no_primary'
+        
+        self._check_failover_recovery()
+        return self._perform_insert(primary_node, seq, retry)
+    
+    def _record_latency(self, seq: int, latency: float, start_lag: float) -> None:
+        """Record latency measured from the operation's intended start time."""
+        self.latency.record('op', latency)
+        if seq in self.acked_keys:
+            # End-to-end commit latency as the client sees it, retries and backoff included
+            self.latency.record('commit', latency)
+        self.flow.record(latency)
+        with self.stats_lock:
+            stats = self.workload_stats
+            stats['completed_ops'] += 1
+            stats['start_lag_max'] = max(stats['start_lag_max'], start_lag)
+    
+    def _committed_count(self) -> int:
+        """Successful inserts so far, including worker processes' latest reports."""
+        if self.process_load:
+            return self.process_load.live_total('successful_inserts')
+        return self.workload_stats['successful_inserts']
     
     def _get_primary_with_retry(self) -> Optional[str]:
-        """Try to get primary node with retries."""
-        for retry in range(PRIMARY_RETRY_ATTEMPTS):
-            primary_node, _ = self.get_primary_node()
-            if primary_node:
-                return primary_node
-            if retry < PRIMARY_RETRY_ATTEMPTS - 1:
-                time.sleep(PRIMARY_RETRY_DELAY)
-        return None
+        """Get the cached primary, waiting briefly for a refresh if it was invalidated."""
+        return self.topology.wait_for_primary(PRIMARY_RETRY_ATTEMPTS * PRIMARY_RETRY_DELAY)
     
     def _handle_no_primary(self) -> None:
         """Handle scenario when no primary is available."""
-        self.workload_stats['failed_inserts'] += 1
-        self.workload_stats['errors']['no_primary'] += 1
-        
-        if not self.failover_detected:
+        with self.stats_lock:
+            if self.failover_detected:
+                return
             self.failover_detected = True
             self.failover_start_time = time.time()
-            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-            print(f"\n⚠️  FAILOVER DETECTED at {timestamp}")
+        
+        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+        print(f"\n⚠️  FAILOVER DETECTED at {timestamp}")
     
     def _check_failover_recovery(self) -> None:
         """Check if failover has completed and log recovery time."""
-        if self.failover_detected and not self.failover_end_time:
+        if not self.failover_detected or self.failover_end_time:
+            return
+        with self.stats_lock:
+            if self.failover_end_time:
+                return
             self.failover_end_time = time.time()
-            duration = self.failover_end_time - self.failover_start_time
-            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-            print(f"\n✅ FAILOVER COMPLETED at {timestamp}")
-            print(f"⏱️  Failover Duration: {duration:.2f} seconds")
+        
+        duration = self.failover_end_time - self.failover_start_time
+        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+        print(f"\n✅ FAILOVER COMPLETED at {timestamp}")
+        print(f"⏱️  Failover Duration: {duration:.2f} seconds")
     
-    def _perform_insert(self, primary_node: str) -> None:
-        """Perform a single transaction insert."""
-        with self.get_connection(primary_node, silent=True) as conn:
+    def _perform_insert(self, primary_node: str, seq: int, retry: bool = False) -> Optional[str]:
+        """Perform a single transaction insert; returns the error type, or None on commit."""
+        with self.profiler.span('_perform_insert'), self.get_connection(primary_node, silent=True) as conn:
             if not conn:
-                self._record_failed_insert('connection_failed')
-                return
+                self.topology.invalidate()
+                return 'connection_failed'
             
             try:
-                query = self._build_insert_query()
-                self.execute_query(conn, query)
-                self.workload_stats['successful_inserts'] += 1
-                self._log_progress()
+                params = self._insert_params(seq)
+                started = time.perf_counter()
+                with self.profiler.server():
+                    self.pool.prepared(conn, INSERT_QUERY).execute(INSERT_QUERY, params)
+                    conn.commit()
+                self.latency.record('insert', time.perf_counter() - started)
+                with self.stats_lock:
+                    self.workload_stats['successful_inserts'] += 1
+                self._log_progress(seq)
+                return None
             except Error as e:
-                self._record_failed_insert(f'error_{e.errno if hasattr(e, "errno") else "unknown"}')
+                self.pool.report_error(conn, e)
+                self.topology.report_error(e)
+                if retry and self.idempotent and getattr(e, 'errno', None) == DUPLICATE_KEY_ERROR:
+                    # An earlier attempt committed but its acknowledgement was lost
+                    with self.stats_lock:
+                        self.workload_stats['successful_inserts'] += 1
+                        self.workload_stats['dedup_hits'] += 1
+                    return None
+                return f'error_{e.errno if hasattr(e, "errno") else "unknown"}'
     
-    def _build_insert_query(self) -> str:
-        """Build INSERT query for transaction."""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-        amount = 100 + (self.workload_stats['total_attempts'] % 900)
-        description = f'Transaction #{self.workload_stats["total_attempts"]}'
-        return f"""
-            INSERT INTO transactions (transaction_time, amount, description)
-            VALUES ('{timestamp}', {amount}, '{description}')
-        """
+    def _insert_params(self, seq: int) -> Tuple[int, int, bytes]:
+        """Bound parameters for INSERT_QUERY; the description comes from the payload pool."""
+        return seq, 100 + (seq % 900), self.payloads.next()
     
     def _record_failed_insert(self, error_type: str) -> None:
         """Record a failed insert attempt."""
-        self.workload_stats['failed_inserts'] += 1
-        self.workload_stats['errors'][error_type] += 1
+        with self.stats_lock:
+            self.workload_stats['failed_inserts'] += 1
+            self.workload_stats['errors'][error_type] += 1
     
-    def _log_progress(self) -> None:
-        """Log workload progress periodically."""
-        if self.workload_stats['total_attempts'] % 10 == 0:
+    def _log_progress(self, seq: int) -> None:
+        """Log workload progress about once per second of scheduled load."""
+        if seq % self.progress_every == 0:
             print(f"📝 Inserted {self.workload_stats['successful_inserts']} transactions "
                   f"(Attempts: {self.workload_stats['total_attempts']}, "
                   f"Failed: {self.workload_stats['failed_inserts']})")
@@ -277,7 +576,7 @@ class GroupReplicationFailoverTest:
                     cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.db_config['database']}")
                     cursor.execute(f"USE {self.db_config['database']}")
                     cursor.execute("DROP TABLE IF EXISTS transactions")
-                    cursor.execute(self._get_table_schema())
+                    cursor.execute(self._get_table_schema(self.idempotent))
                 
                 conn.commit()
                 print("✅ Database and table created successfully")
@@ -287,16 +586,25 @@ class GroupReplicationFailoverTest:
                 print(f"❌ Setup error: {e}")
                 return False
     
-    def _get_table_schema(self) -> str:
-        """Return the CREATE TABLE SQL for transactions table."""
-        return """
+    @staticmethod
+    def _get_table_schema(idempotent: bool = True) -> str:
+        """Return the CREATE TABLE SQL for transactions table.
+        
+        With ``idempotent`` the request key is unique, so a retried insert whose
+        earlier attempt already committed fails with a duplicate-key error.
+        """
+        request_key_index = ("UNIQUE KEY uk_request_key (request_key)" if idempotent
+                             else "INDEX idx_request_key (request_key)")
+        return f"""
             CREATE TABLE transactions (
                 id INT AUTO_INCREMENT PRIMARY KEY,
+                request_key BIGINT NOT NULL,
                 transaction_time DATETIME(3),
                 amount DECIMAL(10,2),
                 description VARCHAR(255),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                INDEX idx_time (transaction_time)
+                INDEX idx_time (transaction_time),
+                {request_key_index}
             ) ENGINE=InnoDB
         """
 
@@ -306,14 +614,41 @@ class GroupReplicationFailoverTest:
             container = self.client.containers.get(container_name)
             print(f"\n🛑 Stopping container: {container_name}")
             container.stop()
+            self._invalidate_container_connections(container_name)
             print(f"✅ Container {container_name} stopped")
             return True
         except Exception as e:
             print(f"❌ Error stopping container: {e}")
             return False
 
+    def _invalidate_container_connections(self, container_name: str) -> None:
+        """Drop pooled connections to the node running in a container."""
+        for name, config in self.nodes.items():
+            if config['container'] == container_name:
+                self.pool.invalidate(name)
+                self.probe_pool.invalidate(name)
+
     def start_container(self, container_name):
         """Start a Docker container"""
+        if not self.recreate_container(container_name):
+            return False
+        
+        # Wait for MySQL to accept connections and the member to come ONLINE,
+        # starting group replication if it does not rejoin on its own
+        node_name = self._map_host_to_node(container_name)
+        print(f"⏳ Waiting for {node_name} to be ready...")
+        return self.wait_until_ready(node_name).phases[-1][1] is not None
+
+    def wait_until_ready(self, node_name: str, until: str = 'ONLINE') -> NodeReadiness:
+        """Poll a node with backoff until it reaches ``until``; keeps the phase timings."""
+        readiness = NodeReadiness(node_name, self.nodes[node_name], self.db_config['user'],
+                                  self.db_config['password'], timeout=READY_TIMEOUT)
+        readiness.wait(until)
+        self.readiness.append(readiness)
+        return readiness
+
+    def recreate_container(self, container_name) -> bool:
+        """Remove a stopped container and bring it back up with docker-compose."""
         try:
             # Remove the stopped container first to avoid bind mount issues
             try:
@@ -326,75 +661,27 @@ class GroupReplicationFailoverTest:
             
             # Recreate container using docker-compose
             print(f"\n▶️  Recreating container: {container_name} using docker-compose")
-            import subprocess
+            ok, error = self._compose_up(container_name)
             
-            # Determine the docker-compose file location
-            compose_file = "/home/reynaldineo/sister/fp/group/docker-compose.yaml"
-            
-            result = subprocess.run(
-                ["docker-compose", "-f", compose_file, "up", "-d", container_name],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
+            if ok:
                 print(f"✅ Container {container_name} recreated and started")
-                
-                # Wait for MySQL to be ready
-                print(f"⏳ Waiting for MySQL to be ready...")
-                time.sleep(10)
-                
-                # Rejoin the group replication
-                self.rejoin_node_to_cluster(container_name)
-                
                 return True
             else:
-                print(f"❌ Error recreating container: {result.stderr}")
+                print(f"❌ Error recreating container: {error}")
                 return False
                 
         except Exception as e:
             print(f"❌ Error starting container: {e}")
             return False
 
-    def rejoin_node_to_cluster(self, container_name):
-        """Rejoin a node to the group replication cluster"""
-        try:
-            # Find the node name from container name
-            node_name = None
-            for name, config in self.nodes.items():
-                if config['container'] == container_name:
-                    node_name = name
-                    break
-            
-            if not node_name:
-                print(f"⚠️  Could not find node config for container {container_name}")
-                return False
-            
-            print(f"🔄 Rejoining {node_name} to cluster...")
-            
-            with self.get_connection(node_name, silent=True) as conn:
-                if not conn:
-                    print(f"⚠️  Could not connect to {node_name}, may need manual rejoin")
-                    return False
-                
-                try:
-                    with conn.cursor() as cursor:
-                        cursor.execute("START GROUP_REPLICATION;")
-                    conn.commit()
-                    print(f"✅ {node_name} rejoined the cluster")
-                    return True
-                except Error as e:
-                    # Error 3093 means group is already running - node auto-rejoined
-                    if e.errno == 3093:
-                        print(f"✅ {node_name} already in cluster (auto-rejoined)")
-                        return True
-                    else:
-                        print(f"⚠️  Error rejoining cluster: {e}")
-                        return False
-                
-        except Exception as e:
-            print(f"⚠️  Exception during rejoin: {e}")
-            return False
+    def _compose_up(self, container_name: str) -> Tuple[bool, str]:
+        """Run ``docker-compose up -d`` for one service; returns (success, stderr)."""
+        result = subprocess.run(
+            ["docker-compose", "-f", self.compose_file_path, "up", "-d", container_name],
+            capture_output=True,
+            text=True
+        )
+        return result.returncode == 0, result.stderr
 
     def display_final_stats(self) -> None:
         """Display comprehensive final statistics."""
@@ -404,7 +691,14 @@ class GroupReplicationFailoverTest:
         
         self._print_basic_stats()
         self._print_failover_metrics()
+        self._print_latency_stats()
+        self._print_flow_control_stats()
         self._print_error_breakdown()
+        self._print_retry_stats()
+        self._print_pool_stats()
+        self._print_topology_stats()
+        self._print_readiness_stats()
+        self._print_profile_stats()
         
         print(f"{'='*80}\n")
     
@@ -418,6 +712,35 @@ class GroupReplicationFailoverTest:
         if stats['total_attempts'] > 0:
             success_rate = (stats['successful_inserts'] / stats['total_attempts'] * 100)
             print(f"Success Rate: {success_rate:.2f}%")
+        
+        self._print_throughput_stats()
+    
+    def _print_throughput_stats(self) -> None:
+        """Print offered vs achieved rate and latency from intended start."""
+        stats = self.workload_stats
+        if not self.workload_started_at or stats['completed_ops'] == 0:
+            return
+        
+        elapsed = (self.workload_stopped_at or time.time()) - self.workload_started_at
+        workers = f"{self.processes} processes, {self.workers} workers" if self.processes else f"{self.workers} workers"
+        print(f"\n🚦 Throughput ({workers}, open loop):")
+        print(f"Offered Rate: {self.target_rate:g} TPS")
+        print(f"Achieved Throughput: {stats['successful_inserts'] / elapsed:.2f} TPS")
+        print(f"Max Start Lag Behind Schedule: {stats['start_lag_max'] * 1000:.2f} ms")
+    
+    def _print_latency_stats(self) -> None:
+        """Print per-phase latency percentiles and export histograms if requested."""
+        self.latency.print_report("Latency Percentiles (op = from intended start)")
+        if self.histogram_path:
+            self.latency.export(self.histogram_path)
+            print(f"Histograms exported to {self.histogram_path}")
+    
+    def _print_flow_control_stats(self) -> None:
+        """Print the per-second throughput/queue timeline and export it if requested."""
+        self.flow.print_report()
+        if self.flow_path:
+            self.flow.export(self.flow_path)
+            print(f"Flow-control timeline exported to {self.flow_path}")
     
     def _print_failover_metrics(self) -> None:
         """Print failover-specific metrics."""
@@ -428,6 +751,12 @@ class GroupReplicationFailoverTest:
             print(f"\n⏱️  Failover Metrics:")
             print(f"Failover Duration: {duration:.2f} seconds")
             print(f"Transactions Lost During Failover: {lost_transactions}")
+        
+        if self.election_duration is not None:
+            print(f"Primary Election Time (from failure injection): {self.election_duration:.3f} seconds")
+        if self.probe.timeouts:
+            timeouts = ", ".join(f"{node}: {count}" for node, count in sorted(self.probe.timeouts.items()))
+            print(f"Probe Timeouts ({self.probe.probes} probes): {timeouts}")
     
     def _print_error_breakdown(self) -> None:
         """Print breakdown of errors by type."""
@@ -436,29 +765,116 @@ class GroupReplicationFailoverTest:
             for error_type, count in self.workload_stats['errors'].items():
                 print(f"  - {error_type}: {count}")
 
+    def _print_retry_stats(self) -> None:
+        """Print retry policy counters and the errors individual attempts hit."""
+        stats = self.workload_stats
+        print(f"\n🔁 Retries:")
+        print(f"Retry Policy: {self.retry_policy.describe()}")
+        print(f"Idempotency Keys: {'on' if self.idempotent else 'off'}")
+        print(f"Retried Attempts: {stats['retries']}")
+        print(f"Duplicate-Key Acks (earlier attempt had committed): {stats['dedup_hits']}")
+        if stats['attempt_errors']:
+            print("Attempt Errors:")
+            for error_type, count in sorted(stats['attempt_errors'].items()):
+                print(f"  - {error_type}: {count}")
+
+    def _print_pool_stats(self) -> None:
+        """Print connection pool counters."""
+        stats = self.pool.stats
+        checkouts = stats['hits'] + stats['misses'] + stats['reconnects']
+        print(f"\n🔌 Connection Pool:")
+        print(f"Pool Hits: {stats['hits']}")
+        print(f"Pool Misses: {stats['misses']}")
+        print(f"Reconnects: {stats['reconnects']}")
+        print(f"Idle Evictions: {stats['evictions']}")
+        print(f"Node Invalidations: {stats['invalidations']}")
+        print(f"Statements Prepared: {stats['prepares']} (reused {stats['statement_hits']} times)")
+        if checkouts > 0:
+            print(f"Hit Rate: {stats['hits'] / checkouts * 100:.2f}%")
+
+    def _print_topology_stats(self) -> None:
+        """Print topology cache counters."""
+        stats = self.topology.stats
+        print(f"\n🧭 Topology Cache:")
+        print(f"Cached Primary Lookups: {stats['lookups']}")
+        print(f"Membership Refreshes: {stats['refreshes']}")
+        print(f"Write-Error Invalidations: {stats['invalidations']}")
+        print(f"Primary Changes Seen: {stats['primary_changes']}")
+
+    def _print_readiness_stats(self) -> None:
+        """Print how long each restarted node took per readiness phase."""
+        for readiness in self.readiness:
+            readiness.print_report()
+
+    def _print_profile_stats(self) -> None:
+        """Print client vs server time per span and export collapsed stacks if profiling."""
+        if not self.profiler.enabled:
+            return
+        if self.processes:
+            print("\n🔬 Profiling covers this process only; worker processes are not profiled")
+        self.profiler.print_report()
+        for path in self.profiler.export(self.profile_path):
+            print(f"Collapsed stacks exported to {path}")
+
     def verify_data_consistency(self) -> None:
         """Verify data consistency across all nodes in the cluster."""
         print("\n🔍 Verifying data consistency across nodes...")
         
-        counts = self._collect_transaction_counts()
+        result = self._run_checksum_verification()
+        counts = {node: result['row_counts'].get(node) for node in self.nodes}
         self._display_transaction_counts(counts)
-        self._check_consistency(counts)
-    
-    def _collect_transaction_counts(self) -> Dict[str, Any]:
-        """Collect transaction counts from all nodes."""
-        counts = {}
-        for node_name in self.nodes.keys():
-            with self.get_connection(node_name, silent=True) as conn:
-                if conn:
-                    try:
-                        with conn.cursor() as cursor:
-                            cursor.execute("SELECT COUNT(*) as count FROM transactions")
-                            result = cursor.fetchone()
-                            counts[node_name] = result[0]
-                    except Error as e:
-                        print(f"❌ Error fetching transaction count from {node_name}: {e}")
-                        counts[node_name] = None
-        return counts
+        self._check_consistency(result)
+    
+    def _run_checksum_verification(self) -> Dict[str, Any]:
+        """Compare per-chunk CRC32 aggregates of the transactions table on every node."""
+        verifier = ChunkedChecksumVerifier(
+            {name: (lambda node=name: self.get_connection(node, silent=True)) for name in self.nodes},
+            table='transactions',
+            columns=TRANSACTION_COLUMNS
+        )
+        result = verifier.verify()
+        print(f"  Compared {result['chunks_compared']} chunks with {verifier.queries} checksum queries")
+        return result
+    
+    def verify_writes(self) -> None:
+        """Compare the committed request keys with what the workload was told.
+        
+        Duplicates are keys committed more than once (a retry after a lost
+        acknowledgement without idempotency keys), lost writes are acknowledged
+        keys that are missing, and phantom commits are keys reported as failed
+        that committed anyway.
+        """
+        print("\n🔑 Verifying request keys against acknowledgements...")
+        primary_node, _ = self.get_primary_node()
+        if not primary_node:
+            print("❌ No primary available to read request keys")
+            return
+        
+        with self.get_connection(primary_node) as conn:
+            if not conn:
+                return
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT request_key FROM transactions")
+                    committed = Counter(row[0] for row in cursor.fetchall())
+            except Error as e:
+                print(f"❌ Error reading request keys: {e}")
+                return
+        
+        duplicates = sorted(key for key, count in committed.items() if count > 1)
+        lost = sorted(self.acked_keys - committed.keys())
+        phantom = sorted(self.failed_keys & committed.keys())
+        print(f"  Committed keys: {len(committed)} "
+              f"(acknowledged {len(self.acked_keys)}, reported failed {len(self.failed_keys)})")
+        for label, keys in (("Duplicate commits", duplicates), ("Lost acknowledged writes", lost),
+                            ("Phantom commits (reported failed)", phantom)):
+            if not keys:
+                print(f"  ✅ {label}: 0")
+                continue
+            sample = ", ".join(str(key) for key in keys[:CONSISTENCY_REPORT_LIMIT])
+            if len(keys) > CONSISTENCY_REPORT_LIMIT:
+                sample += f", ... and {len(keys) - CONSISTENCY_REPORT_LIMIT} more"
+            print(f"  ❌ {label}: {len(keys)} ({sample})")
     
     def _display_transaction_counts(self, counts: Dict[str, Any]) -> None:
         """Display transaction counts for each node."""
@@ -466,13 +882,25 @@ class GroupReplicationFailoverTest:
         for node, count in counts.items():
             print(f"  {node}: {count}")
     
-    def _check_consistency(self, counts: Dict[str, Any]) -> None:
-        """Check if all nodes have the same transaction count."""
-        values = [v for v in counts.values() if v is not None]
-        if len(set(values)) == 1 and len(values) == len(self.nodes):
+    def _check_consistency(self, result: Dict[str, Any]) -> None:
+        """Report whether every node holds identical rows, naming diverging ids."""
+        if result['consistent']:
             print("\n✅ Data is consistent across all nodes!")
-        else:
-            print("\n⚠️  Data inconsistency detected!")
+            return
+        
+        print("\n⚠️  Data inconsistency detected!")
+        for node in result['unreachable']:
+            print(f"  - {node}: unreachable")
+        diverging = result['diverging_ids']
+        if diverging:
+            print(f"  Diverging rows: {len(diverging)} "
+                  f"(in {result['mismatched_chunks']} mismatched chunks)")
+            for row_id, per_node in list(diverging.items())[:CONSISTENCY_REPORT_LIMIT]:
+                detail = ", ".join(f"{node}={'missing' if crc is None else f'{crc:08x}'}"
+                                   for node, crc in per_node.items())
+                print(f"  - id {row_id}: {detail}")
+            if len(diverging) > CONSISTENCY_REPORT_LIMIT:
+                print(f"  ... and {len(diverging) - CONSISTENCY_REPORT_LIMIT} more")
     
     def run_test(self) -> None:
         """Execute the complete failover test workflow."""
@@ -530,9 +958,12 @@ class GroupReplicationFailoverTest:
             return False
         
         print("\n📋 Step 4: Start continuous workload")
+        self.topology.start()
+        self.flow.start()
+        self.profiler.start()
         self.workload_running = True
-        workload_thread = threading.Thread(target=self.continuous_workload, daemon=True)
-        workload_thread.start()
+        self.workload_thread = threading.Thread(target=self.continuous_workload, daemon=True)
+        self.workload_thread.start()
         
         print(f"\n⏳ Letting workload run for {INITIAL_WORKLOAD_DURATION} seconds...")
         time.sleep(INITIAL_WORKLOAD_DURATION)
@@ -542,36 +973,50 @@ class GroupReplicationFailoverTest:
         """Execute the failover by stopping primary and waiting for new election."""
         print("\n📋 Step 5: Simulate PRIMARY node failure")
         print(f"\n⚠️  Stopping PRIMARY node: {primary_node}")
-        self.stop_container(primary_container)
+        self._set_phase("election")
+        injected_at = time.perf_counter()
+        # Stop in the background so the election is observed while the container shuts down
+        stopper = threading.Thread(target=self.stop_container, args=(primary_container,))
+        stopper.start()
         
         print("\n📋 Step 6: Observe failover process")
         print("⏳ Waiting for new primary election...")
-        time.sleep(3)
         
-        new_primary = self._monitor_primary_election(primary_node)
+        new_primary = self._monitor_primary_election(primary_node, injected_at)
+        stopper.join()
+        self._set_phase("post-failover")
         
         time.sleep(2)
         self.display_group_status("Status After Failover")
         return new_primary
     
-    def _monitor_primary_election(self, old_primary: str) -> Optional[str]:
-        """Monitor and wait for new primary election."""
-        elapsed = 0
+    def _monitor_primary_election(self, old_primary: str, injected_at: float) -> Optional[str]:
+        """Probe all nodes every ELECTION_POLL_INTERVAL until a new primary is elected."""
+        deadline = injected_at + FAILOVER_MAX_WAIT
+        last_seen: Optional[str] = old_primary
         
-        while elapsed < FAILOVER_MAX_WAIT:
+        while time.perf_counter() < deadline:
             new_primary_node, _ = self.get_primary_node()
+            elapsed = time.perf_counter() - injected_at
             
             if new_primary_node and new_primary_node != old_primary:
+                self.election_duration = elapsed
                 print(f"\n✅ NEW PRIMARY ELECTED: {new_primary_node} "
-                      f"(Port: {self.nodes[new_primary_node]['port']})")
+                      f"(Port: {self.nodes[new_primary_node]['port']}) after {elapsed:.3f}s")
                 return new_primary_node
-            elif new_primary_node:
-                print(f"⏳ Still waiting... (current primary check: {new_primary_node})")
-            else:
-                print(f"⏳ No primary available yet... (elapsed: {elapsed}s)")
             
-            time.sleep(FAILOVER_CHECK_INTERVAL)
-            elapsed += FAILOVER_CHECK_INTERVAL
+            # Only report changes so the 100 ms poll doesn't flood the output
+            if new_primary_node != last_seen:
+                timed_out = self.last_probe.timed_out if self.last_probe else []
+                suffix = f", no answer from {', '.join(timed_out)}" if timed_out else ""
+                if new_primary_node:
+                    print(f"⏳ Still waiting... (current primary check: {new_primary_node}, "
+                          f"elapsed: {elapsed:.3f}s{suffix})")
+                else:
+                    print(f"⏳ No primary available yet... (elapsed: {elapsed:.3f}s{suffix})")
+                last_seen = new_primary_node
+            
+            time.sleep(ELECTION_POLL_INTERVAL)
         
         return self._handle_election_timeout()
     
@@ -595,30 +1040,111 @@ class GroupReplicationFailoverTest:
     def _recover_failed_node(self, container_name: str) -> None:
         """Recover the failed node."""
         print("\n📋 Step 7: Restart old primary node")
+        self._set_phase("rejoin")
         self.start_container(container_name)
         
-        print(f"\n⏳ Waiting for node to rejoin cluster...")
-        time.sleep(CLUSTER_REJOIN_WAIT)
-        
         self.display_group_status("Final Group Status")
     
     def _finalize_test(self) -> None:
         """Stop workload and display final results."""
         print("\n📋 Step 8: Stopping workload")
         self.workload_running = False
-        time.sleep(1)  # Allow thread to finish
+        if self.workload_thread:
+            # Allow workers to finish (worker processes also send their final reports)
+            self.workload_thread.join(timeout=(STOP_TIMEOUT if self.processes else 0) + POOL_ACQUIRE_TIMEOUT + 1)
+        self.topology.stop()
+        self.flow.stop()
+        self.profiler.stop()
         
         self.display_final_stats()
         
         print("\n📋 Step 9: Verify data consistency")
         time.sleep(CONSISTENCY_CHECK_WAIT)
         self.verify_data_consistency()
+        self.verify_writes()
+        self.pool.close_all()
+        self.probe_pool.close_all()
+        self.probe.shutdown()
+
+
+def _process_worker(ctx: WorkerContext) -> None:
+    """Worker-process side of ``--processes``: one share of the open-loop insert schedule."""
+    retry_policy = make_policy(ctx.args['retry_policy'], max_attempts=ctx.args['retry_attempts'],
+                               budget=ctx.args['retry_budget'])
+    harness = GroupReplicationFailoverTest(ctx.args['compose_file_path'], target_rate=ctx.rate,
+                                           workers=ctx.threads, retry_policy=retry_policy,
+                                           idempotent=ctx.args['idempotent'])
+    harness.progress_every = sys.maxsize  # The parent logs merged progress
+    harness.latency.set_phase(ctx.phase())
+    harness.workload_running = True
+    harness.topology.start()
+
+    def step(slot: int) -> None:
+        phase = ctx.phase()
+        if phase != harness.latency.phase:
+            harness.latency.set_phase(phase)
+        harness._workload_step(ctx.global_seq(slot))
+
+    def report_loop() -> None:
+        while ctx.running():
+            ctx.report(harness._process_report())
+            time.sleep(REPORT_INTERVAL)
+
+    engine = OpenLoopWorkload(
+        step,
+        target_rate=ctx.rate,
+        workers=ctx.threads,
+        should_run=ctx.running,
+        on_complete=lambda slot, latency, lag: harness._record_latency(ctx.global_seq(slot), latency, lag)
+    )
+    start_at = ctx.wait_for_start()
+    threading.Thread(target=report_loop, daemon=True).start()
+    engine.run(start_at=start_at)
+
+    harness.topology.stop()
+    ctx.report(harness._process_report(final=True), final=True)
+    harness.pool.close_all()
+    harness.probe_pool.close_all()
+    harness.probe.shutdown()
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="MySQL Group Replication primary failover test")
+    parser.add_argument("--rate", type=float, default=WORKLOAD_TARGET_RATE,
+                        help="target inserts per second for the open-loop workload")
+    parser.add_argument("--workers", type=int, default=WORKLOAD_WORKERS,
+                        help="number of concurrent insert workers")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="spread the workers over this many worker processes (0 = this process)")
+    parser.add_argument("--retry-policy", choices=sorted(POLICIES), default="none",
+                        help="what a failed insert does next: give up, retry at once, retry after "
+                             "jittered exponential backoff, or retry after refreshing the primary")
+    parser.add_argument("--no-idempotency", dest="idempotent", action="store_false",
+                        help="drop the unique request key, so a retry after a lost commit "
+                             "acknowledgement inserts a duplicate row")
+    parser.add_argument("--histogram-out", metavar="PATH",
+                        help="export per-phase latency histograms to this JSON file")
+    parser.add_argument("--flow-out", metavar="PATH",
+                        help="export the per-second throughput/flow-control timeline to this CSV file")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="time the hot paths (client vs server wait) and write per-phase "
+                             "collapsed stacks to PREFIX.<phase>.{spans,samples}.folded")
+    parser.add_argument("--profile-interval", type=float, default=SAMPLE_INTERVAL,
+                        help="seconds between stack samples with --profile (0 = spans only)")
+    return parser.parse_args()
 
 
 def main():
     """Main entry point"""
+    args = parse_args()
     try:
-        test = GroupReplicationFailoverTest()
+        test = GroupReplicationFailoverTest(target_rate=args.rate, workers=args.workers,
+                                            histogram_path=args.histogram_out, processes=args.processes,
+                                            flow_path=args.flow_out,
+                                            retry_policy=make_policy(args.retry_policy),
+                                            idempotent=args.idempotent, profile_path=args.profile,
+                                            profile_interval=args.profile_interval)
         test.run_test()
     except KeyboardInterrupt:
         print("\n\n⚠️  Test interrupted by user")
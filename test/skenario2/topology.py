@@ -0,0 +1,126 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from mysql.connector import Error
+
+from pool import CONNECTION_LOST_ERRORS
+
+# Write errors that mean the cached primary can no longer take writes
+READ_ONLY_ERRORS = {1290, 1792}  # super_read_only / read-only transaction
+QUORUM_ERRORS = {3100, 3101, 3796}  # GR hook rejected commit / rolled back / no quorum
+TOPOLOGY_ERRORS = READ_ONLY_ERRORS | CONNECTION_LOST_ERRORS | QUORUM_ERRORS
+
+PrimaryLookup = Callable[[], Tuple[Optional[str], Optional[Dict[str, Any]]]]
+
+
+class TopologyCache:
+    """Cached view of the current group primary.
+
+    A background thread refreshes the view every ``refresh_interval`` seconds.
+    Writers call ``report_error`` when a write fails; errors listed in
+    ``TOPOLOGY_ERRORS`` drop the cached primary at once and wake the refresher,
+    so failover is detected by the failed write rather than by the next poll.
+    """
+
+    def __init__(self, lookup: PrimaryLookup, refresh_interval: float = 1.0):
+        self._lookup = lookup
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._primary: Optional[str] = None
+        self._last_primary: Optional[str] = None
+        self._member: Optional[Dict[str, Any]] = None
+        self._refreshed_at: Optional[float] = None
+        self._generation = 0
+        self._has_primary = threading.Event()
+        self._wake = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            'lookups': 0,
+            'refreshes': 0,
+            'invalidations': 0,
+            'primary_changes': 0
+        }
+
+    def start(self) -> None:
+        """Do one synchronous refresh, then keep refreshing in the background."""
+        self.refresh()
+        self._running = True
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.refresh_interval + 1)
+
+    def primary(self) -> Optional[str]:
+        """Return the cached primary without touching the cluster."""
+        with self._lock:
+            self.stats['lookups'] += 1
+            return self._primary
+
+    def wait_for_primary(self, timeout: float) -> Optional[str]:
+        """Return the cached primary, waiting up to ``timeout`` for a refresh to find one."""
+        primary = self.primary()
+        if primary or not self._has_primary.wait(timeout):
+            return primary
+        return self.primary()
+
+    def refresh(self) -> Optional[str]:
+        """Query the cluster for the primary and update the cache."""
+        with self._lock:
+            generation = self._generation
+        primary_node, member = self._lookup()
+        if member and member.get('MEMBER_STATE') != 'ONLINE':
+            primary_node, member = None, None
+
+        with self._lock:
+            self.stats['refreshes'] += 1
+            if generation != self._generation:
+                # Invalidated while the lookup was in flight; the woken loop retries
+                return self._primary
+            if primary_node and self._last_primary and primary_node != self._last_primary:
+                self.stats['primary_changes'] += 1
+            if primary_node:
+                self._last_primary = primary_node
+            self._primary = primary_node
+            self._member = member
+            self._refreshed_at = time.time()
+
+        if primary_node:
+            self._has_primary.set()
+        else:
+            self._has_primary.clear()
+        return primary_node
+
+    def invalidate(self) -> None:
+        """Forget the cached primary and trigger an immediate refresh."""
+        with self._lock:
+            self._primary = None
+            self._member = None
+            self._generation += 1
+            self.stats['invalidations'] += 1
+        self._has_primary.clear()
+        self._wake.set()
+
+    def report_error(self, error: Error) -> bool:
+        """Invalidate the cache if a failed write points at a topology change."""
+        if getattr(error, 'errno', None) in TOPOLOGY_ERRORS:
+            self.invalidate()
+            return True
+        return False
+
+    def _refresh_loop(self) -> None:
+        while self._running:
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            if not self._running:
+                break
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  Topology refresh failed: {e}")
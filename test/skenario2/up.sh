@@ -5,6 +5,7 @@ cd ../../group
 
 bash start.sh
 
-sleep 30
+# Wait until every mysqld accepts connections instead of a fixed sleep
+python3 ../test/skenario2/readiness.py --until accepting || sleep 30
 
 bash join.sh
\ No newline at end of file
@@ -0,0 +1,69 @@
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional
+
+# on_complete(slot, latency_seconds, start_lag_seconds)
+CompletionCallback = Callable[[int, float, float], None]
+
+
+class OpenLoopWorkload:
+    """Rate-controlled, open-loop workload driver.
+
+    Operation ``n`` is scheduled to start at ``start + n / target_rate``
+    regardless of how long earlier operations took. Any idle worker picks up
+    the next slot, sleeps until its intended start time if it is early, and
+    runs it straight away if it is late. Latency is measured from the
+    intended start time, so a slow operation shows up as queueing delay on
+    the operations behind it instead of silently lowering the offered rate
+    (coordinated omission).
+    """
+
+    def __init__(self, operation: Callable[[int], None], target_rate: float,
+                 workers: int, should_run: Callable[[], bool],
+                 on_complete: CompletionCallback):
+        if target_rate <= 0:
+            raise ValueError("target_rate must be positive")
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+        self._operation = operation
+        self.target_rate = target_rate
+        self.workers = workers
+        self._should_run = should_run
+        self._on_complete = on_complete
+        self._slots = itertools.count()
+        self._start = 0.0
+        self._threads: List[threading.Thread] = []
+
+    def run(self, start_at: Optional[float] = None) -> None:
+        """Start the workers and block until ``should_run`` turns false.
+
+        ``start_at`` is the ``time.perf_counter()`` value of slot 0; it lets
+        several processes share one schedule. Defaults to now.
+        """
+        self._slots = itertools.count()
+        self._start = time.perf_counter() if start_at is None else start_at
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"workload-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        for thread in self._threads:
+            thread.join()
+
+    def _worker(self) -> None:
+        interval = 1.0 / self.target_rate
+        while self._should_run():
+            # itertools.count is atomic under the GIL, so slots are never shared
+            slot = next(self._slots)
+            intended_start = self._start + slot * interval
+            delay = intended_start - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+                if not self._should_run():
+                    break
+
+            self._operation(slot)
+            finished = time.perf_counter()
+            self._on_complete(slot, finished - intended_start, max(0.0, -delay))
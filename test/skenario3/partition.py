@@ -0,0 +1,433 @@
+import mysql.connector
+from mysql.connector import Error
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import docker
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'skenario2'))
+
+from pool import CONNECTION_LOST_ERRORS
+from readiness import NodeReadiness
+from test import DB_CONFIG, NODES  # also puts the shared test/ modules on sys.path
+from topology import QUORUM_ERRORS, READ_ONLY_ERRORS
+from workload import OpenLoopWorkload
+
+CLUSTER_NETWORK = "group_mysql-cluster"
+CONTROL_NETWORK = "partition-control"  # lets the driver reach isolated nodes only
+DATABASE = "partition_test"
+TABLE = "network_partition_test"
+WRITE_RATE = 50  # writes per second per node
+READ_RATE = 50  # reads per second per node
+WORKERS = 8  # threads per node per operation kind; blocked writes hold one each
+OP_TIMEOUT = 2  # seconds; connect/read timeout (an int: the C extension rejects floats), a write still waiting after this is "blocked"
+BASELINE_DURATION = 5  # seconds before the partition
+PARTITION_DURATION = 30  # seconds the isolated nodes stay disconnected
+AFTER_DURATION = 10  # seconds of load after the isolated nodes are ONLINE again
+REJOIN_TIMEOUT = 120  # seconds
+VIEW_POLL_INTERVAL = 0.05  # seconds between membership polls per node
+
+WRITE_QUERY = f"INSERT INTO {TABLE} (data, node_source) VALUES (%s, %s)"
+READ_QUERY = f"SELECT MAX(id) FROM {TABLE}"
+MEMBERS_QUERY = """
+    SELECT MEMBER_HOST, MEMBER_STATE, MEMBER_ROLE
+    FROM performance_schema.replication_group_members
+"""
+
+# One completed operation: (node, kind, start_ms, end_ms, outcome)
+Op = Tuple[str, str, float, float, str]
+
+
+class PartitionTest:
+    """Steady reads and writes on every node while a subset is cut off the group.
+
+    The isolated nodes are disconnected from the cluster network with the
+    Docker SDK and reconnected later. Before that they are attached to a
+    private control network so the driver can keep talking to them (a
+    published port stops working once the node leaves the cluster network);
+    if several nodes are isolated they share that network and form their own
+    side of the partition. Every node gets an open-loop write and read
+    stream and each operation is classified (ok, read_only, blocked,
+    rejected, unreachable, error) with millisecond timestamps relative to
+    the start of the run. Each node's own membership view is polled at the
+    same time, so the timeline shows when writes block, when the majority
+    elects a primary, when the isolated nodes are expelled and when they
+    are ONLINE again.
+    """
+
+    def __init__(self, isolate: List[str], write_rate: float = WRITE_RATE, read_rate: float = READ_RATE,
+                 workers: int = WORKERS, op_timeout: int = OP_TIMEOUT,
+                 baseline: float = BASELINE_DURATION, partition: float = PARTITION_DURATION,
+                 after: float = AFTER_DURATION, network: str = CLUSTER_NETWORK):
+        self.client = docker.from_env()
+        self.isolate = list(isolate)
+        self.write_rate = write_rate
+        self.read_rate = read_rate
+        self.workers = workers
+        self.op_timeout = op_timeout
+        self.durations = {'baseline': baseline, 'partition': partition, 'after': after}
+        self.network_name = network
+        self.nodes: Dict[str, Dict[str, Any]] = {name: dict(config) for name, config in NODES.items()}
+        self.control_network = None
+
+        self.ops: List[Op] = []
+        self.events: List[Tuple[float, str]] = []
+        self.views: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self.readiness: List[NodeReadiness] = []
+        self._local = threading.local()
+        self._running = False
+        self._started = 0.0
+
+    def _ms(self, at: Optional[float] = None) -> float:
+        return ((time.perf_counter() if at is None else at) - self._started) * 1000
+
+    def _event(self, message: str, at: Optional[float] = None) -> None:
+        ms = self._ms(at)
+        self.events.append((ms, message))
+        print(f"[{ms:>9.0f} ms] {message}")
+
+    # --- Setup ----------------------------------------------------------------
+
+    def _connect(self, node_name: str, database: Optional[str] = DATABASE, timeout: Optional[int] = None):
+        node = self.nodes[node_name]
+        return mysql.connector.connect(
+            host=node['host'],
+            port=node['port'],
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            database=database,
+            autocommit=True,
+            connection_timeout=timeout or self.op_timeout
+        )
+
+    def setup(self) -> None:
+        """Attach isolated nodes to the control network and make sure the table exists."""
+        if self.isolate:
+            for stale in self.client.networks.list(names=[CONTROL_NETWORK]):
+                stale.remove()  # Left behind by an interrupted run
+            self.control_network = self.client.networks.create(CONTROL_NETWORK, driver="bridge", internal=True)
+            for node_name in self.isolate:
+                container = self.client.containers.get(self.nodes[node_name]['container'])
+                self.control_network.connect(container)
+                container.reload()
+                address = container.attrs['NetworkSettings']['Networks'][CONTROL_NETWORK]['IPAddress']
+                # Reach the node on its control address from now on, not the published port
+                self.nodes[node_name].update(host=address, port=3306)
+                print(f"🔌 {node_name} reachable at {address}:3306 on {CONTROL_NETWORK}")
+
+        primary = next((name for name in self.nodes if self._role(name) == 'PRIMARY'), None)
+        if primary is None:
+            raise RuntimeError("no PRIMARY found")
+        conn = self._connect(primary, database=None)
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DATABASE}")
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {DATABASE}.{TABLE} (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    data VARCHAR(500),
+                    node_source VARCHAR(50),
+                    created_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3)
+                )
+            """)
+        conn.close()
+
+    def _role(self, node_name: str) -> Optional[str]:
+        try:
+            conn = self._connect(node_name, database=None)
+        except Error:
+            return None
+        with conn.cursor() as cursor:
+            cursor.execute(MEMBERS_QUERY + " WHERE MEMBER_ID = @@server_uuid")
+            row = cursor.fetchone()
+        conn.close()
+        return row[2] if row else None
+
+    def teardown(self) -> None:
+        network = self.client.networks.get(self.network_name)
+        for node_name in self.isolate:
+            container = self.client.containers.get(self.nodes[node_name]['container'])
+            container.reload()
+            if self.network_name not in container.attrs['NetworkSettings']['Networks']:
+                network.connect(container)
+            if self.control_network is not None and CONTROL_NETWORK in container.attrs['NetworkSettings']['Networks']:
+                self.control_network.disconnect(container)
+        if self.control_network is not None:
+            self.control_network.remove()
+            self.control_network = None
+
+    # --- Load -----------------------------------------------------------------
+
+    def _connection(self, node_name: str):
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(node_name)
+        if conn is None:
+            conn = connections[node_name] = self._connect(node_name)
+        return conn
+
+    def _drop_connection(self, node_name: str) -> None:
+        conn = self._local.connections.pop(node_name, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _operation(self, node_name: str, kind: str) -> None:
+        started = time.perf_counter()
+        outcome = 'ok'
+        try:
+            conn = self._connection(node_name)
+            with conn.cursor() as cursor:
+                if kind == 'write':
+                    cursor.execute(WRITE_QUERY, (f"partition run {started:.6f}", node_name))
+                else:
+                    cursor.execute(READ_QUERY)
+                    cursor.fetchall()
+        except Exception as e:
+            # Not only Error: a half-open socket can surface as OSError or a connector internal error
+            outcome = self._classify(e, time.perf_counter() - started)
+            if outcome not in ('read_only', 'rejected'):
+                self._drop_connection(node_name)
+        self.ops.append((node_name, kind, self._ms(started), self._ms(), outcome))
+
+    def _classify(self, error: Exception, elapsed: float) -> str:
+        errno = getattr(error, 'errno', None)
+        if errno in READ_ONLY_ERRORS:
+            return 'read_only'
+        if errno in QUORUM_ERRORS:
+            return 'rejected'
+        # The read timeout fired: the statement was waiting on the group, not refused
+        if elapsed >= self.op_timeout * 0.9:
+            return 'blocked'
+        if errno in CONNECTION_LOST_ERRORS or not isinstance(error, Error):
+            return 'unreachable'
+        return 'error'
+
+    def _drive(self, node_name: str, kind: str, rate: float) -> None:
+        OpenLoopWorkload(lambda seq: self._operation(node_name, kind), rate, self.workers,
+                         lambda: self._running, lambda seq, latency, lag: None).run(start_at=self._started)
+
+    def _watch(self, node_name: str) -> None:
+        """Record every change in ``node_name``'s own view of the group."""
+        conn = None
+        while self._running:
+            try:
+                if conn is None:
+                    conn = self._connect(node_name, database=None, timeout=1)
+                with conn.cursor() as cursor:
+                    cursor.execute(MEMBERS_QUERY)
+                    view = {host: (state, role) for host, state, role in cursor.fetchall()}
+            except Exception:
+                conn = None
+                view = None
+            self._record_view(node_name, view)
+            time.sleep(VIEW_POLL_INTERVAL)
+        if conn is not None:
+            conn.close()
+
+    def _record_view(self, observer: str, view: Optional[Dict[str, Tuple[str, str]]]) -> None:
+        previous = self.views.get(observer)
+        if view == previous:
+            return
+        self.views[observer] = view
+        if view is None:
+            self._event(f"{observer}: view unavailable")
+            return
+        previous = previous or {}
+        for host in sorted(set(view) | set(previous)):
+            if host not in view:
+                self._event(f"{observer} sees {host} expelled")
+            elif view[host] != previous.get(host):
+                state, role = view[host]
+                self._event(f"{observer} sees {host} {state}{' ' + role if role else ''}")
+
+    # --- Run ------------------------------------------------------------------
+
+    def run(self) -> None:
+        self._running = True
+        self._started = time.perf_counter()
+        threads = []
+        for node_name in self.nodes:
+            threads.append(threading.Thread(target=self._watch, args=(node_name,), daemon=True))
+            threads.append(threading.Thread(target=self._drive, args=(node_name, 'write', self.write_rate),
+                                            daemon=True))
+            threads.append(threading.Thread(target=self._drive, args=(node_name, 'read', self.read_rate),
+                                            daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            time.sleep(self.durations['baseline'])
+            self.partition()
+            time.sleep(self.durations['partition'])
+            self.reconnect()
+            self.wait_for_rejoin()
+            time.sleep(self.durations['after'])
+        finally:
+            self._running = False
+            for thread in threads:
+                thread.join(timeout=self.op_timeout + 1)
+
+    def partition(self) -> None:
+        network = self.client.networks.get(self.network_name)
+        at = time.perf_counter()
+        for node_name in self.isolate:
+            network.disconnect(self.nodes[node_name]['container'])
+        self._event(f"partition: {', '.join(self.isolate)} disconnected from {self.network_name}", at)
+
+    def reconnect(self) -> None:
+        network = self.client.networks.get(self.network_name)
+        at = time.perf_counter()
+        for node_name in self.isolate:
+            network.connect(self.nodes[node_name]['container'])
+        self._event(f"reconnect: {', '.join(self.isolate)} connected to {self.network_name}", at)
+
+    def wait_for_rejoin(self) -> None:
+        waiters = []
+        for node_name in self.isolate:
+            readiness = NodeReadiness(node_name, self.nodes[node_name], DB_CONFIG['user'], DB_CONFIG['password'],
+                                      timeout=REJOIN_TIMEOUT, verbose=False)
+            self.readiness.append(readiness)
+            waiters.append(threading.Thread(target=readiness.wait, daemon=True))
+        for waiter in waiters:
+            waiter.start()
+        for waiter in waiters:
+            waiter.join()
+        for readiness in self.readiness:
+            rejoined = readiness.phases and readiness.phases[-1][1] is not None
+            self._event(f"{readiness.name} {'ONLINE again' if rejoined else 'did not rejoin'} "
+                        f"(START GROUP_REPLICATION issued {readiness.recovery['rejoin_attempts']}x)")
+
+    # --- Timeline -------------------------------------------------------------
+
+    def segments(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Per node and kind, runs of consecutive operations with the same outcome."""
+        by_stream: Dict[Tuple[str, str], List[Op]] = defaultdict(list)
+        for op in self.ops:
+            by_stream[(op[0], op[1])].append(op)
+        result = {}
+        for key, ops in sorted(by_stream.items()):
+            ops.sort(key=lambda op: op[2])
+            runs: List[Dict[str, Any]] = []
+            for _, _, start_ms, end_ms, outcome in ops:
+                if runs and runs[-1]['outcome'] == outcome:
+                    runs[-1]['end_ms'] = max(runs[-1]['end_ms'], end_ms)
+                    runs[-1]['ops'] += 1
+                else:
+                    if runs:
+                        runs[-1]['end_ms'] = start_ms
+                    runs.append({'outcome': outcome, 'start_ms': start_ms, 'end_ms': end_ms, 'ops': 1})
+            result[key] = runs
+        return result
+
+    def unavailability_windows(self) -> List[Dict[str, float]]:
+        """Stretches in which no write issued to any node committed.
+
+        A window opens at the start of the first write after the last one
+        that succeeded and closes at the start of the next successful write.
+        Gaps shorter than two write intervals of one node are ordinary
+        scheduling (in single-primary mode only the primary's writes commit).
+        """
+        writes = sorted((op for op in self.ops if op[1] == 'write'), key=lambda op: op[2])
+        min_gap = 2000 / self.write_rate
+        windows = []
+        opened: Optional[float] = None
+        for _, _, start_ms, _, outcome in writes:
+            if outcome == 'ok':
+                if opened is not None and start_ms - opened >= min_gap:
+                    windows.append({'start_ms': opened, 'end_ms': start_ms, 'duration_ms': start_ms - opened})
+                opened = None
+            elif opened is None:
+                opened = start_ms
+        if opened is not None and writes:
+            windows.append({'start_ms': opened, 'end_ms': None, 'duration_ms': None})
+        return windows
+
+    def print_report(self) -> None:
+        print(f"\n{'='*80}")
+        print("📈 AVAILABILITY TIMELINE (ms since start)")
+        print(f"{'='*80}")
+        for (node_name, kind), runs in self.segments().items():
+            print(f"\n{node_name} {kind}:")
+            for run in runs:
+                print(f"  {run['start_ms']:>9.0f} → {run['end_ms']:>9.0f}  {run['outcome']:<12} "
+                      f"{run['ops']:>6} ops")
+
+        print("\n🧭 Events:")
+        for ms, message in sorted(self.events):
+            print(f"  {ms:>9.0f}  {message}")
+
+        windows = self.unavailability_windows()
+        print("\n⏱️  Group write unavailability:")
+        if not windows:
+            print("  none (some node committed writes throughout)")
+        for window in windows:
+            if window['end_ms'] is None:
+                print(f"  from {window['start_ms']:.0f} ms until the end of the run")
+            else:
+                print(f"  {window['start_ms']:.0f} → {window['end_ms']:.0f} ms "
+                      f"({window['duration_ms']:.0f} ms)")
+        for readiness in self.readiness:
+            readiness.print_report()
+
+    def export(self, path: str) -> None:
+        data = {
+            'isolated': self.isolate,
+            'segments': {f"{node}/{kind}": runs for (node, kind), runs in self.segments().items()},
+            'events': [{'ms': ms, 'event': message} for ms, message in sorted(self.events)],
+            'unavailability_windows': self.unavailability_windows(),
+            'readiness': [readiness.summary() for readiness in self.readiness]
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Network partition test with a per-node availability timeline")
+    # No choices=: with nargs="*" argparse checks the list default against them and fails on 3.11
+    parser.add_argument("isolate", nargs="*", help="nodes to cut off from the group (default: node1)")
+    parser.add_argument("--write-rate", type=float, default=WRITE_RATE, help="writes per second per node")
+    parser.add_argument("--read-rate", type=float, default=READ_RATE, help="reads per second per node")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="threads per node per operation kind")
+    parser.add_argument("--op-timeout", type=int, default=OP_TIMEOUT,
+                        help="seconds before a waiting operation counts as blocked")
+    parser.add_argument("--baseline", type=float, default=BASELINE_DURATION)
+    parser.add_argument("--duration", type=float, default=PARTITION_DURATION, help="seconds partitioned")
+    parser.add_argument("--after", type=float, default=AFTER_DURATION, help="seconds of load after rejoin")
+    parser.add_argument("--network", default=CLUSTER_NETWORK)
+    parser.add_argument("--json", metavar="PATH", help="write the timeline to this JSON file")
+    args = parser.parse_args()
+    args.isolate = args.isolate or ["node1"]
+    unknown = [name for name in args.isolate if name not in NODES]
+    if unknown:
+        parser.error(f"unknown node(s): {', '.join(unknown)} (choose from {', '.join(NODES)})")
+    return args
+
+
+def main():
+    args = parse_args()
+    test = PartitionTest(args.isolate, args.write_rate, args.read_rate, args.workers, args.op_timeout,
+                         args.baseline, args.duration, args.after, args.network)
+    try:
+        test.setup()
+        test.run()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test interrupted by user")
+    finally:
+        test.teardown()
+    test.print_report()
+    if args.json:
+        test.export(args.json)
+        print(f"Timeline written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
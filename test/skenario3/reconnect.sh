@@ -3,7 +3,7 @@
 echo "Reconnecting node1 to cluster network..."
 docker network connect group_mysql-cluster node1
 
-sleep 10
+python3 ../skenario2/readiness.py --until ONLINE --no-rejoin --timeout 30 node1 || sleep 10
 
 STATE=$(docker exec node1 mysql -uroot -ppass \
     -sN -e "SELECT MEMBER_STATE FROM performance_schema.replication_group_members 
@@ -23,7 +23,7 @@ else
     
     echo ""
     echo "Waiting for node1 to rejoin..."
-    sleep 10
+    python3 ../skenario2/readiness.py --no-rejoin --timeout 60 node1 || sleep 10
     
     STATE=$(docker exec node1 mysql -uroot -ppass \
         -sN -e "SELECT MEMBER_STATE FROM performance_schema.replication_group_members 
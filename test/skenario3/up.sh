@@ -9,8 +9,12 @@ bash start.sh
 
 echo ""
 echo "Waiting for containers to initialize..."
-sleep 75
+python3 ../test/skenario2/readiness.py --until accepting || sleep 75
 
 echo ""
 echo "Initializing Group Replication..."
 bash join.sh
+
+echo ""
+echo "Waiting for all members to be ONLINE..."
+python3 ../test/skenario2/readiness.py --no-rejoin || sleep 30
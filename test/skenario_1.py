@@ -1,11 +1,33 @@
 import mysql.connector
+import argparse
+import os
+import tempfile
 import time
 import threading
 import random
+from contextlib import contextmanager
+
+from checksum import ChunkedChecksumVerifier
+from latency import LatencyRecorder
+from payload import PayloadPool
 
 TOTAL_ROWS   = 1000  
 PAYLOAD_SIZE = 5000  
 
+# Konfigurasi Bulk Load
+LOAD_STRATEGIES = ("single", "batch", "infile")
+LOAD_STRATEGY   = "single"  # single = 1 execute per baris (perilaku awal)
+BATCH_SIZE      = 100       # Jumlah baris per executemany (multi-row VALUES)
+COMMIT_EVERY    = 1000      # Commit setiap N baris (ukuran transaksi binlog)
+
+# Mode pengukuran lag: poll = SELECT per 1 ms, gtid = WAIT_FOR_EXECUTED_GTID_SET + performance_schema
+LAG_MODES   = ("poll", "gtid")
+LAG_MODE    = "poll"
+LAG_TIMEOUT = 30  # detik
+
+# Histogram lag per strategi (fase) dan per replica (metric)
+lag_latency = LatencyRecorder(phase=LOAD_STRATEGY)
+
 # Konfigurasi Koneksi Database
 db_config = {'user': 'root', 'password': 'pass', 'database': 'testdb'}
 primary_conf = {**db_config, 'host': '127.0.0.1', 'port': 3306}
@@ -31,7 +53,7 @@ def generate_random_payload(target_size):
         current_size += len(part)
     return "".join(result)
 
-def setup_database():
+def setup_database(total_rows=TOTAL_ROWS):
     """Reset Database"""
     try:
         conn = mysql.connector.connect(user='root', password='pass', host='127.0.0.1', port=3306)
@@ -47,27 +69,135 @@ def setup_database():
             )
         """)
         conn.commit()
-        print(f"[INFO] Database siap. Target Uji: {TOTAL_ROWS} Baris.")
+        print(f"[INFO] Database siap. Target Uji: {total_rows} Baris.")
         cursor.close()
         conn.close()
     except Exception as e:
         print(f"[ERROR] Setup gagal: {e}")
 
-def measure_lag(name, config, target_id, start_time):
+def _report_throughput(strategy, rows, payload_size, elapsed):
+    """Mencetak rows/s dan MB/s untuk satu strategi load"""
+    elapsed = max(elapsed, 1e-9)
+    rows_per_sec = rows / elapsed
+    mb_per_sec = (rows * payload_size) / elapsed / 1_000_000
+    print(f"[LOAD] {strategy}: {rows} baris dalam {elapsed:.2f} s "
+          f"({rows_per_sec:.0f} rows/s, {mb_per_sec:.2f} MB/s)")
+    return {'rows': rows, 'elapsed': elapsed,
+            'rows_per_sec': rows_per_sec, 'mb_per_sec': mb_per_sec}
+
+def _next_payload(payload):
+    """Payload tetap (str) atau payload berikutnya dari PayloadPool (tanpa alokasi)"""
+    return payload.next() if isinstance(payload, PayloadPool) else payload
+
+def _payload_rows(payload, count):
+    """Parameter executemany untuk `count` baris"""
+    if isinstance(payload, PayloadPool):
+        return [(payload.next(),) for _ in range(count)]
+    return [(payload,)] * count
+
+def _payload_size(payload):
+    return payload.size if isinstance(payload, PayloadPool) else len(payload.encode("utf-8"))
+
+def _load_single(conn, cursor, payload, count, batch_size, commit_every):
+    """Satu execute per baris (prepared statement), commit setiap COMMIT_EVERY baris"""
+    query = "INSERT INTO scenario1 (data) VALUES (%s)"
+    # PREPARE sekali, setiap execute hanya mengirim nilai parameter (protokol biner)
+    prepared = conn.cursor(prepared=True)
+    for i in range(1, count + 1):
+        prepared.execute(query, (_next_payload(payload),))
+        if i % commit_every == 0:
+            conn.commit()
+    conn.commit()
+    prepared.close()
+
+def _load_batch(conn, cursor, payload, count, batch_size, commit_every):
+    """executemany per batch, connector menulis ulang menjadi multi-row VALUES"""
+    query = "INSERT INTO scenario1 (data) VALUES (%s)"
+    inserted = 0
+    uncommitted = 0
+    while inserted < count:
+        size = min(batch_size, count - inserted)
+        cursor.executemany(query, _payload_rows(payload, size))
+        inserted += size
+        uncommitted += size
+        if uncommitted >= commit_every:
+            conn.commit()
+            uncommitted = 0
+    conn.commit()
+
+def _escape_infile_field(value):
+    """Escape karakter khusus untuk format default LOAD DATA"""
+    return (value.replace("\\", "\\\\")
+                 .replace("\t", "\\t")
+                 .replace("\n", "\\n"))
+
+def _load_infile(conn, cursor, payload, count, batch_size, commit_every):
+    """LOAD DATA LOCAL INFILE, satu file sementara per transaksi commit"""
+    cursor.execute("SET GLOBAL local_infile = 1")
+    pool = payload if isinstance(payload, PayloadPool) else None
+    line = None if pool else (_escape_infile_field(payload) + "\n").encode("utf-8")
+    inserted = 0
+    while inserted < count:
+        size = min(commit_every, count - inserted)
+        fd, path = tempfile.mkstemp(prefix="scenario1_", suffix=".tsv")
+        try:
+            # Tulis per batch agar memori tetap kecil walau baris banyak
+            with os.fdopen(fd, "wb") as f:
+                written = 0
+                while written < size:
+                    chunk = min(batch_size, size - written)
+                    if pool:
+                        # Slice memoryview langsung ke file; alfabet pool tidak perlu escape
+                        for _ in range(chunk):
+                            f.write(pool.next_view())
+                            f.write(b"\n")
+                    else:
+                        f.write(line * chunk)
+                    written += chunk
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE scenario1 "
+                "CHARACTER SET utf8mb4 (data)"
+            )
+            conn.commit()
+        finally:
+            os.remove(path)
+        inserted += size
+
+LOADERS = {
+    "single": _load_single,
+    "batch": _load_batch,
+    "infile": _load_infile,
+}
+
+def bulk_load(conn, cursor, payload, count, strategy=LOAD_STRATEGY,
+              batch_size=BATCH_SIZE, commit_every=COMMIT_EVERY):
+    """Insert `count` baris dummy dengan strategi terpilih dan ukur throughput"""
+    if batch_size <= 0 or commit_every <= 0:
+        raise ValueError(f"batch_size dan commit_every harus > 0 (batch={batch_size}, commit={commit_every})")
+    loader = LOADERS[strategy]
+    start = time.perf_counter()
+    loader(conn, cursor, payload, count, batch_size, commit_every)
+    elapsed = time.perf_counter() - start
+    return _report_throughput(strategy, count, _payload_size(payload), elapsed)
+
+def measure_lag(name, config, target_id, start_time, results=None):
     """Mengukur Lag"""
     try:
         conn = mysql.connector.connect(**config)
         conn.autocommit = True
-        cursor = conn.cursor()
+        cursor = conn.cursor(prepared=True)  # Poll 1 ms: query di-parse sekali saja
         data_found = False
-        timeout = 30 # Timeout diperlama untuk jaga-jaga jika data banyak
+        timeout = LAG_TIMEOUT # Timeout diperlama untuk jaga-jaga jika data banyak
 
         while (time.time() - start_time) < timeout:
             conn.commit()
-            cursor.execute(f"SELECT id FROM scenario1 WHERE id = {target_id}")
+            cursor.execute("SELECT id FROM scenario1 WHERE id = %s", (target_id,))
             if cursor.fetchone():
                 lag = (time.time() - start_time) * 1000
+                lag_latency.record(name, lag / 1000)
                 print(f"✅ {name}: Data masuk dalam {lag:.2f} ms")
+                if results is not None:
+                    results[name] = lag
                 data_found = True
                 break
             time.sleep(0.001)
@@ -80,9 +210,106 @@ def measure_lag(name, config, target_id, start_time):
     except Exception as e:
         print(f"⚠️ {name} Error: {e}")
 
+def get_last_gtid(cursor):
+    """GTID transaksi terakhir yang di-commit di server ini (uuid:n)"""
+    cursor.execute("SELECT @@GLOBAL.server_uuid, @@GLOBAL.gtid_executed")
+    server_uuid, gtid_executed = cursor.fetchone()
+    for gtid_set in gtid_executed.replace("\n", "").split(","):
+        parts = gtid_set.strip().split(":")
+        if parts[0] == server_uuid:
+            last_interval = parts[-1]
+            return f"{server_uuid}:{last_interval.split('-')[-1]}"
+    return None
+
+def _ms_between(start, end):
+    """Selisih dua timestamp performance_schema dalam ms (resolusi mikrodetik)"""
+    if not start or not end or start.year < 1971 or end.year < 1971:
+        return None
+    return (end - start).total_seconds() * 1000
+
+def _fmt_ms(value):
+    return f"{value:.3f}" if value is not None else "-"
+
+def _fetch_apply_timestamps(cursor, gtid):
+    """Ambil timestamp queue/apply untuk satu GTID dari performance_schema"""
+    cursor.execute("""
+        SELECT LAST_QUEUED_TRANSACTION_ORIGINAL_COMMIT_TIMESTAMP,
+               LAST_QUEUED_TRANSACTION_END_QUEUE_TIMESTAMP
+        FROM performance_schema.replication_connection_status
+        WHERE LAST_QUEUED_TRANSACTION = %s
+    """, (gtid,))
+    queued = cursor.fetchone()
+    cursor.execute("""
+        SELECT LAST_APPLIED_TRANSACTION_ORIGINAL_COMMIT_TIMESTAMP,
+               LAST_APPLIED_TRANSACTION_START_APPLY_TIMESTAMP,
+               LAST_APPLIED_TRANSACTION_END_APPLY_TIMESTAMP
+        FROM performance_schema.replication_applier_status_by_worker
+        WHERE LAST_APPLIED_TRANSACTION = %s
+    """, (gtid,))
+    applied = cursor.fetchone()
+    return queued, applied
+
+def measure_lag_gtid(name, config, target_gtid, start_time, results=None):
+    """Mengukur Lag via GTID: satu WAIT_FOR_EXECUTED_GTID_SET di server, tanpa polling"""
+    if not target_gtid:
+        # Tanpa GTID, WAIT_FOR_EXECUTED_GTID_SET(NULL, ...) mengembalikan NULL, bukan timeout
+        print(f"❌ {name}: GTID target tidak tersedia di primary (gtid_mode OFF?), lag tidak diukur.")
+        return
+    try:
+        conn = mysql.connector.connect(**config)
+        conn.autocommit = True
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT WAIT_FOR_EXECUTED_GTID_SET(%s, %s)", (target_gtid, LAG_TIMEOUT))
+        waited = cursor.fetchone()[0]
+        wall_lag = (time.time() - start_time) * 1000
+        if waited is None:
+            print(f"❌ {name}: WAIT_FOR_EXECUTED_GTID_SET mengembalikan NULL untuk {target_gtid} (gtid_mode OFF?).")
+            cursor.close()
+            conn.close()
+            return
+        timed_out = waited != 0
+        if timed_out:
+            print(f"❌ {name}: Timeout menunggu GTID {target_gtid}.")
+            cursor.close()
+            conn.close()
+            return
+
+        queued, applied = _fetch_apply_timestamps(cursor, target_gtid)
+        cursor.close()
+        conn.close()
+
+        if not applied:
+            # Worker sudah memproses transaksi lain, hanya waktu tunggu klien yang tersedia
+            print(f"✅ {name}: GTID diterapkan dalam {wall_lag:.2f} ms (waktu tunggu klien)")
+            lag_latency.record(name, wall_lag / 1000)
+            if results is not None:
+                results[name] = wall_lag
+            return
+
+        original_commit, start_apply, end_apply = applied
+        total = _ms_between(original_commit, end_apply)
+        apply_commit = _ms_between(start_apply, end_apply)
+        queue = relay_wait = None
+        if queued:
+            queue = _ms_between(queued[0], queued[1])
+            relay_wait = _ms_between(queued[1], start_apply)
+
+        print(f"✅ {name}: Apply lag {_fmt_ms(total)} ms "
+              f"(queue {_fmt_ms(queue)} | tunggu relay log {_fmt_ms(relay_wait)} | "
+              f"apply+commit {_fmt_ms(apply_commit)}) "
+              f"- waktu tunggu klien {wall_lag:.2f} ms")
+        lag = total if total is not None else wall_lag
+        lag_latency.record(name, lag / 1000)
+        if results is not None:
+            results[name] = lag
+    except Exception as e:
+        print(f"⚠️ {name} Error: {e}")
+
 def verify_integrity(name, config, target_id, expected_content, total_expected_rows):
-    """Memeriksa jumlah baris dan isi konten"""
+    """Memeriksa jumlah baris dan isi konten, True jika keduanya sesuai"""
     print(f"\n[AUDIT] Memeriksa Integritas Data di {name}...")
+    shape_ok = content_ok = False
     try:
         conn = mysql.connector.connect(**config)
         conn.autocommit = True 
@@ -92,16 +319,18 @@ def verify_integrity(name, config, target_id, expected_content, total_expected_r
         cursor.execute("SELECT COUNT(*) FROM scenario1")
         row_count = cursor.fetchone()[0]
         
-        if row_count == total_expected_rows:
+        shape_ok = row_count == total_expected_rows
+        if shape_ok:
             print(f"   Shape OK : Jumlah baris sesuai ({row_count}).")
         else:
             print(f"   Shape FAIL : Harapan {total_expected_rows}, tapi ditemukan {row_count}!")
 
         # 2. Cek Konten
-        cursor.execute(f"SELECT data FROM scenario1 WHERE id = {target_id}")
+        cursor.execute("SELECT data FROM scenario1 WHERE id = %s", (target_id,))
         result = cursor.fetchone()
         
-        if result and result[0] == expected_content:
+        content_ok = bool(result) and result[0] == expected_content
+        if content_ok:
             print(f"   Content OK : Isi data identik.")
         else:
             print(f"   Content FAIL : Isi data rusak atau tidak ditemukan!")
@@ -111,51 +340,167 @@ def verify_integrity(name, config, target_id, expected_content, total_expected_r
 
     except Exception as e:
         print(f"   [ERROR] Verifikasi gagal: {e}")
+    return shape_ok and content_ok
 
-def run_scenario():
-    setup_database()
-    conn_primary = mysql.connector.connect(**primary_conf)
+@contextmanager
+def _connect(config):
+    """Koneksi sekali pakai untuk verifier checksum (None jika gagal)"""
+    try:
+        conn = mysql.connector.connect(**config)
+    except mysql.connector.Error as e:
+        print(f"   [ERROR] Koneksi gagal: {e}")
+        yield None
+        return
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+def verify_checksums():
+    """Bandingkan isi scenario1 di primary dan semua replica per chunk (CRC32/BIT_XOR)"""
+    print(f"\n[AUDIT] Checksum per chunk: Primary vs Replica 1 vs Replica 2...")
+    nodes = {"Primary": primary_conf, "Replica 1": replica1_conf, "Replica 2": replica2_conf}
+    verifier = ChunkedChecksumVerifier(
+        {name: (lambda conf=conf: _connect(conf)) for name, conf in nodes.items()},
+        table="scenario1",
+        columns=("data", "created_at"),
+    )
+    result = verifier.verify()
+    counts = ", ".join(f"{name}={count}" for name, count in result['row_counts'].items())
+    print(f"   Jumlah baris: {counts} ({result['chunks_compared']} chunk, {verifier.queries} query)")
+
+    if result['consistent']:
+        print(f"   Checksum OK : Semua node identik.")
+        return result
+    for name in result['unreachable']:
+        print(f"   Checksum FAIL : {name} tidak dapat dihubungi!")
+    for row_id, per_node in list(result['diverging_ids'].items())[:20]:
+        detail = ", ".join(f"{name}={'hilang' if crc is None else f'{crc:08x}'}"
+                           for name, crc in per_node.items())
+        print(f"   Checksum FAIL : id {row_id} berbeda ({detail})")
+    if len(result['diverging_ids']) > 20:
+        print(f"   ... dan {len(result['diverging_ids']) - 20} id lainnya")
+    return result
+
+def run_scenario(strategy=LOAD_STRATEGY, batch_size=BATCH_SIZE, commit_every=COMMIT_EVERY,
+                 lag_mode=LAG_MODE, total_rows=TOTAL_ROWS, payload_size=PAYLOAD_SIZE,
+                 checksum=True, phase=None, compressibility=None):
+    lag_latency.set_phase(phase or strategy)
+    setup_database(total_rows)
+    conn_primary = mysql.connector.connect(**primary_conf, allow_local_infile=(strategy == "infile"))
     cursor_primary = conn_primary.cursor()
 
     # Hitung jumlah dummy (Total dikurang 1 target utama)
-    dummy_count = TOTAL_ROWS - 1
+    dummy_count = total_rows - 1
     
-    print(f"\n--- MULAI SKENARIO: {TOTAL_ROWS} ROWS (Payload: {PAYLOAD_SIZE} bytes) ---")
+    print(f"\n--- MULAI SKENARIO: {total_rows} ROWS (Payload: {payload_size} bytes) ---")
+    print(f"[INFO] Strategi: {strategy} (batch={batch_size}, commit setiap {commit_every} baris), "
+          f"mode lag: {lag_mode}")
     
     # Generate Payload
-    base_payload = generate_random_payload(PAYLOAD_SIZE)
-    target_payload = generate_random_payload(PAYLOAD_SIZE) # Payload unik untuk target
+    if compressibility is None:
+        base_payload = generate_random_payload(payload_size)
+    else:
+        # Pool payload berbeda per baris dengan kompresibilitas terkontrol
+        base_payload = PayloadPool(payload_size, compressibility=compressibility)
+        print(f"[INFO] Payload pool: {base_payload.count} payload, "
+              f"rasio kompresi {base_payload.compression_ratio():.2f}")
+    target_payload = generate_random_payload(payload_size) # Payload unik untuk target
 
     # 1. Insert Dummy Rows (Looping otomatis berdasarkan variabel)
+    load_stats = None
     if dummy_count > 0:
         print(f"[ACTION] Insert {dummy_count} dummy rows...")
-        query = "INSERT INTO scenario1 (data) VALUES (%s)"
-        for _ in range(dummy_count):
-            cursor_primary.execute(query, (base_payload,))
-        conn_primary.commit()
+        load_stats = bulk_load(conn_primary, cursor_primary, base_payload, dummy_count,
+                               strategy, batch_size, commit_every)
 
     # 2. Insert Target (Row Terakhir)
-    print(f"[ACTION] Insert TARGET data (Row ke-{TOTAL_ROWS})...")
+    print(f"[ACTION] Insert TARGET data (Row ke-{total_rows})...")
     cursor_primary.execute("INSERT INTO scenario1 (data) VALUES (%s)", (target_payload,))
     conn_primary.commit() 
 
     # Waktu mulai
     start_time = time.time()
     last_id = cursor_primary.lastrowid
+    target_gtid = get_last_gtid(cursor_primary) if lag_mode == "gtid" else None
 
     print(f"[PRIMARY] Insert selesai. Menunggu Replica...")
 
+    cursor_primary.close()
+    conn_primary.close()
+
     # 3. Ukur Lag
-    t1 = threading.Thread(target=measure_lag, args=("Replica 1", replica1_conf, last_id, start_time))
-    t2 = threading.Thread(target=measure_lag, args=("Replica 2", replica2_conf, last_id, start_time))
+    lags = {}
+    if lag_mode == "gtid":
+        lag_fn, target = measure_lag_gtid, target_gtid
+    else:
+        lag_fn, target = measure_lag, last_id
+    t1 = threading.Thread(target=lag_fn, args=("Replica 1", replica1_conf, target, start_time, lags))
+    t2 = threading.Thread(target=lag_fn, args=("Replica 2", replica2_conf, target, start_time, lags))
     t1.start(); t2.start()
     t1.join(); t2.join()
 
-    # 4. Verifikasi (Menggunakan variabel TOTAL_ROWS)
-    verify_integrity("Replica 1", replica1_conf, last_id, target_payload, TOTAL_ROWS)
-    verify_integrity("Replica 2", replica2_conf, last_id, target_payload, TOTAL_ROWS)
+    # 4. Verifikasi (Menggunakan total_rows)
+    integrity = {
+        "Replica 1": verify_integrity("Replica 1", replica1_conf, last_id, target_payload, total_rows),
+        "Replica 2": verify_integrity("Replica 2", replica2_conf, last_id, target_payload, total_rows),
+    }
+    if checksum:
+        verify_checksums()
 
     print("\n--- SELESAI ---")
+    return {'strategy': strategy, 'load': load_stats, 'lag': lags, 'integrity': integrity}
+
+def print_strategy_summary(results):
+    """Ringkasan throughput load dan lag replica per strategi"""
+    print(f"\n{'Strategi':<10} {'rows/s':>10} {'MB/s':>8} {'Lag R1 (ms)':>12} {'Lag R2 (ms)':>12}")
+    for result in results:
+        load = result['load'] or {'rows_per_sec': 0.0, 'mb_per_sec': 0.0}
+        lag1 = result['lag'].get("Replica 1")
+        lag2 = result['lag'].get("Replica 2")
+        print(f"{result['strategy']:<10} {load['rows_per_sec']:>10.0f} {load['mb_per_sec']:>8.2f} "
+              f"{(f'{lag1:.2f}' if lag1 is not None else '-'):>12} "
+              f"{(f'{lag2:.2f}' if lag2 is not None else '-'):>12}")
+
+def _positive_int(value):
+    """Tipe argparse untuk bilangan bulat > 0"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bukan bilangan bulat: {value}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"harus lebih dari 0: {value}")
+    return number
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Skenario 1: replication lag primary-replica")
+    parser.add_argument("--strategy", choices=LOAD_STRATEGIES + ("all",), default=LOAD_STRATEGY,
+                        help="Strategi bulk load untuk baris dummy (all = bandingkan semua)")
+    parser.add_argument("--rows", type=int, default=TOTAL_ROWS,
+                        help="Jumlah baris total (dummy + 1 target)")
+    parser.add_argument("--payload-size", type=int, default=PAYLOAD_SIZE,
+                        help="Ukuran payload per baris (byte)")
+    parser.add_argument("--compressibility", type=float,
+                        help="Pakai payload pool (0 = acak, 1 = sangat mudah dikompres) untuk baris dummy")
+    parser.add_argument("--batch-size", type=_positive_int, default=BATCH_SIZE,
+                        help="Jumlah baris per batch executemany / tulis file")
+    parser.add_argument("--commit-every", type=_positive_int, default=COMMIT_EVERY,
+                        help="Commit setiap N baris")
+    parser.add_argument("--lag-mode", choices=LAG_MODES, default=LAG_MODE,
+                        help="poll = SELECT setiap 1 ms, gtid = tunggu GTID di server + breakdown performance_schema")
+    parser.add_argument("--histogram-out", metavar="PATH",
+                        help="Simpan histogram lag (JSON) untuk perbandingan antar run")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    run_scenario()
\ No newline at end of file
+    args = parse_args()
+    strategies = LOAD_STRATEGIES if args.strategy == "all" else (args.strategy,)
+    results = [run_scenario(s, args.batch_size, args.commit_every, args.lag_mode, args.rows, args.payload_size,
+                            compressibility=args.compressibility)
+               for s in strategies]
+    if len(results) > 1:
+        print_strategy_summary(results)
+    lag_latency.print_report("Persentil Lag Replica")
+    if args.histogram_out:
+        lag_latency.export(args.histogram_out)
+        print(f"[INFO] Histogram disimpan ke {args.histogram_out}")
\ No newline at end of file
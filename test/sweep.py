@@ -0,0 +1,178 @@
+import mysql.connector
+import argparse
+import csv
+import itertools
+import random
+import statistics
+
+from skenario_1 import (
+    primary_conf, replica1_conf, replica2_conf, lag_latency,
+    LOAD_STRATEGIES, LAG_MODES, LAG_MODE, COMMIT_EVERY,
+    run_scenario,
+)
+
+PAYLOAD_SIZES  = (500, 5000, 50000)  # byte per baris
+ROW_COUNTS     = (1000, 10000)
+BATCH_SIZES    = (100,)
+APPLIER_WORKERS = (None,)            # None = biarkan replica_parallel_workers apa adanya
+REPEAT         = 3                   # run per sel grid
+CONFIDENCE     = 0.95
+BOOTSTRAP_RESAMPLES = 2000
+
+REPLICAS = {"Replica 1": replica1_conf, "Replica 2": replica2_conf}
+METRICS  = ("rows_per_sec", "mb_per_sec", "lag_r1_ms", "lag_r2_ms")
+
+
+def configure_applier(workers):
+    """Set replica_parallel_workers di semua replica (SQL thread harus di-restart)"""
+    if workers is None:
+        return
+    conn = mysql.connector.connect(**primary_conf)
+    cursor = conn.cursor()
+    # Tanpa WRITESET, transaksi dari satu sesi hampir tidak bisa diparalelkan di replica
+    cursor.execute("SET GLOBAL binlog_transaction_dependency_tracking = 'WRITESET'")
+    cursor.close()
+    conn.close()
+    for name, config in REPLICAS.items():
+        conn = mysql.connector.connect(**config)
+        cursor = conn.cursor()
+        cursor.execute("STOP REPLICA SQL_THREAD")
+        cursor.execute("SET GLOBAL replica_parallel_workers = %s", (workers,))
+        cursor.execute("SET GLOBAL replica_preserve_commit_order = ON")
+        cursor.execute("START REPLICA SQL_THREAD")
+        cursor.close()
+        conn.close()
+        print(f"[INFO] {name}: replica_parallel_workers = {workers}")
+
+
+def median_ci(values, confidence=CONFIDENCE, resamples=BOOTSTRAP_RESAMPLES, seed=0):
+    """Median dan interval kepercayaan bootstrap (persentil) untuk median"""
+    values = [v for v in values if v is not None]
+    if not values:
+        return None, None, None
+    median = statistics.median(values)
+    if len(values) == 1:
+        return median, median, median
+    rng = random.Random(seed)
+    boot = sorted(statistics.median(rng.choices(values, k=len(values))) for _ in range(resamples))
+    alpha = (1 - confidence) / 2
+    low = boot[int(alpha * (resamples - 1))]
+    high = boot[int((1 - alpha) * (resamples - 1))]
+    return median, low, high
+
+
+def run_cell(cell, repeat, strategy, commit_every, lag_mode, checksum):
+    """Jalankan satu sel grid beberapa kali, kembalikan hasil mentah per run"""
+    payload_size, rows, batch_size, workers = cell
+    label = f"p{payload_size}-r{rows}-b{batch_size}-w{'default' if workers is None else workers}"
+    configure_applier(workers)
+    runs = []
+    for i in range(1, repeat + 1):
+        print(f"\n[SWEEP] {label} run {i}/{repeat}")
+        result = run_scenario(strategy, batch_size, commit_every, lag_mode,
+                              total_rows=rows, payload_size=payload_size,
+                              checksum=checksum, phase=label)
+        load = result['load'] or {}
+        runs.append({
+            'rows_per_sec': load.get('rows_per_sec'),
+            'mb_per_sec': load.get('mb_per_sec'),
+            'lag_r1_ms': result['lag'].get("Replica 1"),
+            'lag_r2_ms': result['lag'].get("Replica 2"),
+            'integrity_ok': all(result['integrity'].values()),
+        })
+    return label, runs
+
+
+def summarize_cell(cell, runs):
+    payload_size, rows, batch_size, workers = cell
+    row = {
+        'payload_size': payload_size,
+        'rows': rows,
+        'batch_size': batch_size,
+        'applier_workers': 'default' if workers is None else workers,
+        'runs': len(runs),
+        'integrity_fail': sum(1 for r in runs if not r['integrity_ok']),
+    }
+    for metric in METRICS:
+        median, low, high = median_ci([r[metric] for r in runs])
+        row[f"{metric}_median"] = median
+        row[f"{metric}_ci_low"] = low
+        row[f"{metric}_ci_high"] = high
+    return row
+
+
+def _fmt_ci(row, metric, digits):
+    if row[f"{metric}_median"] is None:
+        return "-"
+    return (f"{row[f'{metric}_median']:.{digits}f} "
+            f"[{row[f'{metric}_ci_low']:.{digits}f}, {row[f'{metric}_ci_high']:.{digits}f}]")
+
+
+def print_table(summary):
+    print(f"\n{'='*110}")
+    print(f"HASIL SWEEP (median [CI {CONFIDENCE:.0%}])")
+    print(f"{'='*110}")
+    print(f"{'Payload':>8} {'Baris':>7} {'Batch':>6} {'Worker':>7} "
+          f"{'rows/s':>22} {'Lag R1 (ms)':>26} {'Lag R2 (ms)':>26} {'Gagal':>6}")
+    for row in summary:
+        print(f"{row['payload_size']:>8} {row['rows']:>7} {row['batch_size']:>6} {str(row['applier_workers']):>7} "
+              f"{_fmt_ci(row, 'rows_per_sec', 0):>22} {_fmt_ci(row, 'lag_r1_ms', 2):>26} "
+              f"{_fmt_ci(row, 'lag_r2_ms', 2):>26} {row['integrity_fail']:>6}")
+
+
+def write_csv(path, rows):
+    if not rows:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sweep parameter skenario 1 (payload, baris, batch, applier)")
+    parser.add_argument("--payload-sizes", type=_int_list, default=list(PAYLOAD_SIZES))
+    parser.add_argument("--rows", type=_int_list, default=list(ROW_COUNTS))
+    parser.add_argument("--batch-sizes", type=_int_list, default=list(BATCH_SIZES))
+    parser.add_argument("--applier-workers", type=_int_list, default=None,
+                        help="Nilai replica_parallel_workers (default: tidak diubah)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Jumlah run per sel")
+    parser.add_argument("--strategy", choices=LOAD_STRATEGIES, default="batch")
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY)
+    parser.add_argument("--lag-mode", choices=LAG_MODES, default=LAG_MODE)
+    parser.add_argument("--no-checksum", action="store_true",
+                        help="Lewati verifikasi checksum per chunk di setiap run")
+    parser.add_argument("--out", default="sweep_results.csv", help="CSV ringkasan per sel")
+    parser.add_argument("--raw-out", default="sweep_runs.csv", help="CSV hasil mentah per run")
+    parser.add_argument("--histogram-out", metavar="PATH", help="Simpan histogram lag per sel (JSON)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    workers = args.applier_workers if args.applier_workers else list(APPLIER_WORKERS)
+    grid = list(itertools.product(args.payload_sizes, args.rows, args.batch_sizes, workers))
+    print(f"[INFO] {len(grid)} sel x {args.repeat} run = {len(grid) * args.repeat} run")
+
+    summary, raw = [], []
+    for cell in grid:
+        label, runs = run_cell(cell, args.repeat, args.strategy, args.commit_every,
+                               args.lag_mode, not args.no_checksum)
+        summary.append(summarize_cell(cell, runs))
+        raw.extend({'cell': label, 'run': i, **r} for i, r in enumerate(runs, 1))
+        write_csv(args.out, summary)  # Tulis setiap sel agar hasil parsial tidak hilang
+        write_csv(args.raw_out, raw)
+
+    print_table(summary)
+    print(f"\n[INFO] Ringkasan disimpan ke {args.out}, hasil mentah ke {args.raw_out}")
+    if args.histogram_out:
+        lag_latency.export(args.histogram_out)
+        print(f"[INFO] Histogram disimpan ke {args.histogram_out}")
+
+
+if __name__ == "__main__":
+    main()